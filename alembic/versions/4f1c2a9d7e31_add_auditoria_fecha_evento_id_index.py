@@ -0,0 +1,44 @@
+"""add_auditoria_fecha_evento_id_index
+
+Revision ID: 4f1c2a9d7e31
+Revises: 95c2358b9ad6
+Create Date: 2026-10-18 09:12:41.503217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f1c2a9d7e31'
+down_revision: Union[str, None] = '95c2358b9ad6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add composite index (fecha_evento, id_auditoria) for keyset pagination of order audits."""
+    from sqlalchemy import inspect
+
+    # Get database connection
+    connection = op.get_bind()
+    inspector = inspect(connection)
+
+    indexes = {ix['name'] for ix in inspector.get_indexes('ordenes_compra_auditoria')}
+    if 'ix_ordenes_compra_auditoria_fecha_evento_id' not in indexes:
+        op.create_index(
+            'ix_ordenes_compra_auditoria_fecha_evento_id',
+            'ordenes_compra_auditoria',
+            ['fecha_evento', 'id_auditoria'],
+            unique=False
+        )
+        print("Indice ix_ordenes_compra_auditoria_fecha_evento_id creado exitosamente")
+    else:
+        print("Indice ix_ordenes_compra_auditoria_fecha_evento_id ya existe, saltando creacion")
+
+
+def downgrade() -> None:
+    """Remove composite index (fecha_evento, id_auditoria)."""
+    op.drop_index('ix_ordenes_compra_auditoria_fecha_evento_id', table_name='ordenes_compra_auditoria')
@@ -0,0 +1,160 @@
+"""add_auditoria_structured_columns
+
+Revision ID: 7b3e9c1f0a52
+Revises: 4f1c2a9d7e31
+Create Date: 2026-10-18 10:05:17.284611
+
+"""
+import json
+from typing import Sequence, Union, Optional, Tuple
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b3e9c1f0a52'
+down_revision: Union[str, None] = '4f1c2a9d7e31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLA = 'ordenes_compra_auditoria'
+TABLA_PRODUCTOS = 'ordenes_compra_auditoria_productos'
+COLUMNAS_ID = [
+    ('id_proveedor_anterior', 'ID del proveedor anterior (solo si cambió)'),
+    ('id_proveedor_nuevo', 'ID del proveedor nuevo o actual'),
+    ('id_contacto_anterior', 'ID del contacto anterior (solo si cambió)'),
+    ('id_contacto_nuevo', 'ID del contacto nuevo o actual'),
+]
+TAMANO_LOTE = 1000
+
+
+def _parsear_cambio(campo: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """Parsea 'id_anterior ----> id_nuevo' o solo 'id' (misma regla que el listado)."""
+    if not campo:
+        return None, None
+    try:
+        if ' ----> ' in campo:
+            anterior, nuevo = campo.split(' ----> ', 1)
+            return int(anterior.strip()), int(nuevo.strip())
+        return None, int(campo.strip())
+    except ValueError:
+        return None, None
+
+
+def _parsear_ids(productos_json: Optional[str], modificados: bool = False) -> list:
+    """Extrae IDs de producto enteros de los campos JSON de productos."""
+    if not productos_json:
+        return []
+    try:
+        data = json.loads(productos_json) or []
+    except ValueError:
+        return []
+    ids = []
+    for item in data:
+        valor = item.get('id_producto') if modificados and isinstance(item, dict) else item
+        try:
+            ids.append(int(valor))
+        except (ValueError, TypeError):
+            continue
+    return ids
+
+
+def _backfill(connection) -> None:
+    """Llena las columnas estructuradas y la tabla lateral a partir de los campos concatenados/JSON."""
+    ultimo_id = 0
+    total = 0
+    while True:
+        filas = connection.execute(sa.text(
+            f"SELECT id_auditoria, cambio_proveedor, cambio_contacto, "
+            f"productos_agregados, productos_modificados, productos_eliminados "
+            f"FROM {TABLA} WHERE id_auditoria > :ultimo ORDER BY id_auditoria LIMIT :lote"
+        ), {"ultimo": ultimo_id, "lote": TAMANO_LOTE}).fetchall()
+        if not filas:
+            break
+
+        actualizaciones = []
+        productos = []
+        for fila in filas:
+            prov_ant, prov_nuevo = _parsear_cambio(fila.cambio_proveedor)
+            cont_ant, cont_nuevo = _parsear_cambio(fila.cambio_contacto)
+            actualizaciones.append({
+                "id": fila.id_auditoria,
+                "pa": prov_ant, "pn": prov_nuevo,
+                "ca": cont_ant, "cn": cont_nuevo,
+            })
+
+            vistos = set()
+            for tipo, ids in (
+                ('AGREGADO', _parsear_ids(fila.productos_agregados)),
+                ('MODIFICADO', _parsear_ids(fila.productos_modificados, modificados=True)),
+                ('ELIMINADO', _parsear_ids(fila.productos_eliminados)),
+            ):
+                for id_producto in ids:
+                    if (id_producto, tipo) not in vistos:
+                        vistos.add((id_producto, tipo))
+                        productos.append({"a": fila.id_auditoria, "p": id_producto, "t": tipo})
+
+        connection.execute(sa.text(
+            f"UPDATE {TABLA} SET id_proveedor_anterior = :pa, id_proveedor_nuevo = :pn, "
+            f"id_contacto_anterior = :ca, id_contacto_nuevo = :cn WHERE id_auditoria = :id"
+        ), actualizaciones)
+        if productos:
+            connection.execute(sa.text(
+                f"INSERT INTO {TABLA_PRODUCTOS} (id_auditoria, id_producto, tipo_cambio) VALUES (:a, :p, :t)"
+            ), productos)
+
+        ultimo_id = filas[-1].id_auditoria
+        total += len(filas)
+
+    print(f"Backfill de auditorias completado: {total} filas procesadas")
+
+
+def upgrade() -> None:
+    """Add indexed provider/contact ID columns, product side table and backfill them."""
+    from sqlalchemy import inspect
+
+    # Get database connection
+    connection = op.get_bind()
+    inspector = inspect(connection)
+
+    # La primera versión de la tabla pudo crear estas columnas: agregarlas solo si faltan
+    columnas = {c['name'] for c in inspector.get_columns(TABLA)}
+    for nombre, comentario in COLUMNAS_ID:
+        if nombre not in columnas:
+            op.add_column(TABLA, sa.Column(nombre, sa.BIGINT(), nullable=True, comment=comentario))
+
+    indices = {ix['name'] for ix in inspector.get_indexes(TABLA)}
+    for nombre, _ in COLUMNAS_ID:
+        nombre_indice = f'ix_{TABLA}_{nombre}'
+        if nombre_indice not in indices:
+            op.create_index(nombre_indice, TABLA, [nombre], unique=False)
+
+    if TABLA_PRODUCTOS not in inspector.get_table_names():
+        op.create_table(
+            TABLA_PRODUCTOS,
+            sa.Column('id', sa.BIGINT(), autoincrement=True, nullable=False),
+            sa.Column('id_auditoria', sa.BIGINT(), nullable=False, comment='ID de la auditoría'),
+            sa.Column('id_producto', sa.BIGINT(), nullable=False, comment='ID del producto afectado'),
+            sa.Column('tipo_cambio', sa.String(length=20), nullable=False, comment='AGREGADO, MODIFICADO, ELIMINADO'),
+            sa.ForeignKeyConstraint(['id_auditoria'], [f'{TABLA}.id_auditoria'],
+                                    name='fk_oc_auditoria_productos_auditoria', ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_ordenes_compra_auditoria_productos_id_auditoria'), TABLA_PRODUCTOS, ['id_auditoria'], unique=False)
+        op.create_index('ix_oc_auditoria_productos_producto_auditoria', TABLA_PRODUCTOS, ['id_producto', 'id_auditoria'], unique=False)
+        print(f"Tabla {TABLA_PRODUCTOS} creada exitosamente")
+
+        _backfill(connection)
+    else:
+        print(f"Tabla {TABLA_PRODUCTOS} ya existe, saltando creacion y backfill")
+
+
+def downgrade() -> None:
+    """Remove product side table and structured provider/contact columns."""
+    op.drop_index('ix_oc_auditoria_productos_producto_auditoria', table_name=TABLA_PRODUCTOS)
+    op.drop_index(op.f('ix_ordenes_compra_auditoria_productos_id_auditoria'), table_name=TABLA_PRODUCTOS)
+    op.drop_table(TABLA_PRODUCTOS)
+    for nombre, _ in reversed(COLUMNAS_ID):
+        op.drop_index(f'ix_{TABLA}_{nombre}', table_name=TABLA)
+        op.drop_column(TABLA, nombre)
@@ -0,0 +1,50 @@
+"""add_scheduler_jobstore_table
+
+Revision ID: a8c4e6f2d913
+Revises: e2a7c4f8b615
+Create Date: 2026-10-18 18:42:37.905126
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c4e6f2d913'
+down_revision: Union[str, None] = 'e2a7c4f8b615'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Job store del registro de jobs (mismo esquema que SQLAlchemyJobStore)
+TABLA = 'scheduler_jobs'
+
+
+def upgrade() -> None:
+    """Create the APScheduler job store table used by the job registry."""
+    from sqlalchemy import inspect
+
+    # Get database connection
+    connection = op.get_bind()
+    inspector = inspect(connection)
+
+    if TABLA in inspector.get_table_names():
+        print(f"Tabla {TABLA} ya existe, saltando creacion")
+        return
+
+    op.create_table(
+        TABLA,
+        sa.Column('id', sa.Unicode(length=191), nullable=False),
+        sa.Column('next_run_time', sa.Float(precision=25), nullable=True),
+        sa.Column('job_state', sa.LargeBinary(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f(f'ix_{TABLA}_next_run_time'), TABLA, ['next_run_time'], unique=False)
+    print(f"Tabla {TABLA} creada exitosamente")
+
+
+def downgrade() -> None:
+    """Drop the APScheduler job store table."""
+    op.drop_index(op.f(f'ix_{TABLA}_next_run_time'), table_name=TABLA)
+    op.drop_table(TABLA)
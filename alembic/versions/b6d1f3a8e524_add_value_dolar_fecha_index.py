@@ -0,0 +1,39 @@
+"""add_value_dolar_fecha_index
+
+Revision ID: b6d1f3a8e524
+Revises: a8c4e6f2d913
+Create Date: 2026-10-18 19:27:03.418552
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d1f3a8e524'
+down_revision: Union[str, None] = 'a8c4e6f2d913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add index on value_dolar.fecha for the exchange-rate history range queries."""
+    from sqlalchemy import inspect
+
+    # Get database connection
+    connection = op.get_bind()
+    inspector = inspect(connection)
+
+    indexes = {ix['name'] for ix in inspector.get_indexes('value_dolar')}
+    if 'ix_value_dolar_fecha' not in indexes:
+        op.create_index('ix_value_dolar_fecha', 'value_dolar', ['fecha'], unique=False)
+        print("Indice ix_value_dolar_fecha creado exitosamente")
+    else:
+        print("Indice ix_value_dolar_fecha ya existe, saltando creacion")
+
+
+def downgrade() -> None:
+    """Remove index on value_dolar.fecha."""
+    op.drop_index('ix_value_dolar_fecha', table_name='value_dolar')
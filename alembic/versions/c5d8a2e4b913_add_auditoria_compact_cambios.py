@@ -0,0 +1,297 @@
+"""add_auditoria_compact_cambios
+
+Revision ID: c5d8a2e4b913
+Revises: 7b3e9c1f0a52
+Create Date: 2026-10-18 11:42:09.517302
+
+"""
+import json
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d8a2e4b913'
+down_revision: Union[str, None] = '7b3e9c1f0a52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLA = 'ordenes_compra_auditoria'
+COLUMNAS_LEGADO = ['productos_agregados', 'productos_modificados', 'productos_eliminados', 'cambios_adicionales']
+TAMANO_LOTE = 1000
+
+
+# ----------------------------------------------------------------------
+# Copia congelada del codec de la versión 1 (app/shared/utils/auditoria_codec.py
+# a la fecha de esta migración). No importar el codec vivo: si cambia, volver a
+# ejecutar esta migración debe seguir produciendo exactamente lo mismo.
+# ----------------------------------------------------------------------
+
+VERSION = 1
+SEPARADOR = " ----> "
+CAMPOS = {
+    'cantidad': 1,
+    'precio_unitario': 2,
+    'precio_total': 3,
+    'moneda': 4,
+    'pago': 5,
+    'entrega': 6,
+    'consorcio': 7,
+    'igv': 8,
+}
+NOMBRES = {codigo: nombre for nombre, codigo in CAMPOS.items()}
+CAMBIOS_PRODUCTO_PLANOS = (
+    ('cantidad', 'cantidad_anterior', 'cantidad_nueva'),
+    ('precio_unitario', 'precio_anterior', 'precio_nuevo'),
+)
+
+
+def _dumps(obj: Any) -> str:
+    # Mismo texto que orjson (sin espacios, UTF-8 sin escapar)
+    return json.dumps(obj, default=str, separators=(",", ":"), ensure_ascii=False)
+
+
+def _cargar_json(texto: Optional[str], tipo: type) -> Any:
+    """
+    JSON de una columna con el tipo esperado (None si está vacía).
+
+    Raises:
+        ValueError: Si no es JSON válido o no es del tipo esperado (la fila no se convierte)
+    """
+    if not texto:
+        return None
+    valor = json.loads(texto)
+    if valor is not None and not isinstance(valor, tipo):
+        raise ValueError(f"se esperaba {tipo.__name__} y hay {type(valor).__name__}")
+    return valor
+
+
+def _id(valor: Any) -> Any:
+    try:
+        return int(valor)
+    except (ValueError, TypeError):
+        return valor
+
+
+def _codigo(campo: str) -> Any:
+    return CAMPOS.get(campo, campo)
+
+
+def _nombre(codigo: Any) -> str:
+    return NOMBRES.get(codigo, str(codigo)) if isinstance(codigo, int) else codigo
+
+
+def _ids(productos: Optional[List[Any]]) -> List[Any]:
+    return [_id(p.get('id_producto') if isinstance(p, dict) else p) for p in productos or []]
+
+
+def _cambios_producto(producto: Dict[str, Any]) -> List[list]:
+    cambios = producto.get('cambios') or {}
+    if not isinstance(cambios, dict):
+        raise ValueError(f"cambios del producto {producto.get('id_producto')} no es un objeto")
+    if cambios:
+        return [
+            [_codigo(campo), valor.get('anterior'), valor.get('nuevo')] if isinstance(valor, dict)
+            else [_codigo(campo), valor]
+            for campo, valor in cambios.items()
+        ]
+    pares = []
+    for campo, clave_anterior, clave_nueva in CAMBIOS_PRODUCTO_PLANOS:
+        if clave_anterior in producto or clave_nueva in producto:
+            anterior, nuevo = producto.get(clave_anterior), producto.get(clave_nueva)
+            if anterior != nuevo:
+                pares.append([_codigo(campo), anterior, nuevo])
+    return pares
+
+
+def _adicionales(adicionales: Optional[Dict[str, Any]]) -> List[list]:
+    resultado = []
+    for campo, valor in (adicionales or {}).items():
+        if isinstance(valor, dict):
+            resultado.append([_codigo(campo), valor.get('anterior', ''), valor.get('nuevo', '')])
+        elif isinstance(valor, str) and SEPARADOR in valor:
+            anterior, nuevo = valor.split(SEPARADOR, 1)
+            resultado.append([_codigo(campo), anterior, nuevo])
+        else:
+            resultado.append([_codigo(campo), valor])
+    return resultado
+
+
+def _a_compacto(agregados: Optional[str], modificados: Optional[str],
+                eliminados: Optional[str], adicionales: Optional[str]) -> Optional[str]:
+    """
+    Columnas JSON del formato anterior -> registro compacto versión 1
+
+    Raises:
+        ValueError: Si alguna columna no tiene la forma esperada
+    """
+    productos_modificados = _cargar_json(modificados, list) or []
+    if not all(isinstance(item, dict) for item in productos_modificados):
+        raise ValueError("productos_modificados contiene elementos que no son objetos")
+    registro = [
+        VERSION,
+        _ids(_cargar_json(agregados, list)),
+        [[_id(item.get('id_producto')), _cambios_producto(item)] for item in productos_modificados],
+        _ids(_cargar_json(eliminados, list)),
+        _adicionales(_cargar_json(adicionales, dict)),
+    ]
+    while len(registro) > 1 and not registro[-1]:
+        registro.pop()
+    return _dumps(registro) if len(registro) > 1 else None
+
+
+def _a_columnas_legado(cambios: str) -> Dict[str, Optional[str]]:
+    """
+    Registro compacto versión 1 -> columnas JSON del formato anterior
+
+    Raises:
+        ValueError: Si el registro no es de la versión 1
+    """
+    registro = _cargar_json(cambios, list)
+    if not (registro and registro[0] == VERSION):
+        raise ValueError("registro compacto sin versión 1")
+    registro = registro + [[]] * (5 - len(registro))
+    _, agregados, modificados, eliminados, adicionales = registro
+
+    productos_modificados = []
+    for id_producto, pares in modificados:
+        detalle = {}
+        for par in pares:
+            if len(par) == 3:
+                detalle[_nombre(par[0])] = {'anterior': par[1], 'nuevo': par[2]}
+            else:
+                detalle[_nombre(par[0])] = {'anterior': None, 'nuevo': par[1]}
+        productos_modificados.append({'id_producto': id_producto, 'cambios': detalle})
+    otros = {
+        _nombre(par[0]): f"{par[1]}{SEPARADOR}{par[2]}" if len(par) == 3 else str(par[1])
+        for par in adicionales
+    }
+    return {
+        'productos_agregados': _dumps([str(i) for i in agregados]) if agregados else None,
+        'productos_modificados': _dumps(productos_modificados) if productos_modificados else None,
+        'productos_eliminados': _dumps([str(i) for i in eliminados]) if eliminados else None,
+        'cambios_adicionales': _dumps(otros) if otros else None,
+    }
+
+
+def _convertir(connection) -> None:
+    """
+    Pasa las columnas JSON del formato anterior al registro compacto y las vacía.
+
+    Las filas que no se pueden convertir sin pérdida (JSON inválido o con otra
+    forma) se dejan intactas en el formato anterior y se listan.
+    """
+    ultimo_id = 0
+    total = 0
+    omitidas = []
+    hay_legado = " OR ".join(f"{c} IS NOT NULL" for c in COLUMNAS_LEGADO)
+    while True:
+        filas = connection.execute(sa.text(
+            f"SELECT id_auditoria, {', '.join(COLUMNAS_LEGADO)} FROM {TABLA} "
+            f"WHERE id_auditoria > :ultimo AND cambios IS NULL AND ({hay_legado}) "
+            f"ORDER BY id_auditoria LIMIT :lote"
+        ), {"ultimo": ultimo_id, "lote": TAMANO_LOTE}).fetchall()
+        if not filas:
+            break
+
+        actualizaciones = []
+        for fila in filas:
+            try:
+                cambios = _a_compacto(
+                    fila.productos_agregados,
+                    fila.productos_modificados,
+                    fila.productos_eliminados,
+                    fila.cambios_adicionales
+                )
+            except (ValueError, AttributeError, TypeError) as e:
+                print(f"Auditoria {fila.id_auditoria} no convertida, se mantiene en el formato anterior: {e}")
+                omitidas.append(fila.id_auditoria)
+                continue
+            actualizaciones.append({"id": fila.id_auditoria, "cambios": cambios})
+
+        if actualizaciones:
+            connection.execute(sa.text(
+                f"UPDATE {TABLA} SET cambios = :cambios, "
+                f"{', '.join(f'{c} = NULL' for c in COLUMNAS_LEGADO)} WHERE id_auditoria = :id"
+            ), actualizaciones)
+
+        ultimo_id = filas[-1].id_auditoria
+        total += len(actualizaciones)
+
+    print(f"Conversion de auditorias al formato compacto completada: {total} filas")
+    if omitidas:
+        print(f"Auditorias no convertidas ({len(omitidas)}), revisar manualmente: {omitidas}")
+
+
+def _revertir(connection) -> List[int]:
+    """
+    Restaura las columnas JSON del formato anterior a partir del registro compacto.
+
+    Returns:
+        List[int]: IDs cuyo registro compacto no se pudo restaurar (quedan sin tocar)
+    """
+    ultimo_id = 0
+    total = 0
+    omitidas = []
+    while True:
+        filas = connection.execute(sa.text(
+            f"SELECT id_auditoria, cambios FROM {TABLA} "
+            f"WHERE id_auditoria > :ultimo AND cambios IS NOT NULL "
+            f"ORDER BY id_auditoria LIMIT :lote"
+        ), {"ultimo": ultimo_id, "lote": TAMANO_LOTE}).fetchall()
+        if not filas:
+            break
+
+        actualizaciones = []
+        for fila in filas:
+            try:
+                actualizaciones.append({"id": fila.id_auditoria, **_a_columnas_legado(fila.cambios)})
+            except (ValueError, TypeError) as e:
+                print(f"Auditoria {fila.id_auditoria} no restaurada: {e}")
+                omitidas.append(fila.id_auditoria)
+
+        if actualizaciones:
+            connection.execute(sa.text(
+                f"UPDATE {TABLA} SET {', '.join(f'{c} = :{c}' for c in COLUMNAS_LEGADO)} WHERE id_auditoria = :id"
+            ), actualizaciones)
+
+        ultimo_id = filas[-1].id_auditoria
+        total += len(actualizaciones)
+
+    print(f"Restauracion del formato anterior de auditorias completada: {total} filas")
+    return omitidas
+
+
+def upgrade() -> None:
+    """Add compact versioned change record column and convert existing audit rows."""
+    from sqlalchemy import inspect
+
+    # Get database connection
+    connection = op.get_bind()
+    inspector = inspect(connection)
+
+    columnas = {c['name'] for c in inspector.get_columns(TABLA)}
+    if 'cambios' not in columnas:
+        op.add_column(TABLA, sa.Column(
+            'cambios', sa.Text(), nullable=True,
+            comment='Registro compacto: [version, agregados, modificados, eliminados, adicionales]'
+        ))
+        print(f"Columna cambios agregada a {TABLA}")
+    else:
+        print(f"Columna cambios ya existe en {TABLA}, saltando creacion")
+
+    _convertir(connection)
+
+
+def downgrade() -> None:
+    """Restore per-column JSON payloads and drop the compact change record column."""
+    omitidas = _revertir(op.get_bind())
+    if omitidas:
+        # Borrar la columna perdería estos cambios: se aborta el downgrade
+        raise RuntimeError(
+            f"{len(omitidas)} auditorias no se pudieron restaurar al formato anterior "
+            f"(ids: {omitidas[:20]}); corregir su columna cambios antes de repetir el downgrade"
+        )
+    op.drop_column(TABLA, 'cambios')
@@ -0,0 +1,48 @@
+"""add_sunat_ruc_snapshot_table
+
+Revision ID: e2a7c4f8b615
+Revises: c5d8a2e4b913
+Create Date: 2026-10-18 15:20:44.108327
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a7c4f8b615'
+down_revision: Union[str, None] = 'c5d8a2e4b913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLA = 'sunat_ruc_snapshot'
+
+
+def upgrade() -> None:
+    """Create table with the last SUNAT response per RUC."""
+    from sqlalchemy import inspect
+
+    # Get database connection
+    connection = op.get_bind()
+    inspector = inspect(connection)
+
+    if TABLA not in inspector.get_table_names():
+        op.create_table(
+            TABLA,
+            sa.Column('ruc', sa.String(length=11), nullable=False, comment='Número de RUC'),
+            sa.Column('datos', sa.Text(), nullable=False, comment='Respuesta de SUNAT (DatosRucDTO serializado a JSON)'),
+            sa.Column('fetched_at', sa.DateTime(), nullable=False, comment='Fecha y hora de la consulta a SUNAT'),
+            sa.PrimaryKeyConstraint('ruc')
+        )
+        op.create_index(op.f('ix_sunat_ruc_snapshot_fetched_at'), TABLA, ['fetched_at'], unique=False)
+        print(f"Tabla {TABLA} creada exitosamente")
+    else:
+        print(f"Tabla {TABLA} ya existe, saltando creacion")
+
+
+def downgrade() -> None:
+    """Drop SUNAT RUC snapshot table."""
+    op.drop_index(op.f('ix_sunat_ruc_snapshot_fetched_at'), table_name=TABLA)
+    op.drop_table(TABLA)
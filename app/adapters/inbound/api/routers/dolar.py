@@ -1,7 +1,14 @@
-from fastapi import APIRouter, Depends
+import asyncio
+from datetime import date, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from app.config.database import get_db
-from app.adapters.outbound.external_services.currency.valor_dolar import ValorDolar
+from app.config.settings import get_settings
+from app.core.services.valor_dolar_service import Granularidad, get_valor_dolar_service
+from app.adapters.outbound.external_services.currency.valor_dolar import get_valor_dolar
 from app.adapters.outbound.database.repositories.valor_dolar_repository import ValorDolarRepository
 
 # Configuración de la API
@@ -9,22 +16,65 @@ router = APIRouter(
     prefix="/dolar", 
     tags=["Dolar"],
 )
-scraper = ValorDolar()
+settings = get_settings()
 
 @router.get("/ultimo")
-async def get_dolar_ultimo(db: Session = Depends(get_db)):
-    repo = ValorDolarRepository(db)
-    consulta = repo.fetch_last_value_dolar()
-    if consulta:
-        return {"fecha": consulta.fecha, "venta": consulta.venta}, 200
-    else:
-        return {"error": "No hay datos en la base de datos."}, 404  
+async def get_dolar_ultimo(request: Request):
+    # Valor en memoria; solo se relee de la BD tras una inserción o al vencer el TTL.
+    # Esa relectura bloquea (BD + lock del servicio): se hace en un thread como /historico
+    ultimo = await asyncio.to_thread(get_valor_dolar_service().obtener_ultimo)
+    if not ultimo:
+        return {"error": "No hay datos en la base de datos."}, 404
+
+    cabeceras = {
+        "ETag": ultimo.etag,
+        "Cache-Control": f"public, max-age={settings.dolar_ultimo_max_age}, must-revalidate"
+    }
+    if _coincide_etag(request.headers.get("if-none-match"), ultimo.etag):
+        return Response(status_code=304, headers=cabeceras)
+    # Mismo cuerpo que antes ([datos, 200]) para no romper al frontend
+    return JSONResponse(content=jsonable_encoder([ultimo.a_dict(), 200]), headers=cabeceras)
+
+
+def _coincide_etag(if_none_match: Optional[str], etag: str) -> bool:
+    """True si el navegador ya tiene la versión actual (If-None-Match)"""
+    if not if_none_match:
+        return False
+    etiquetas = [e.strip().removeprefix("W/") for e in if_none_match.split(",")]
+    return "*" in etiquetas or etag in etiquetas
+
+@router.get("/historico")
+async def get_dolar_historico(
+    desde: Optional[date] = Query(None, description="Primer día incluido (YYYY-MM-DD). Default: un año antes de `hasta`"),
+    hasta: Optional[date] = Query(None, description="Último día incluido (YYYY-MM-DD). Default: hoy"),
+    granularidad: Granularidad = Query("dia", description="Periodo de cada punto: dia, semana o mes")
+):
+    """
+    Histórico de la venta del dólar agregado por periodo
+
+    Cada punto trae mínimo, máximo, promedio y cierre (último valor del periodo),
+    así los rangos largos se consultan por semana o mes sin devolver cada registro.
+    """
+    hasta = hasta or date.today()
+    desde = desde or hasta - timedelta(days=365)
+    if desde > hasta:
+        raise HTTPException(status_code=400, detail="`desde` no puede ser posterior a `hasta`.")
+
+    # La primera consulta (o tras una inserción) lee la BD: fuera del event loop
+    puntos = await asyncio.to_thread(get_valor_dolar_service().obtener_historico, desde, hasta, granularidad)
+    return {
+        "desde": desde,
+        "hasta": hasta,
+        "granularidad": granularidad,
+        "puntos": puntos,
+    }
 
 @router.post("/guardarNuevoValor")
 async def guardar_nuevo_valor(db: Session = Depends(get_db)):
     repo = ValorDolarRepository(db)
     
-    data = scraper.obtener_cambio()
+    # Consulta las fuentes en paralelo; puede esperar turno en el gobernador de admisión
+    data = await get_valor_dolar().obtener_cambio()
     if not data:
         return {"error": "No se pudo obtener el valor del dólar."}, 500
     
@@ -5,6 +5,9 @@ from fastapi import APIRouter
 from datetime import datetime
 from app.config.settings import get_settings
 from app.config.check_connection import check_database_connection
+from app.adapters.outbound.external_services.sunat.browser_pool import get_browser_pool
+from app.dependencies import get_sunat_scrapper
+from app.shared.utils.admission_governor import estado_governors, get_admission_governor
 
 router = APIRouter()
 settings = get_settings()
@@ -44,4 +47,30 @@ async def database_health():
             "status": "unhealthy",
             "database": "not connected",
             "timestamp": datetime.now().isoformat()
-        }
\ No newline at end of file
+        }
+
+
+@router.get("/health/admision")
+async def admision_health():
+    """
+    Métricas del control de admisión por sitio externo: llamadas en curso,
+    profundidad de la cola, tiempos de espera y rechazos (503)
+    """
+    return {
+        "objetivos": estado_governors(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@router.get("/health/sunat")
+async def sunat_health():
+    """
+    Métricas de la consulta de RUC: estrategia usada (HTTP o navegador),
+    motivos de fallback al navegador, estado del pool de navegadores y control de admisión
+    """
+    return {
+        "estrategias": get_sunat_scrapper().metricas(),
+        "pool_navegadores": get_browser_pool().estado(),
+        "admision": get_admission_governor("sunat").estado(),
+        "timestamp": datetime.now().isoformat()
+    }
@@ -2,26 +2,17 @@
 Router para la integración con SUNAT
 """
 from fastapi import APIRouter, HTTPException, Depends
-from app.adapters.inbound.api.schemas.sunat_schemas import SunatRucResponse, SunatErrorResponse
+from fastapi.responses import StreamingResponse
+from app.adapters.inbound.api.schemas.sunat_schemas import SunatRucResponse, SunatErrorResponse, SunatRucsLoteRequest
 from app.core.use_cases.integracion_sunat.integracion_sunat_uc import IntegracionSunatUC
-from app.adapters.outbound.external_services.sunat.sunat_scraper import SunatScrapper
+from app.dependencies import get_integracion_sunat_use_case
+from app.shared.utils.admission_governor import AdmisionRechazadaError
+from app.shared.utils.json_encoder import dumps
 from typing import Union
 
 router = APIRouter(prefix="/integracion-sunat", tags=["Integración con Sunat"])
 
 
-def get_sunat_use_case() -> IntegracionSunatUC:
-    """
-    Dependencia para obtener el caso de uso de SUNAT
-    """
-    import os
-    # Usar headless=True en producción (Railway/Docker) y headless=False en local
-    # Railway y otros entornos cloud suelen definir PORT o RAILWAY_ENVIRONMENT
-    is_production = os.getenv('RAILWAY_ENVIRONMENT') is not None or os.path.exists('/.dockerenv')
-    sunat_scraper = SunatScrapper(headless=is_production)
-    return IntegracionSunatUC(sunat_scraper)
-
-
 @router.get(
     "/obtener-ruc/{ruc}",
     response_model=Union[SunatRucResponse, SunatErrorResponse],
@@ -39,12 +30,15 @@ def get_sunat_use_case() -> IntegracionSunatUC:
         500: {
             "description": "Error interno del servidor",
             "model": SunatErrorResponse
+        },
+        503: {
+            "description": "SUNAT saturado: reintentar tras los segundos indicados en Retry-After"
         }
     }
 )
 async def obtener_ruc(
     ruc: str,
-    use_case: IntegracionSunatUC = Depends(get_sunat_use_case)
+    use_case: IntegracionSunatUC = Depends(get_integracion_sunat_use_case)
 ) -> Union[SunatRucResponse, SunatErrorResponse]:
     """
     Consulta información de un RUC en SUNAT
@@ -72,8 +66,8 @@ async def obtener_ruc(
         
         return SunatRucResponse(**resultado)
         
-    except HTTPException:
-        # Re-lanzar HTTPException para que FastAPI la maneje
+    except (HTTPException, AdmisionRechazadaError):
+        # Re-lanzar HTTPException y rechazos de admisión (503) para que FastAPI los maneje
         raise
     except Exception as e:
         # Capturar cualquier otro error no previsto
@@ -86,3 +80,36 @@ async def obtener_ruc(
             }
         )
 
+
+@router.post(
+    "/obtener-rucs",
+    summary="Consultar varios RUC en SUNAT",
+    description=(
+        "Consulta una lista de RUC y devuelve un resultado por línea (NDJSON) a medida que se completan. "
+        "Los RUC en caché se responden de inmediato; el resto se consulta con concurrencia limitada"
+    ),
+    responses={
+        200: {
+            "description": 'Una línea JSON por RUC: {"ruc", "ok": true, "datos"} o {"ruc", "ok": false, "error"}',
+            "content": {"application/x-ndjson": {}}
+        }
+    }
+)
+async def obtener_rucs(
+    request: SunatRucsLoteRequest,
+    use_case: IntegracionSunatUC = Depends(get_integracion_sunat_use_case)
+) -> StreamingResponse:
+    """
+    Consulta varios RUC en una sola llamada
+
+    Args:
+        request (SunatRucsLoteRequest): Lista de RUC a consultar
+
+    Returns:
+        StreamingResponse: NDJSON con el resultado de cada RUC (los errores van por ítem)
+    """
+    async def lineas():
+        async for item in use_case.obtener_rucs(request.rucs):
+            yield (dumps(item) + "\n").encode("utf-8")
+
+    return StreamingResponse(lineas(), media_type="application/x-ndjson")
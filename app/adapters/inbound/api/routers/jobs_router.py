@@ -0,0 +1,57 @@
+"""
+Router de administración de los jobs periódicos
+"""
+import secrets
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from app.config.settings import get_settings
+from app.core.infrastructure.scheduler.job_registry import JobEnCursoError, JobNoEncontradoError, job_scheduler
+from app.core.infrastructure.scheduler.leader_election import get_eleccion_lider
+
+
+def verificar_token_admin(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    """Exige el header X-Admin-Token; sin ADMIN_TOKEN configurado los endpoints quedan cerrados"""
+    esperado = get_settings().admin_token
+    if not esperado:
+        raise HTTPException(status_code=403, detail="Administración de jobs deshabilitada: ADMIN_TOKEN no está configurado")
+    if not secrets.compare_digest(x_admin_token or "", esperado):
+        raise HTTPException(status_code=401, detail="Token de administración inválido")
+
+
+router = APIRouter(prefix="/admin/jobs", dependencies=[Depends(verificar_token_admin)])
+
+
+@router.get("")
+async def listar_jobs():
+    """
+    Jobs registrados con su programación, próxima ejecución y métricas
+    (duración, último éxito, fallos, timeouts y ejecuciones omitidas).
+
+    Las métricas son del worker que responde; los jobs programados corren en el líder.
+    """
+    return {
+        "lider": get_eleccion_lider().es_lider,
+        "jobs": job_scheduler.estado(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@router.post("/{job_id}/ejecutar", status_code=202)
+async def ejecutar_job(job_id: str):
+    """
+    Ejecuta un job ahora en segundo plano, sin esperar a su próxima hora programada
+
+    Raises:
+        HTTPException 404: El job no existe
+        HTTPException 409: El job ya se está ejecutando
+    """
+    try:
+        await job_scheduler.disparar(job_id)
+    except JobNoEncontradoError:
+        raise HTTPException(status_code=404, detail=f"No existe el job '{job_id}'")
+    except JobEnCursoError:
+        raise HTTPException(status_code=409, detail=f"El job '{job_id}' ya se está ejecutando")
+    return {"mensaje": f"Job '{job_id}' iniciado", "job_id": job_id}
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Query, HTTPException
+from fastapi.responses import StreamingResponse
 from app.adapters.inbound.api.schemas.ordenes_compra_schemas import (
     OrdenesCompraRequest,
     ActualizarOrdenCompraRequest,
@@ -12,13 +13,19 @@ from app.core.use_cases.generar_oc.eliminar_orden_compra import EliminarOrdenCom
 from app.core.use_cases.generar_oc.actualizar_orden_compra import ActualizarOrdenCompra
 from app.core.use_cases.generar_oc.obtener_orden_compra import ObtenerOrdenCompra
 from app.core.use_cases.generar_oc.listar_auditoria_orden_compra import ListarAuditoriaOrdenCompra
+from app.core.use_cases.generar_oc.exportar_auditoria_orden_compra import (
+    ExportarAuditoriaOrdenCompra,
+    FORMATO_XLSX,
+    nombre_archivo_exportacion
+)
 from fastapi import Depends
 from app.dependencies import (
     get_generate_purchase_order_use_case,
     get_delete_purchase_order_use_case,
     get_update_purchase_order_use_case,
     get_obtener_purchase_order_use_case,
-    get_listar_auditoria_orden_compra_use_case
+    get_listar_auditoria_orden_compra_use_case,
+    get_exportar_auditoria_orden_compra_use_case
 )
 from app.core.domain.exceptions import (
     OrdenCompraError,
@@ -30,8 +37,9 @@ from app.core.domain.exceptions import (
     AlmacenamientoError,
     ActualizacionOrdenError,
     EliminacionOrdenError,
+    CursorAuditoriaInvalidoError,
 )
-from typing import Optional
+from typing import Optional, Literal
 from datetime import datetime
 import logging
 
@@ -275,10 +283,14 @@ def get_auditoria_logs(
     proveedor: Optional[str] = Query(None, description="Buscar por razón social del proveedor - búsqueda parcial"),
     ruc_proveedor: Optional[str] = Query(None, description="Filtrar por RUC del proveedor"),
     contacto: Optional[str] = Query(None, description="Buscar por nombre del contacto - búsqueda parcial"),
+    id_producto: Optional[int] = Query(None, description="Filtrar auditorías que agregaron, modificaron o eliminaron este producto"),
     fecha_desde: Optional[datetime] = Query(None, description="Filtrar desde esta fecha (formato: YYYY-MM-DD)"),
     fecha_hasta: Optional[datetime] = Query(None, description="Filtrar hasta esta fecha (formato: YYYY-MM-DD)"),
     page: int = Query(1, description="Número de página", ge=1),
     page_size: int = Query(10, description="Cantidad de registros por página", ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Activa la paginación por cursor. Enviar vacío para la primera página y luego el next_cursor recibido"),
+    conteo: Optional[Literal["exacto", "estimado", "ninguno"]] = Query(None, description="Cálculo del total: exacto (default por página), estimado (cacheado) o ninguno (default con cursor)"),
+    incluir_archivo: Optional[bool] = Query(None, description="Incluir auditorías archivadas. Por defecto se incluyen solo si fecha_desde cae en meses archivados"),
     use_case: ListarAuditoriaOrdenCompra = Depends(get_listar_auditoria_orden_compra_use_case)
 ):
     """
@@ -299,11 +311,20 @@ def get_auditoria_logs(
     - proveedor: Buscar por razón social del proveedor (búsqueda parcial)
     - ruc_proveedor: Filtrar por RUC exacto del proveedor
     - contacto: Buscar por nombre del contacto (búsqueda parcial)
+    - id_producto: Auditorías que agregaron, modificaron o eliminaron un producto
     - fecha_desde/fecha_hasta: Rango de fechas
 
     Paginación:
     - page: Número de página (default: 1)
     - page_size: Cantidad de registros por página (default: 10, max: 100)
+    - cursor: Paginación por cursor sobre (fecha_evento, id_auditoria). Enviar `cursor=` para la
+      primera página y luego el `next_cursor` de cada respuesta. No se degrada en páginas profundas.
+    - conteo: exacto | estimado | ninguno. En modo cursor el total no se calcula salvo que se pida.
+
+    Archivo:
+    - Las auditorías fuera del horizonte de retención se mueven a archivos comprimidos.
+      Si fecha_desde cae en meses archivados se incluyen automáticamente después de las
+      recientes; incluir_archivo=true fuerza su lectura e incluir_archivo=false la omite.
 
     Returns:
         ListarAuditoriasResponse: Lista de auditorías con metadatos de paginación
@@ -317,14 +338,18 @@ def get_auditoria_logs(
         GET /ordenes-compra/auditoria/logs?proveedor=EQUIPAMIENTOS
         GET /ordenes-compra/auditoria/logs?ruc_proveedor=20601580820
         GET /ordenes-compra/auditoria/logs?contacto=Juan
+        GET /ordenes-compra/auditoria/logs?id_producto=4521
         GET /ordenes-compra/auditoria/logs?fecha_desde=2025-01-01&fecha_hasta=2025-12-31
         GET /ordenes-compra/auditoria/logs?proveedor=GRUPO&tipo_operacion=CREACION&page=1&page_size=10
+        GET /ordenes-compra/auditoria/logs?cursor=&page_size=50
+        GET /ordenes-compra/auditoria/logs?cursor=eyJmIjoi...&page_size=50&conteo=estimado
     """
     try:
         _log_inicio("📋 INICIO - Listado de auditorías de órdenes de compra")
         logger.info(f"Filtros: id_orden={id_orden_compra}, numero_oc={numero_oc}, tipo={tipo_operacion}, "
                    f"usuario={usuario}, proveedor={proveedor}, ruc={ruc_proveedor}, contacto={contacto}, "
-                   f"página={page}, tamaño={page_size}")
+                   f"producto={id_producto}, página={page}, tamaño={page_size}, cursor={cursor}, conteo={conteo}, "
+                   f"archivo={incluir_archivo}")
 
         resultado = use_case.execute(
             id_orden_compra=id_orden_compra,
@@ -337,13 +362,71 @@ def get_auditoria_logs(
             fecha_desde=fecha_desde,
             fecha_hasta=fecha_hasta,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            cursor=cursor,
+            conteo=conteo,
+            id_producto=id_producto,
+            incluir_archivo=incluir_archivo
         )
 
         _log_fin(f"✅ FIN - Página {resultado['page']}/{resultado['total_pages']} - "
                 f"{len(resultado['items'])} auditorías retornadas de {resultado['total']} totales")
         return resultado
+    except CursorAuditoriaInvalidoError as e:
+        _log_error("get_auditoria_logs", e)
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         _log_error("get_auditoria_logs", e)
         raise
 
+
+
+@router.get("/auditoria/export")
+def export_auditoria_logs(
+    formato: Literal["csv", "xlsx"] = Query("csv", alias="format", description="Formato del archivo: csv o xlsx"),
+    id_orden_compra: Optional[int] = Query(None, description="Filtrar por ID de orden de compra"),
+    numero_oc: Optional[str] = Query(None, description="Filtrar por número de OC (correlativo) - búsqueda parcial"),
+    tipo_operacion: Optional[str] = Query(None, description="Filtrar por tipo de operación (CREACION, ACTUALIZACION, ELIMINACION)"),
+    usuario: Optional[str] = Query(None, description="Buscar por nombre del usuario - búsqueda parcial"),
+    proveedor: Optional[str] = Query(None, description="Buscar por razón social del proveedor - búsqueda parcial"),
+    ruc_proveedor: Optional[str] = Query(None, description="Filtrar por RUC del proveedor"),
+    contacto: Optional[str] = Query(None, description="Buscar por nombre del contacto - búsqueda parcial"),
+    id_producto: Optional[int] = Query(None, description="Filtrar auditorías que agregaron, modificaron o eliminaron este producto"),
+    fecha_desde: Optional[datetime] = Query(None, description="Filtrar desde esta fecha (formato: YYYY-MM-DD)"),
+    fecha_hasta: Optional[datetime] = Query(None, description="Filtrar hasta esta fecha (formato: YYYY-MM-DD)"),
+    use_case: ExportarAuditoriaOrdenCompra = Depends(get_exportar_auditoria_orden_compra_use_case)
+):
+    """
+    Exporta el historial de auditoría de órdenes de compra completo a CSV o XLSX.
+
+    Acepta los mismos filtros que /auditoria/logs pero sin paginación: el archivo
+    contiene todas las auditorías que cumplen los filtros, ordenadas de la más
+    reciente a la más antigua. Las filas se leen de la base de datos por lotes y
+    se transmiten a medida que se generan (la memoria no crece con el volumen).
+
+    Examples:
+        GET /ordenes-compra/auditoria/export?format=csv&fecha_desde=2025-01-01&fecha_hasta=2025-03-31
+        GET /ordenes-compra/auditoria/export?format=xlsx&proveedor=GRUPO
+    """
+    _log_inicio(f"📤 INICIO - Exportación de auditorías de órdenes de compra ({formato})")
+
+    contenido = use_case.execute(
+        formato=formato,
+        id_orden_compra=id_orden_compra,
+        numero_oc=numero_oc,
+        tipo_operacion=tipo_operacion,
+        usuario=usuario,
+        proveedor=proveedor,
+        ruc_proveedor=ruc_proveedor,
+        contacto=contacto,
+        fecha_desde=fecha_desde,
+        fecha_hasta=fecha_hasta,
+        id_producto=id_producto
+    )
+
+    media_type = (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        if formato == FORMATO_XLSX else "text/csv; charset=utf-8"
+    )
+    headers = {"Content-Disposition": f'attachment; filename="{nombre_archivo_exportacion(formato)}"'}
+    return StreamingResponse(contenido, media_type=media_type, headers=headers)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 from datetime import datetime
 
 
@@ -44,17 +44,23 @@ class ListarAuditoriasRequest(BaseModel):
     proveedor: Optional[str] = Field(None, description="Buscar por razón social del proveedor")
     ruc_proveedor: Optional[str] = Field(None, description="Filtrar por RUC del proveedor")
     contacto: Optional[str] = Field(None, description="Buscar por nombre del contacto")
+    id_producto: Optional[int] = Field(None, description="Filtrar auditorías que afectaron a este producto")
     fecha_desde: Optional[datetime] = Field(None, description="Fecha desde")
     fecha_hasta: Optional[datetime] = Field(None, description="Fecha hasta")
     page: int = Field(1, description="Número de página", ge=1)
     page_size: int = Field(10, description="Cantidad de registros por página", ge=1, le=100)
+    cursor: Optional[str] = Field(None, description="Cursor de paginación (next_cursor de la respuesta anterior, vacío para la primera página)")
+    conteo: Optional[Literal["exacto", "estimado", "ninguno"]] = Field(None, description="Cálculo del total de registros")
+    incluir_archivo: Optional[bool] = Field(None, description="Incluir auditorías archivadas (por defecto solo si fecha_desde cae en meses archivados)")
 
 
 class ListarAuditoriasResponse(BaseModel):
     """Schema para la respuesta de listado de auditorías"""
 
-    total: int = Field(..., description="Total de registros encontrados")
+    total: Optional[int] = Field(None, description="Total de registros encontrados (None si no se solicitó conteo)")
+    total_estimado: bool = Field(False, description="True si el total es una estimación cacheada")
     items: List[OrdenCompraAuditoriaResponse] = Field(..., description="Lista de auditorías")
     page: int = Field(..., description="Página actual")
     page_size: int = Field(..., description="Cantidad de registros por página")
-    total_pages: int = Field(..., description="Total de páginas disponibles")
+    total_pages: Optional[int] = Field(None, description="Total de páginas disponibles (None si no se solicitó conteo)")
+    next_cursor: Optional[str] = Field(None, description="Cursor para la siguiente página en modo cursor (None si no hay más)")
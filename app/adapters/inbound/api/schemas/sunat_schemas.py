@@ -2,7 +2,10 @@
 Esquemas Pydantic para el endpoint de integración con SUNAT
 """
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
+
+# Máximo de RUC aceptados en una consulta por lote
+MAX_RUCS_POR_LOTE = 500
 
 
 class RepresentanteLegal(BaseModel):
@@ -84,3 +87,22 @@ class SunatErrorResponse(BaseModel):
                 "ruc": "20509430625"
             }
         }
+
+
+class SunatRucsLoteRequest(BaseModel):
+    """
+    Esquema de petición para consultar varios RUC en una sola llamada
+    """
+    rucs: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_RUCS_POR_LOTE,
+        description=f"Números de RUC a consultar (máximo {MAX_RUCS_POR_LOTE})"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "rucs": ["20509430625", "20100070970"]
+            }
+        }
@@ -0,0 +1,99 @@
+import fnmatch
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.ports.services.cache_port import CachePort
+
+
+class MemoryCache(CachePort):
+    """
+    Caché en memoria del proceso con expiración por clave.
+
+    Se usa como respaldo cuando Redis no está disponible: no comparte datos
+    entre workers, pero evita que cada consulta termine en un scraping.
+    """
+
+    def __init__(self, max_entradas: int = 10000):
+        self.max_entradas = max_entradas
+        # key -> (valor, expira_en)
+        self._datos: Dict[str, Tuple[Any, float]] = {}
+
+    def _vigente(self, key: str) -> Optional[Tuple[Any, float]]:
+        item = self._datos.get(key)
+        if item is None:
+            return None
+        if item[1] <= time.monotonic():
+            del self._datos[key]
+            return None
+        return item
+
+    def _guardar(self, key: str, value: Any, ttl_seconds: int) -> None:
+        if len(self._datos) >= self.max_entradas and key not in self._datos:
+            self._purgar()
+        self._datos[key] = (value, time.monotonic() + ttl_seconds)
+
+    def _purgar(self) -> None:
+        """Elimina las claves vencidas y, si no alcanza, las que vencen antes"""
+        ahora = time.monotonic()
+        for key in [k for k, (_, expira) in self._datos.items() if expira <= ahora]:
+            del self._datos[key]
+        exceso = len(self._datos) - self.max_entradas + 1
+        if exceso > 0:
+            for key, _ in sorted(self._datos.items(), key=lambda item: item[1][1])[:exceso]:
+                del self._datos[key]
+
+    async def get(self, key: str) -> Optional[Any]:
+        item = self._vigente(key)
+        return item[0] if item else None
+
+    async def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        return [await self.get(key) for key in keys]
+
+    async def set(self, key: str, value: Any, ttl_seconds: int) -> bool:
+        self._guardar(key, value, ttl_seconds)
+        return True
+
+    async def mset(self, values: Dict[str, Any], ttl_seconds: int) -> bool:
+        for key, value in values.items():
+            self._guardar(key, value, ttl_seconds)
+        return True
+
+    async def delete(self, key: str) -> bool:
+        return self._datos.pop(key, None) is not None
+
+    async def delete_pattern(self, pattern: str) -> int:
+        keys = [key for key in self._datos if fnmatch.fnmatchcase(key, pattern)]
+        for key in keys:
+            del self._datos[key]
+        return len(keys)
+
+    async def exists(self, key: str) -> bool:
+        return self._vigente(key) is not None
+
+    async def adquirir_lock(self, key: str, ttl_seconds: int) -> Optional[str]:
+        if self._vigente(key) is not None:
+            return None
+        token = uuid.uuid4().hex
+        self._guardar(key, token, ttl_seconds)
+        return token
+
+    async def renovar_lock(self, key: str, token: str, ttl_seconds: int) -> bool:
+        item = self._vigente(key)
+        if item is None or item[0] != token:
+            return False
+        self._guardar(key, token, ttl_seconds)
+        return True
+
+    async def liberar_lock(self, key: str, token: str) -> bool:
+        item = self._vigente(key)
+        if item is None or item[0] != token:
+            return False
+        del self._datos[key]
+        return True
+
+    async def health_check(self) -> bool:
+        return True
+
+    async def close(self) -> None:
+        self._datos.clear()
@@ -0,0 +1,240 @@
+"""
+Adaptador de caché sobre redis.asyncio.
+
+- Pool de conexiones explícito compartido por todo el proceso
+- MGET y escrituras múltiples en pipeline (un solo round trip)
+- Borrado por patrón con SCAN + UNLINK (no bloquea Redis como KEYS/DEL)
+- Si Redis no responde se usa un caché en memoria y se vuelve a probar
+  Redis cada `reintento_segundos`
+"""
+import json
+import logging
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from redis.asyncio import ConnectionPool, Redis
+from redis.exceptions import RedisError
+
+from app.adapters.outbound.cache.memory_cache import MemoryCache
+from app.core.ports.services.cache_port import CachePort
+from app.shared.utils.json_encoder import dumps
+
+logger = logging.getLogger(__name__)
+
+# Borra el lock solo si el valor sigue siendo el token de quien lo adquirió
+_LIBERAR_LOCK_LUA = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+  return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Extiende la expiración del lock solo si el valor sigue siendo el token de quien lo adquirió
+_RENOVAR_LOCK_LUA = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+  return redis.call('expire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Claves por lote en SCAN y UNLINK
+TAMANO_LOTE_SCAN = 500
+
+
+def _cargar(data: Optional[str]) -> Optional[Any]:
+    if not data:
+        return None
+    try:
+        return json.loads(data)
+    except ValueError as e:
+        logger.warning(f"⚠️ Valor de caché no es JSON válido: {e}")
+        return None
+
+
+class RedisAsyncCache(CachePort):
+    """Caché en Redis (API async) con respaldo en memoria"""
+
+    def __init__(
+        self,
+        redis_url: str,
+        max_conexiones: int = 20,
+        timeout_segundos: float = 5.0,
+        reintento_segundos: float = 30.0,
+        respaldo: Optional[CachePort] = None
+    ):
+        """
+        Args:
+            redis_url: URL de conexión (ej: redis://localhost:6379)
+            max_conexiones: Tamaño máximo del pool de conexiones
+            timeout_segundos: Timeout de conexión y de cada operación
+            reintento_segundos: Tiempo que se usa el respaldo antes de volver a probar Redis
+            respaldo: Caché usado mientras Redis no está disponible (por defecto en memoria)
+        """
+        self.redis_url = redis_url
+        self.reintento_segundos = reintento_segundos
+        self._pool = ConnectionPool.from_url(
+            redis_url,
+            max_connections=max_conexiones,
+            decode_responses=True,
+            socket_connect_timeout=timeout_segundos,
+            socket_timeout=timeout_segundos
+        )
+        # Crear el cliente no abre conexiones: nunca falla aunque Redis esté caído
+        self.client = Redis(connection_pool=self._pool)
+        self._respaldo = respaldo or MemoryCache()
+        self._disponible = False
+        self._reintentar_en = 0.0
+
+    async def _usar_redis(self) -> bool:
+        """True si Redis está disponible (lo vuelve a probar si pasó el tiempo de reintento)"""
+        if self._disponible:
+            return True
+        if time.monotonic() < self._reintentar_en:
+            return False
+        try:
+            await self.client.ping()
+        except (RedisError, OSError) as e:
+            self._marcar_caido(e)
+            return False
+        self._disponible = True
+        logger.info(f"✅ Conectado a Redis (async): {self.redis_url}")
+        return True
+
+    def _marcar_caido(self, error: Exception) -> None:
+        if self._disponible or self._reintentar_en == 0.0:
+            logger.warning(f"⚠️ Redis no disponible, usando caché en memoria: {error}")
+        self._disponible = False
+        self._reintentar_en = time.monotonic() + self.reintento_segundos
+
+    async def get(self, key: str) -> Optional[Any]:
+        if await self._usar_redis():
+            try:
+                return _cargar(await self.client.get(key))
+            except (RedisError, OSError) as e:
+                self._marcar_caido(e)
+        return await self._respaldo.get(key)
+
+    async def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        if not keys:
+            return []
+        if await self._usar_redis():
+            try:
+                return [_cargar(data) for data in await self.client.mget(keys)]
+            except (RedisError, OSError) as e:
+                self._marcar_caido(e)
+        return await self._respaldo.mget(keys)
+
+    async def set(self, key: str, value: Any, ttl_seconds: int) -> bool:
+        if await self._usar_redis():
+            try:
+                await self.client.set(key, dumps(value), ex=ttl_seconds)
+                return True
+            except (RedisError, OSError) as e:
+                self._marcar_caido(e)
+        return await self._respaldo.set(key, value, ttl_seconds)
+
+    async def mset(self, values: Dict[str, Any], ttl_seconds: int) -> bool:
+        if not values:
+            return True
+        if await self._usar_redis():
+            try:
+                # MSET no admite expiración: SET EX por clave en un pipeline sin transacción
+                async with self.client.pipeline(transaction=False) as pipe:
+                    for key, value in values.items():
+                        pipe.set(key, dumps(value), ex=ttl_seconds)
+                    await pipe.execute()
+                return True
+            except (RedisError, OSError) as e:
+                self._marcar_caido(e)
+        return await self._respaldo.mset(values, ttl_seconds)
+
+    async def delete(self, key: str) -> bool:
+        borrado_respaldo = await self._respaldo.delete(key)
+        if await self._usar_redis():
+            try:
+                return bool(await self.client.unlink(key)) or borrado_respaldo
+            except (RedisError, OSError) as e:
+                self._marcar_caido(e)
+        return borrado_respaldo
+
+    async def delete_pattern(self, pattern: str) -> int:
+        eliminadas = await self._respaldo.delete_pattern(pattern)
+        if await self._usar_redis():
+            try:
+                lote = []
+                async for key in self.client.scan_iter(match=pattern, count=TAMANO_LOTE_SCAN):
+                    lote.append(key)
+                    if len(lote) >= TAMANO_LOTE_SCAN:
+                        eliminadas += await self.client.unlink(*lote)
+                        lote = []
+                if lote:
+                    eliminadas += await self.client.unlink(*lote)
+                logger.info(f"🗑️ Eliminadas {eliminadas} claves con patrón: {pattern}")
+            except (RedisError, OSError) as e:
+                self._marcar_caido(e)
+        return eliminadas
+
+    async def exists(self, key: str) -> bool:
+        if await self._usar_redis():
+            try:
+                return bool(await self.client.exists(key))
+            except (RedisError, OSError) as e:
+                self._marcar_caido(e)
+        return await self._respaldo.exists(key)
+
+    async def adquirir_lock(self, key: str, ttl_seconds: int) -> Optional[str]:
+        if await self._usar_redis():
+            token = uuid.uuid4().hex
+            try:
+                return token if await self.client.set(key, token, nx=True, ex=ttl_seconds) else None
+            except (RedisError, OSError) as e:
+                self._marcar_caido(e)
+        # Sin Redis la coordinación queda limitada al proceso
+        return await self._respaldo.adquirir_lock(key, ttl_seconds)
+
+    async def renovar_lock(self, key: str, token: str, ttl_seconds: int) -> bool:
+        if await self._respaldo.renovar_lock(key, token, ttl_seconds):
+            return True
+        if await self._usar_redis():
+            try:
+                return bool(await self.client.eval(_RENOVAR_LOCK_LUA, 1, key, token, ttl_seconds))
+            except (RedisError, OSError) as e:
+                self._marcar_caido(e)
+        return False
+
+    async def liberar_lock(self, key: str, token: str) -> bool:
+        if await self._respaldo.liberar_lock(key, token):
+            return True
+        if await self._usar_redis():
+            try:
+                return bool(await self.client.eval(_LIBERAR_LOCK_LUA, 1, key, token))
+            except (RedisError, OSError) as e:
+                self._marcar_caido(e)
+        return False
+
+    async def health_check(self) -> bool:
+        return await self._usar_redis()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+        await self._pool.disconnect()
+
+
+# Singleton: un pool de conexiones por proceso
+_redis_async_cache: Optional[RedisAsyncCache] = None
+
+
+def get_redis_async_cache() -> RedisAsyncCache:
+    """Obtiene el caché async del proceso (las conexiones se abren en el primer uso)"""
+    global _redis_async_cache
+    if _redis_async_cache is None:
+        from app.config.settings import get_settings
+
+        settings = get_settings()
+        _redis_async_cache = RedisAsyncCache(
+            settings.redis_url,
+            max_conexiones=settings.redis_max_conexiones,
+            reintento_segundos=settings.redis_reintento_segundos
+        )
+    return _redis_async_cache
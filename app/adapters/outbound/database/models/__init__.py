@@ -16,6 +16,7 @@ from .tasa_cambio_sunat_model import TasaCambioSunatModel
 
 from .ordenes_compra_model import OrdenesCompraModel
 from .ordenes_compra_auditoria_model import OrdenesCompraAuditoriaModel
+from .ordenes_compra_auditoria_producto_model import OrdenesCompraAuditoriaProductoModel
 
 
 
@@ -24,6 +25,7 @@ from .proveedores_model import ProveedoresModel
 from .proveedor_contacto_model import ProveedorContactosModel
 from .proveedor_detalle_model import ProveedorDetalleModel
 from .intermedia_proveedor_contacto_model import intermedia_proveedor_contacto
+from .sunat_ruc_snapshot_model import SunatRucSnapshotModel
 
 # Modelos de productos
 from .productos_model import ProductosModel
@@ -56,10 +58,12 @@ __all__ = [
     "TasaCambioSunatModel",
     "OrdenesCompraModel",
     "OrdenesCompraAuditoriaModel",
+    "OrdenesCompraAuditoriaProductoModel",
     "ProveedoresModel",
     "ProveedorContactosModel",
     "ProveedorDetalleModel",
     "intermedia_proveedor_contacto",
+    "SunatRucSnapshotModel",
     "ProductosModel",
     "CategoriaModel",
     "SubcategoriaModel",
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Text, BIGINT, ForeignKey
+from sqlalchemy import Column, String, DateTime, Text, BIGINT, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .base import Base
@@ -13,6 +13,15 @@ class OrdenesCompraAuditoriaModel(Base):
     Los cambios se almacenan en formato concatenado: "anterior ----> nuevo"
     """
     __tablename__ = "ordenes_compra_auditoria"
+    __table_args__ = (
+        # Índice compuesto para el orden del listado y la paginación por cursor (keyset)
+        Index("ix_ordenes_compra_auditoria_fecha_evento_id", "fecha_evento", "id_auditoria"),
+        # Índices para filtros por igualdad de proveedor/contacto
+        Index("ix_ordenes_compra_auditoria_id_proveedor_anterior", "id_proveedor_anterior"),
+        Index("ix_ordenes_compra_auditoria_id_proveedor_nuevo", "id_proveedor_nuevo"),
+        Index("ix_ordenes_compra_auditoria_id_contacto_anterior", "id_contacto_anterior"),
+        Index("ix_ordenes_compra_auditoria_id_contacto_nuevo", "id_contacto_nuevo"),
+    )
 
     id_auditoria = Column(BIGINT, primary_key=True, autoincrement=True, index=True)
 
@@ -52,10 +61,26 @@ class OrdenesCompraAuditoriaModel(Base):
     cambio_contacto = Column(String(255), nullable=True,
                             comment="Cambio de contacto. Formato: 'id_anterior ----> id_nuevo' o solo 'id'")
 
+    # IDs estructurados de proveedor/contacto (indexados para filtros por igualdad)
+    # En creación/eliminación solo se llena el campo "_nuevo" con el ID de la orden
+    id_proveedor_anterior = Column(BIGINT, nullable=True,
+                                   comment="ID del proveedor anterior (solo si cambió)")
+    id_proveedor_nuevo = Column(BIGINT, nullable=True,
+                                comment="ID del proveedor nuevo o actual")
+    id_contacto_anterior = Column(BIGINT, nullable=True,
+                                  comment="ID del contacto anterior (solo si cambió)")
+    id_contacto_nuevo = Column(BIGINT, nullable=True,
+                               comment="ID del contacto nuevo o actual")
+
     cambio_monto = Column(String(100), nullable=True,
                          comment="Cambio de monto. Formato: 'monto_anterior ----> monto_nuevo' o solo 'monto'")
 
-    # Productos (JSON con solo IDs)
+    # Cambios de productos y otros datos en formato compacto versionado
+    # (ver app/shared/utils/auditoria_codec.py)
+    cambios = Column(Text, nullable=True,
+                     comment="Registro compacto: [version, agregados, modificados, eliminados, adicionales]")
+
+    # Formato anterior (JSON por columna). Solo lo tienen registros sin migrar o archivados
     productos_agregados = Column(Text, nullable=True,
                                 comment="Lista de IDs de productos agregados: [id1, id2, ...]")
 
@@ -65,7 +90,6 @@ class OrdenesCompraAuditoriaModel(Base):
     productos_eliminados = Column(Text, nullable=True,
                                  comment="Lista de IDs de productos eliminados: [id1, id2, ...]")
 
-    # Otros cambios (moneda, pago, entrega) en formato concatenado
     cambios_adicionales = Column(Text, nullable=True,
                                 comment="Otros cambios en JSON. Formato: {'campo': 'anterior ----> nuevo'}")
 
@@ -83,6 +107,9 @@ class OrdenesCompraAuditoriaModel(Base):
     cotizacion_version = relationship("CotizacionesVersionesModel",
                                      foreign_keys=[id_cotizacion_versiones],
                                      backref="auditorias_ordenes_compra")
+    productos_afectados = relationship("OrdenesCompraAuditoriaProductoModel",
+                                       cascade="all, delete-orphan",
+                                       backref="auditoria")
 
     def __repr__(self):
         return f"<OrdenesCompraAuditoria(id={self.id_auditoria}, tipo={self.tipo_operacion}, orden={self.id_orden_compra}, fecha={self.fecha_evento})>"
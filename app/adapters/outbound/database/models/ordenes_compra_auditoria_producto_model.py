@@ -0,0 +1,33 @@
+from sqlalchemy import Column, String, BIGINT, ForeignKey, Index
+from .base import Base
+
+
+class OrdenesCompraAuditoriaProductoModel(Base):
+    """
+    Tabla lateral de productos afectados por cada auditoría de orden de compra.
+
+    Permite responder "qué auditorías tocaron el producto X" con un índice
+    en lugar de parsear los campos JSON productos_agregados/modificados/eliminados.
+    """
+    __tablename__ = "ordenes_compra_auditoria_productos"
+    __table_args__ = (
+        Index("ix_oc_auditoria_productos_producto_auditoria", "id_producto", "id_auditoria"),
+    )
+
+    id = Column(BIGINT, primary_key=True, autoincrement=True)
+
+    id_auditoria = Column(
+        BIGINT,
+        ForeignKey("ordenes_compra_auditoria.id_auditoria", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+        comment="ID de la auditoría"
+    )
+
+    id_producto = Column(BIGINT, nullable=False, comment="ID del producto afectado")
+
+    tipo_cambio = Column(String(20), nullable=False,
+                         comment="AGREGADO, MODIFICADO, ELIMINADO")
+
+    def __repr__(self):
+        return f"<OrdenesCompraAuditoriaProducto(auditoria={self.id_auditoria}, producto={self.id_producto}, tipo={self.tipo_cambio})>"
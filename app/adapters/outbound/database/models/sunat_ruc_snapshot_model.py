@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, Text, DateTime
+from .base import Base
+
+
+class SunatRucSnapshotModel(Base):
+    """
+    Última respuesta de SUNAT guardada por RUC.
+
+    Persiste los datos consultados aunque Redis se vacíe o expulse la clave,
+    para que las consultas de RUC conocidos no esperen un nuevo scraping.
+    """
+    __tablename__ = "sunat_ruc_snapshot"
+
+    ruc = Column(String(11), primary_key=True, comment="Número de RUC")
+    datos = Column(Text, nullable=False, comment="Respuesta de SUNAT (DatosRucDTO serializado a JSON)")
+    fetched_at = Column(DateTime, nullable=False, index=True, comment="Fecha y hora de la consulta a SUNAT")
+
+    def __repr__(self):
+        return f"<SunatRucSnapshot(ruc={self.ruc}, fetched_at={self.fetched_at})>"
@@ -6,4 +6,4 @@ class ValueDolarModel(Base):
     id_dolar = Column(Integer, primary_key=True, autoincrement=True)
     venta = Column(Float)
     compra = Column(Float)
-    fecha = Column(DateTime)
+    fecha = Column(DateTime, index=True)
@@ -337,37 +337,14 @@ class OrdenesCompraRepository(OrdenesCompraRepositoryPort):
                     'precio_total': float(detalle.precio_total) if detalle.precio_total else 0.0
                 })
 
-            # Inicializar servicio de auditoría
+            # Registrar auditoría de todas las órdenes con inserts multi-fila
+            # FIX: Usar directamente las órdenes obtenidas de la BD para evitar errores con contactos duplicados
             auditoria_service = OrdenesCompraAuditoriaService(self.db)
-
-            # Registrar auditoría para cada orden
-            # FIX: Iterar directamente sobre las órdenes obtenidas de la BD para evitar errores con contactos duplicados
-            for orden_bd, razon_social, nombre_contacto in ordenes_bd:
-                total_orden = float(orden_bd.total) if orden_bd.total else 0.0
-                productos = productos_por_orden.get(orden_bd.id_orden, [])
-
-                # Otros datos
-                otros_datos = {
-                    'moneda': orden_bd.moneda,
-                    'pago': orden_bd.pago,
-                    'entrega': orden_bd.entrega,
-                    'consorcio': orden_bd.consorcio,
-                    'igv': orden_bd.igv
-                }
-
-                auditoria_service.registrar_creacion_orden(
-                    id_orden_compra=orden_bd.id_orden,
-                    id_usuario=orden_bd.id_usuario,
-                    id_cotizacion=orden_bd.id_cotizacion,
-                    id_cotizacion_versiones=orden_bd.id_cotizacion_versiones,
-                    id_proveedor=orden_bd.id_proveedor,
-                    id_contacto=orden_bd.id_proveedor_contacto,
-                    productos=productos,
-                    monto_total=total_orden,
-                    otros_datos=otros_datos,
-                    numero_oc=orden_bd.correlative  # Guardar número de OC
-                )
-                logger.debug(f"Auditoría de creación registrada para orden {orden_bd.correlative}")
+            auditoria_service.registrar_creacion_ordenes_batch(
+                ordenes=[orden_bd for orden_bd, _, _ in ordenes_bd],
+                productos_por_orden=productos_por_orden
+            )
+            logger.debug(f"Auditoría de creación registrada para {len(ordenes_bd)} órdenes")
 
             # Ahora sí, hacer commit de TODO (órdenes, detalles, auditorías)
             # Al hacer commit, el evento se disparará automáticamente
@@ -0,0 +1,74 @@
+import json
+import logging
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from sqlalchemy import String, cast, or_
+from sqlalchemy.orm import Session
+
+from app.adapters.outbound.database.models.proveedores_model import ProveedoresModel
+from app.adapters.outbound.database.models.sunat_ruc_snapshot_model import SunatRucSnapshotModel
+from app.core.ports.repositories.ruc_snapshot_repository import RucSnapshotRepositoryPort
+from app.shared.utils.json_encoder import dumps
+
+logger = logging.getLogger(__name__)
+
+# Rango de RUC válidos (11 dígitos) guardados como BIGINT en proveedores
+RUC_MINIMO = 10_000_000_000
+RUC_MAXIMO = 99_999_999_999
+
+
+class RucSnapshotRepository(RucSnapshotRepositoryPort):
+    """
+    Implementación del repositorio de datos de RUC consultados en SUNAT
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def obtener(self, rucs: List[str]) -> Dict[str, Tuple[Dict, datetime]]:
+        if not rucs:
+            return {}
+
+        filas = self.db.query(
+            SunatRucSnapshotModel.ruc,
+            SunatRucSnapshotModel.datos,
+            SunatRucSnapshotModel.fetched_at
+        ).filter(SunatRucSnapshotModel.ruc.in_(rucs)).all()
+
+        resultado = {}
+        for ruc, datos, fetched_at in filas:
+            try:
+                resultado[ruc] = (json.loads(datos), fetched_at)
+            except ValueError as e:
+                logger.error(f"Datos guardados de RUC {ruc} no son JSON válido: {e}")
+        return resultado
+
+    def guardar(self, ruc: str, datos: Dict, fetched_at: datetime) -> None:
+        try:
+            self.db.merge(SunatRucSnapshotModel(ruc=ruc, datos=dumps(datos), fetched_at=fetched_at))
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def rucs_proveedores_a_refrescar(self, limite: int, consultados_antes_de: datetime) -> List[str]:
+        ruc_texto = cast(ProveedoresModel.ruc, String(11))
+        filas = self.db.query(ruc_texto, SunatRucSnapshotModel.fetched_at).outerjoin(
+            SunatRucSnapshotModel, SunatRucSnapshotModel.ruc == ruc_texto
+        ).filter(
+            ProveedoresModel.ruc.between(RUC_MINIMO, RUC_MAXIMO),
+            or_(ProveedoresModel.estado.is_(True), ProveedoresModel.estado.is_(None)),
+            or_(
+                SunatRucSnapshotModel.fetched_at.is_(None),
+                SunatRucSnapshotModel.fetched_at < consultados_antes_de
+            )
+        ).group_by(
+            # Un RUC puede repetirse en varios proveedores
+            ruc_texto, SunatRucSnapshotModel.fetched_at
+        ).order_by(
+            # En MySQL los NULL van primero en orden ascendente: primero los nunca consultados
+            SunatRucSnapshotModel.fetched_at.asc()
+        ).limit(limite).all()
+
+        return [fila[0] for fila in filas]
@@ -1,8 +1,9 @@
 from app.core.ports.repositories.tipo_cambio_repository import TipoCambioRepositoryPort
 from app.adapters.outbound.database.models.tasa_cambio_sunat_model import TasaCambioSunatModel
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from decimal import Decimal
-from typing import Optional, cast
+from typing import Optional, List, Tuple, cast
 from datetime import date
 import logging
 
@@ -67,3 +68,55 @@ class TipoCambioRepository(TipoCambioRepositoryPort):
         except Exception as e:
             logger.error(f"Error al obtener tipo de cambio por fecha: {e}")
             return None
+
+    def obtener_historial_tipo_cambio(self) -> List[Tuple[date, Decimal]]:
+        """
+        Obtiene el historial completo de tipos de cambio (venta) ordenado por fecha ascendente
+
+        Si existen varios registros para una misma fecha se conserva el último insertado.
+
+        Returns:
+            List[Tuple[date, Decimal]]: Pares (fecha, venta), uno por fecha
+        """
+        try:
+            filas = self.db.query(
+                TasaCambioSunatModel.fecha,
+                TasaCambioSunatModel.venta
+            ).order_by(
+                TasaCambioSunatModel.fecha.asc(),
+                TasaCambioSunatModel.tasa_cambio_sunat_id.asc()
+            ).all()
+
+            historial: List[Tuple[date, Decimal]] = []
+            for fecha, venta in filas:
+                if historial and historial[-1][0] == fecha:
+                    historial[-1] = (fecha, venta)
+                else:
+                    historial.append((fecha, venta))
+
+            logger.info(f"Historial de tipo de cambio obtenido: {len(historial)} fechas")
+            return historial
+
+        except Exception as e:
+            logger.error(f"Error al obtener historial de tipo de cambio: {e}")
+            return []
+
+    def obtener_ultima_version_tipo_cambio(self) -> Optional[Tuple[int, date]]:
+        """
+        Obtiene el id y la fecha del último registro de tipo de cambio
+
+        Returns:
+            Tuple[int, date]: (id máximo, fecha máxima), None si no hay datos o falla la consulta
+        """
+        try:
+            ultimo_id, ultima_fecha = self.db.query(
+                func.max(TasaCambioSunatModel.tasa_cambio_sunat_id),
+                func.max(TasaCambioSunatModel.fecha)
+            ).one()
+            if ultimo_id is None:
+                return None
+            return ultimo_id, ultima_fecha
+
+        except Exception as e:
+            logger.error(f"Error al obtener la versión del tipo de cambio: {e}")
+            return None
@@ -2,7 +2,7 @@
 Repositorio para el valor del dólar
 """
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import List, Optional, Tuple
 from app.adapters.outbound.database.models.value_dolar_model import ValueDolarModel
 from datetime import datetime
 import logging
@@ -47,4 +47,26 @@ class ValorDolarRepository:
             return self.db.query(ValueDolarModel).order_by(ValueDolarModel.id_dolar.desc()).first()
         except Exception as e:
             logger.error(f"Error al consultar el último valor del dólar: {e}")
-            return None 
+            return None
+
+    def fetch_serie_venta(self, desde: datetime, hasta: datetime) -> List[Tuple[datetime, float]]:
+        """
+        Obtener (fecha, venta) de los registros con desde <= fecha < hasta, en orden cronológico.
+
+        Solo lee las columnas necesarias y filtra por el índice de `fecha`.
+        """
+        try:
+            return [
+                (fecha, venta)
+                for fecha, venta in self.db.query(ValueDolarModel.fecha, ValueDolarModel.venta)
+                .filter(
+                    ValueDolarModel.fecha >= desde,
+                    ValueDolarModel.fecha < hasta,
+                    ValueDolarModel.venta.isnot(None)
+                )
+                .order_by(ValueDolarModel.fecha, ValueDolarModel.id_dolar)
+                .all()
+            ]
+        except Exception as e:
+            logger.error(f"Error al consultar la serie del valor del dólar: {e}")
+            return []
@@ -0,0 +1,136 @@
+"""
+Proveedores del tipo de cambio del dólar.
+
+Cada proveedor sabe descargar su fuente y convertirla en una CotizacionDolar.
+El parseo está separado de la descarga (`parsear`) para poder probarlo con
+HTML/JSON guardado, y los selectores CSS se compilan una sola vez al importar.
+
+Para agregar una fuente: subclase de ProveedorTipoCambio + entrada en PROVEEDORES.
+"""
+import json
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Type
+
+import requests
+import soupsieve as sv
+from bs4 import BeautifulSoup
+
+CABECERAS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
+    "Accept-Language": "es-PE,es;q=0.9",
+}
+
+# Rango en el que se acepta un tipo de cambio PEN/USD (descarta valores mal parseados)
+TIPO_CAMBIO_MINIMO = 2.0
+TIPO_CAMBIO_MAXIMO = 6.0
+
+
+class CotizacionInvalidaError(Exception):
+    """La fuente respondió, pero sin un tipo de cambio utilizable"""
+
+
+@dataclass(frozen=True)
+class CotizacionDolar:
+    """Compra y venta del dólar según una fuente"""
+    compra: float
+    venta: float
+    fuente: str
+
+    def validar(self) -> "CotizacionDolar":
+        """
+        Raises:
+            CotizacionInvalidaError: Si los valores están fuera de rango o la compra supera a la venta
+        """
+        for nombre, valor in (("compra", self.compra), ("venta", self.venta)):
+            if not TIPO_CAMBIO_MINIMO <= valor <= TIPO_CAMBIO_MAXIMO:
+                raise CotizacionInvalidaError(f"{self.fuente}: {nombre} fuera de rango ({valor})")
+        if self.compra > self.venta:
+            raise CotizacionInvalidaError(f"{self.fuente}: compra ({self.compra}) mayor que venta ({self.venta})")
+        return self
+
+    def a_dict(self) -> Dict:
+        """Formato que guarda ValorDolarRepository.create_valor_dolar"""
+        return {
+            "compra": self.compra,
+            "venta": self.venta,
+            "fecha": datetime.now().strftime("%d-%m-%Y %H:%M")
+        }
+
+
+class ProveedorTipoCambio(ABC):
+    """Fuente del tipo de cambio: descarga con requests (en un thread) y parseo puro"""
+
+    nombre: str = ""
+    url: str = ""
+
+    def descargar(self, session: requests.Session, timeout: float) -> str:
+        """Contenido de la fuente (bloqueante)"""
+        respuesta = session.get(self.url, timeout=timeout)
+        respuesta.raise_for_status()
+        return respuesta.text
+
+    @abstractmethod
+    def parsear(self, contenido: str) -> CotizacionDolar:
+        """
+        Convierte el contenido descargado en una cotización
+
+        Raises:
+            CotizacionInvalidaError: Si el contenido no tiene la forma esperada
+        """
+        pass
+
+
+def _numero(texto: str, fuente: str) -> float:
+    try:
+        return float(texto.strip().replace(",", "."))
+    except ValueError:
+        raise CotizacionInvalidaError(f"{fuente}: valor no numérico '{texto.strip()[:20]}'")
+
+
+class SecurexProveedor(ProveedorTipoCambio):
+    """Casa de cambio Securex (HTML de la página principal)"""
+
+    nombre = "securex"
+    url = "https://securex.pe/"
+
+    SELECTOR_COMPRA = sv.compile("div#item_compra span")
+    SELECTOR_VENTA = sv.compile("div#item_venta span")
+
+    def parsear(self, contenido: str) -> CotizacionDolar:
+        soup = BeautifulSoup(contenido, "html.parser")
+        compra = self.SELECTOR_COMPRA.select(soup)
+        venta = self.SELECTOR_VENTA.select(soup)
+        # El valor está en el segundo <span> de cada bloque
+        if len(compra) < 2 or len(venta) < 2:
+            raise CotizacionInvalidaError(f"{self.nombre}: no se encontraron los bloques de compra y venta")
+        return CotizacionDolar(
+            compra=_numero(compra[1].get_text(), self.nombre),
+            venta=_numero(venta[1].get_text(), self.nombre),
+            fuente=self.nombre
+        )
+
+
+class SunatApisNetPeProveedor(ProveedorTipoCambio):
+    """Tipo de cambio oficial SUNAT publicado por apis.net.pe (JSON)"""
+
+    nombre = "sunat_apis_net_pe"
+    url = "https://api.apis.net.pe/v1/tipo-cambio-sunat"
+
+    def parsear(self, contenido: str) -> CotizacionDolar:
+        try:
+            datos = json.loads(contenido)
+            return CotizacionDolar(
+                compra=float(datos["compra"]),
+                venta=float(datos["venta"]),
+                fuente=self.nombre
+            )
+        except (ValueError, KeyError, TypeError) as e:
+            raise CotizacionInvalidaError(f"{self.nombre}: respuesta inesperada ({e})")
+
+
+PROVEEDORES: Dict[str, Type[ProveedorTipoCambio]] = {
+    SecurexProveedor.nombre: SecurexProveedor,
+    SunatApisNetPeProveedor.nombre: SunatApisNetPeProveedor,
+}
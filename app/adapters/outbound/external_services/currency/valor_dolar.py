@@ -1,33 +1,166 @@
+"""
+Obtención del tipo de cambio del dólar desde varias fuentes a la vez.
+
+Las fuentes configuradas se consultan en paralelo (la descarga con requests
+corre en threads, fuera del event loop), cada una con reintentos y backoff
+exponencial. Con quorum 1 se usa el primer resultado válido que llega; con
+quorum N se espera a que N fuentes coincidan (dentro de la tolerancia) y se
+usa la mediana de las que coinciden.
+"""
+import asyncio
+import logging
+import random
+import threading
+from typing import Dict, List, Optional
+
 import requests
-from bs4 import BeautifulSoup
-from datetime import datetime
+
+from app.adapters.outbound.external_services.currency.proveedores import (
+    CABECERAS,
+    PROVEEDORES,
+    CotizacionDolar,
+    CotizacionInvalidaError,
+    ProveedorTipoCambio,
+)
+from app.shared.utils.admission_governor import get_admission_governor
+
+logger = logging.getLogger(__name__)
+
+# Espera base del backoff entre reintentos de una fuente (se duplica en cada intento)
+BACKOFF_BASE_SEGUNDOS = 0.5
+
 
 class ValorDolar:
-    def __init__(self):
-        self.url = 'https://securex.pe/'
-        self.session = requests.Session()  # Reutilizar la sesión para eficiencia
+    """Consulta concurrente del tipo de cambio con reintentos y quorum"""
 
-    def obtener_cambio(self):
-        """Obtener los valores de compra y venta del dólar"""
-        try:
-            response = self.session.get(self.url, timeout=10)
-            response.raise_for_status()  # Levantar error si el estado no es 200
-        except requests.RequestException as e:
-            print(f"Error en la solicitud HTTP: {e}")
-            return None
+    def __init__(
+        self,
+        proveedores: List[ProveedorTipoCambio],
+        quorum: int = 1,
+        tolerancia: float = 0.05,
+        reintentos: int = 2,
+        timeout: float = 10.0
+    ):
+        """
+        Args:
+            proveedores: Fuentes a consultar
+            quorum: Fuentes que deben coincidir para aceptar el valor (1 = la primera válida)
+            tolerancia: Diferencia máxima de venta entre fuentes para considerarlas coincidentes
+            reintentos: Reintentos por fuente tras un error de red o un valor inválido
+                        (cualquier otro error descarta la fuente sin reintentar)
+            timeout: Timeout en segundos de cada petición HTTP
+        """
+        if not proveedores:
+            raise ValueError("Se necesita al menos una fuente de tipo de cambio")
+        self.proveedores = proveedores
+        self.quorum = max(1, min(quorum, len(proveedores)))
+        self.tolerancia = tolerancia
+        self.reintentos = reintentos
+        self.timeout = timeout
+        self.session = requests.Session()  # Reutilizar conexiones keep-alive entre consultas
+        self.session.headers.update(CABECERAS)
+        # Límite de consultas compartido por endpoint y job programado
+        self.governor = get_admission_governor("valor_dolar")
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+    async def obtener_cambio(self) -> Optional[Dict]:
+        """
+        Obtener los valores de compra y venta del dólar
 
-        try:
-            compra_value = float(soup.find('div', id='item_compra').find_all('span')[1].text.strip())
-            venta_value = float(soup.find('div', id='item_venta').find_all('span')[1].text.strip())
-            print("Valores obtenidos:", compra_value, venta_value)
-        except (AttributeError, ValueError) as e:
-            print(f"Error al extraer datos del HTML: {e}")
+        Returns:
+            Dict: {"compra", "venta", "fecha"} o None si no se alcanzó un valor válido
+
+        Raises:
+            AdmisionRechazadaError: Si hay demasiadas consultas en curso o en espera
+        """
+        async with self.governor.admitir():
+            cotizacion = await self._consultar_fuentes()
+        if cotizacion is None:
             return None
+        print("Valores obtenidos:", cotizacion.compra, cotizacion.venta, f"({cotizacion.fuente})")
+        return cotizacion.a_dict()
+
+    async def _consultar_fuentes(self) -> Optional[CotizacionDolar]:
+        tareas = [asyncio.create_task(self._consultar_con_reintentos(p)) for p in self.proveedores]
+        validas: List[CotizacionDolar] = []
+        try:
+            for siguiente in asyncio.as_completed(tareas):
+                cotizacion = await siguiente
+                if cotizacion is None:
+                    continue
+                validas.append(cotizacion)
+                acuerdo = self._acuerdo(validas)
+                if acuerdo is not None:
+                    return acuerdo
+        finally:
+            # Las fuentes que faltan ya no hacen falta (un thread en curso termina solo)
+            for tarea in tareas:
+                tarea.cancel()
+
+        if validas:
+            logger.error(
+                f"❌ Fuentes del tipo de cambio sin quorum ({self.quorum}): "
+                + ", ".join(f"{c.fuente}={c.venta}" for c in validas)
+            )
+        else:
+            logger.error("❌ Ninguna fuente del tipo de cambio respondió un valor válido")
+        return None
+
+    def _acuerdo(self, validas: List[CotizacionDolar]) -> Optional[CotizacionDolar]:
+        """Mediana del mayor grupo de cotizaciones cuya venta difiere a lo sumo `tolerancia`, si alcanza el quorum"""
+        if self.quorum == 1:
+            return validas[0]
+        ordenadas = sorted(validas, key=lambda c: c.venta)
+        mejor: List[CotizacionDolar] = []
+        inicio = 0
+        for fin in range(len(ordenadas)):
+            while ordenadas[fin].venta - ordenadas[inicio].venta > self.tolerancia:
+                inicio += 1
+            if fin - inicio + 1 > len(mejor):
+                mejor = ordenadas[inicio:fin + 1]
+        return mejor[len(mejor) // 2] if len(mejor) >= self.quorum else None
+
+    async def _consultar_con_reintentos(self, proveedor: ProveedorTipoCambio) -> Optional[CotizacionDolar]:
+        for intento in range(self.reintentos + 1):
+            try:
+                contenido = await asyncio.to_thread(proveedor.descargar, self.session, self.timeout)
+                return proveedor.parsear(contenido).validar()
+            except (requests.RequestException, CotizacionInvalidaError) as e:
+                logger.warning(f"⚠️ Tipo de cambio {proveedor.nombre}, intento {intento + 1}: {e}")
+            except Exception as e:
+                # Error inesperado (ej: la página cambió y el parser falla): reintentar no
+                # lo arregla y no debe tumbar la consulta de las demás fuentes
+                logger.error(f"❌ Fuente de tipo de cambio {proveedor.nombre} descartada: {e}", exc_info=True)
+                return None
+            if intento < self.reintentos:
+                await asyncio.sleep(BACKOFF_BASE_SEGUNDOS * 2 ** intento + random.uniform(0, BACKOFF_BASE_SEGUNDOS))
+        return None
+
+
+# Singleton: una sesión HTTP y un gobernador de admisión por proceso
+_valor_dolar: Optional[ValorDolar] = None
+_singleton_lock = threading.Lock()
+
+
+def get_valor_dolar() -> ValorDolar:
+    """Obtiene el consultor del tipo de cambio con las fuentes de DOLAR_FUENTES"""
+    global _valor_dolar
+    if _valor_dolar is None:
+        with _singleton_lock:
+            if _valor_dolar is None:
+                from app.config.settings import get_settings
 
-        return {
-            "compra": compra_value,
-            "venta": venta_value,
-            "fecha": datetime.now().strftime("%d-%m-%Y %H:%M")
-        } 
\ No newline at end of file
+                settings = get_settings()
+                nombres = [n.strip() for n in settings.dolar_fuentes.split(",") if n.strip()]
+                desconocidas = [n for n in nombres if n not in PROVEEDORES]
+                if desconocidas:
+                    raise ValueError(
+                        f"Fuentes de tipo de cambio desconocidas: {desconocidas}. Disponibles: {list(PROVEEDORES)}"
+                    )
+                _valor_dolar = ValorDolar(
+                    proveedores=[PROVEEDORES[n]() for n in nombres],
+                    quorum=settings.dolar_quorum,
+                    tolerancia=settings.dolar_tolerancia,
+                    reintentos=settings.dolar_reintentos,
+                    timeout=settings.dolar_timeout
+                )
+    return _valor_dolar
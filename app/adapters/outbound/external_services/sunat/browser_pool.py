@@ -0,0 +1,307 @@
+"""
+Pool persistente de navegadores Playwright para el scraping de SUNAT.
+
+Lanzar Chromium y crear un contexto cuesta segundos y cientos de MB por
+consulta. El pool mantiene un navegador vivo con N contextos+páginas ya
+creados; cada consulta toma una página libre, la usa y la devuelve limpia.
+
+- Las páginas se reinician entre consultas (about:blank + cookies borradas + pestañas extra cerradas)
+- Una página que terminó con error se descarta y se crea otra
+- El navegador se recicla tras `max_usos` consultas o si se cae: se lanza uno
+  nuevo y el anterior se cierra cuando se devuelve su última página
+- Si no hay página libre en `timeout_cola` segundos se lanza PoolNavegadorOcupadoError
+- Cada contexto aborta las peticiones de tipos no esenciales (imágenes, fuentes...)
+"""
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, FrozenSet, Iterable, Optional
+
+from playwright.async_api import Browser, BrowserContext, Page, Playwright, Route, async_playwright
+
+logger = logging.getLogger(__name__)
+
+ARGS_NAVEGADOR = [
+    '--disable-blink-features=AutomationControlled',
+    '--no-sandbox',
+    '--disable-dev-shm-usage'
+]
+
+OPCIONES_CONTEXTO = dict(
+    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
+    viewport={'width': 1920, 'height': 1080},
+    locale='es-PE',
+    timezone_id='America/Lima'
+)
+
+
+class PoolNavegadorOcupadoError(Exception):
+    """No se liberó ninguna página del pool dentro del tiempo de espera"""
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        super().__init__(f"No hay navegadores disponibles para consultar SUNAT (esperado {timeout:.0f}s)")
+
+
+class _Slot:
+    """Contexto + página del pool, asociado a la generación de navegador que lo creó"""
+
+    def __init__(self, context: BrowserContext, page: Page, generacion: int):
+        self.context = context
+        self.page = page
+        self.generacion = generacion
+
+
+class BrowserPool:
+    """
+    Pool de páginas Playwright (API async) sobre un navegador Chromium persistente.
+
+    Uso:
+        async with pool.pagina() as page:
+            await page.goto(...)
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_usos: int = 200,
+        timeout_cola: float = 30.0,
+        headless: bool = True,
+        recursos_bloqueados: Iterable[str] = ()
+    ):
+        """
+        Args:
+            size: Cantidad de contextos/páginas abiertos en paralelo
+            max_usos: Consultas tras las cuales se recicla el navegador
+            timeout_cola: Segundos máximos esperando una página libre
+            headless: Ejecutar Chromium sin interfaz
+            recursos_bloqueados: Tipos de recurso Playwright a abortar (image, font, media, stylesheet...)
+        """
+        self.size = size
+        self.max_usos = max_usos
+        self.timeout_cola = timeout_cola
+        self.headless = headless
+        self.recursos_bloqueados: FrozenSet[str] = frozenset(recursos_bloqueados)
+        self._bloqueados = 0
+
+        self._playwright: Optional[Playwright] = None
+        self._navegadores: Dict[int, Browser] = {}
+        self._slots_vivos: Dict[int, int] = {}
+        self._generacion = 0
+        self._usos = 0
+        self._faltantes = 0
+        self._libres: Optional[asyncio.Queue] = None
+        self._lock = asyncio.Lock()
+        self._iniciado = False
+
+    @property
+    def _navegador(self) -> Optional[Browser]:
+        return self._navegadores.get(self._generacion)
+
+    async def start(self) -> None:
+        """Lanza el navegador y crea las páginas del pool (idempotente)"""
+        async with self._lock:
+            if self._iniciado:
+                return
+            self._playwright = await async_playwright().start()
+            self._libres = asyncio.Queue()
+            try:
+                await self._lanzar_navegador()
+                for _ in range(self.size):
+                    self._libres.put_nowait(await self._crear_slot())
+            except Exception:
+                for navegador in self._navegadores.values():
+                    await navegador.close()
+                self._navegadores.clear()
+                self._slots_vivos.clear()
+                await self._playwright.stop()
+                self._playwright = None
+                raise
+            self._iniciado = True
+            logger.info(f"✅ Pool de navegadores SUNAT iniciado: {self.size} páginas (headless={self.headless})")
+
+    async def stop(self) -> None:
+        """Cierra todos los navegadores y detiene Playwright"""
+        async with self._lock:
+            if not self._iniciado:
+                return
+            self._iniciado = False
+            for navegador in list(self._navegadores.values()):
+                try:
+                    await navegador.close()
+                except Exception as e:
+                    logger.warning(f"Error al cerrar navegador del pool: {e}")
+            self._navegadores.clear()
+            self._slots_vivos.clear()
+            if self._playwright:
+                await self._playwright.stop()
+                self._playwright = None
+            logger.info("🛑 Pool de navegadores SUNAT detenido")
+
+    async def _lanzar_navegador(self) -> None:
+        """Lanza un navegador nuevo como generación actual"""
+        self._generacion += 1
+        self._usos = 0
+        navegador = await self._playwright.chromium.launch(headless=self.headless, args=ARGS_NAVEGADOR)
+        self._navegadores[self._generacion] = navegador
+        self._slots_vivos[self._generacion] = 0
+        logger.info(f"Navegador SUNAT lanzado (generación {self._generacion})")
+
+    async def _crear_slot(self) -> _Slot:
+        """Crea contexto + página en el navegador actual (relanzándolo si se cayó)"""
+        if self._navegador is None or not self._navegador.is_connected():
+            logger.warning("Navegador SUNAT desconectado, lanzando uno nuevo")
+            await self._lanzar_navegador()
+        context = await self._navegador.new_context(**OPCIONES_CONTEXTO)
+        if self.recursos_bloqueados:
+            await context.route("**/*", self._filtrar_recurso)
+        page = await context.new_page()
+        self._slots_vivos[self._generacion] += 1
+        return _Slot(context, page, self._generacion)
+
+    async def _filtrar_recurso(self, route: Route) -> None:
+        """Aborta las peticiones de tipos no esenciales; el resto continúa sin cambios"""
+        if route.request.resource_type in self.recursos_bloqueados:
+            self._bloqueados += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _descartar_slot(self, slot: _Slot) -> None:
+        """Cierra el contexto y, si era la última página de un navegador anterior, cierra ese navegador"""
+        try:
+            await slot.context.close()
+        except Exception:
+            pass
+        self._slots_vivos[slot.generacion] = self._slots_vivos.get(slot.generacion, 1) - 1
+
+        if slot.generacion != self._generacion and self._slots_vivos[slot.generacion] <= 0:
+            navegador = self._navegadores.pop(slot.generacion, None)
+            self._slots_vivos.pop(slot.generacion, None)
+            if navegador:
+                try:
+                    await navegador.close()
+                except Exception:
+                    pass
+                logger.info(f"Navegador SUNAT generación {slot.generacion} cerrado")
+
+    async def _reponer_faltantes(self) -> None:
+        """Recrea las páginas que no se pudieron reponer antes (ej: navegador caído)"""
+        async with self._lock:
+            while self._faltantes > 0:
+                try:
+                    self._libres.put_nowait(await self._crear_slot())
+                    self._faltantes -= 1
+                except Exception as e:
+                    logger.error(f"❌ No se pudo reponer la página del pool: {e}")
+                    return
+
+    async def _tomar(self) -> _Slot:
+        if self._faltantes:
+            await self._reponer_faltantes()
+        try:
+            slot = await asyncio.wait_for(self._libres.get(), timeout=self.timeout_cola)
+        except asyncio.TimeoutError:
+            raise PoolNavegadorOcupadoError(self.timeout_cola)
+
+        # El navegador de esta página pudo caerse o reciclarse mientras estaba libre
+        if slot.generacion != self._generacion or not self._navegadores[slot.generacion].is_connected():
+            async with self._lock:
+                await self._descartar_slot(slot)
+                try:
+                    slot = await self._crear_slot()
+                except Exception:
+                    self._faltantes += 1
+                    raise
+        return slot
+
+    async def _devolver(self, slot: _Slot, ok: bool) -> None:
+        async with self._lock:
+            self._usos += 1
+            if self._usos >= self.max_usos and slot.generacion == self._generacion:
+                logger.info(f"Navegador SUNAT alcanzó {self._usos} usos, reciclando")
+                try:
+                    await self._lanzar_navegador()
+                except Exception as e:
+                    logger.error(f"❌ No se pudo lanzar el navegador de reemplazo: {e}", exc_info=True)
+
+            if ok and slot.generacion == self._generacion and not slot.page.is_closed():
+                try:
+                    # Dejar la página limpia para la siguiente consulta (incluidas las
+                    # páginas hermanas que la consulta haya abierto en el contexto)
+                    for otra in slot.context.pages:
+                        if otra is not slot.page:
+                            await otra.close()
+                    await slot.context.clear_cookies()
+                    await slot.page.goto('about:blank')
+                    self._libres.put_nowait(slot)
+                    return
+                except Exception as e:
+                    logger.warning(f"No se pudo reiniciar la página del pool: {e}")
+
+            await self._descartar_slot(slot)
+            try:
+                self._libres.put_nowait(await self._crear_slot())
+            except Exception as e:
+                # Se reintenta antes de la próxima consulta
+                self._faltantes += 1
+                logger.error(f"❌ No se pudo reponer la página del pool: {e}", exc_info=True)
+
+    @asynccontextmanager
+    async def pagina(self) -> AsyncIterator[Page]:
+        """
+        Presta una página del pool durante el bloque.
+
+        Raises:
+            PoolNavegadorOcupadoError: Si no se libera una página en timeout_cola segundos
+        """
+        if not self._iniciado:
+            await self.start()
+
+        slot = await self._tomar()
+        ok = False
+        try:
+            yield slot.page
+            ok = True
+        finally:
+            await self._devolver(slot, ok)
+
+    def estado(self) -> Dict[str, int]:
+        """Métricas básicas del pool"""
+        return {
+            "size": self.size,
+            "libres": self._libres.qsize() if self._libres else 0,
+            "faltantes": self._faltantes,
+            "generacion": self._generacion,
+            "usos_generacion": self._usos,
+            "navegadores_abiertos": len(self._navegadores),
+            "recursos_bloqueados": self._bloqueados,
+        }
+
+
+def _es_produccion() -> bool:
+    # Usar headless=True en producción (Railway/Docker) y headless=False en local
+    # Railway y otros entornos cloud suelen definir PORT o RAILWAY_ENVIRONMENT
+    return os.getenv('RAILWAY_ENVIRONMENT') is not None or os.path.exists('/.dockerenv')
+
+
+# Singleton: un pool por proceso
+_browser_pool: Optional[BrowserPool] = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """Obtiene el pool de navegadores del proceso (se inicia en el lifespan o en el primer uso)"""
+    global _browser_pool
+    if _browser_pool is None:
+        from app.config.settings import get_settings
+
+        settings = get_settings()
+        _browser_pool = BrowserPool(
+            size=settings.sunat_pool_size,
+            max_usos=settings.sunat_pool_max_usos,
+            timeout_cola=settings.sunat_pool_timeout_cola,
+            headless=_es_produccion(),
+            recursos_bloqueados=[t.strip() for t in settings.sunat_recursos_bloqueados.split(",") if t.strip()]
+        )
+    return _browser_pool
@@ -2,6 +2,19 @@ from dataclasses import dataclass, field, asdict
 from typing import Optional
 from datetime import datetime
 
+# Mensaje de error cuando SUNAT indica que el RUC no existe (resultado negativo cacheable)
+ERROR_RUC_NO_ENCONTRADO = "El RUC no existe en el padrón de SUNAT"
+
+
+def limpiar_texto(texto: Optional[str]) -> str:
+    """
+    Texto de una celda de SUNAT con los espacios normalizados ("  A \n B " -> "A B").
+
+    Lo usan la consulta por navegador y la consulta HTTP para que ambas
+    devuelvan el mismo valor para el mismo campo.
+    """
+    return " ".join(texto.split()) if texto else ""
+
 
 @dataclass
 class RepresentanteLegalDTO:
@@ -70,6 +83,35 @@ class DatosRucDTO:
             **({"error": self.error} if self.error else {})
         }
 
+    def asignar_domicilio_fiscal(self, texto_completo_domicilio_fiscal: str) -> None:
+        """
+        Separa el domicilio fiscal de SUNAT ("DIRECCION DEPARTAMENTO - PROVINCIA - DISTRITO")
+        en dirección, departamento, provincia y distrito
+        """
+        if texto_completo_domicilio_fiscal == "-":
+            self.direccion = "No especificado"
+            self.departamento = "No especificado"
+            self.provincia = "No especificado"
+            self.distrito = "No especificado"
+            return
+
+        partes = texto_completo_domicilio_fiscal.rsplit("-", 2)
+        if len(partes) == 3:
+            self.distrito = partes[2].strip()
+            self.provincia = partes[1].strip()
+            direccion_y_depto = partes[0].strip()
+
+            partes_direccion = direccion_y_depto.rsplit(" ", 1)
+            if len(partes_direccion) == 2:
+                self.departamento = partes_direccion[1].strip()
+                self.direccion = partes_direccion[0].strip()
+            else:
+                self.direccion = direccion_y_depto
+                self.departamento = "No especificado"
+        else:
+            self.direccion = texto_completo_domicilio_fiscal.strip()
+            self.departamento = self.provincia = self.distrito = "No especificado"
+
     @classmethod
     def crear_error(cls, numero_documento: str, mensaje_error: str) -> 'DatosRucDTO':
         """Factory method para crear una respuesta de error"""
@@ -78,3 +120,8 @@ class DatosRucDTO:
             razon_social="Error en consulta",
             error=mensaje_error
         )
+
+    @classmethod
+    def crear_no_encontrado(cls, numero_documento: str) -> 'DatosRucDTO':
+        """Factory method para un RUC que SUNAT no reconoce"""
+        return cls.crear_error(numero_documento, ERROR_RUC_NO_ENCONTRADO)
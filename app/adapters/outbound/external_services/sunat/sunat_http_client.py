@@ -0,0 +1,250 @@
+"""
+Consulta de RUC en SUNAT por HTTP simple (sin navegador).
+
+Reproduce lo que hace el formulario de búsqueda: GET de la página (cookies
+de sesión + campos ocultos), POST del RUC y parseo del HTML de resultados
+con BeautifulSoup. Cuando aparece un captcha o el HTML no tiene la forma
+esperada (o el parser falla por cualquier otro motivo) se lanza
+SunatHttpNoDisponibleError para que el llamador use el navegador.
+"""
+import asyncio
+import queue
+import random
+import re
+import string
+from typing import Dict, Optional
+from urllib.parse import urljoin
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+from app.adapters.outbound.external_services.sunat.dto import DatosRucDTO, RepresentanteLegalDTO, limpiar_texto
+
+URL_BUSQUEDA = "https://e-consultaruc.sunat.gob.pe/cl-ti-itmrconsruc/FrameCriterioBusquedaWeb.jsp"
+
+CABECERAS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
+    "Accept-Language": "es-PE,es;q=0.9",
+}
+
+_PATRON_NO_ENCONTRADO = re.compile(r"no existe|no es v[aá]lido|no se encontr", re.IGNORECASE)
+
+
+class SunatHttpNoDisponibleError(Exception):
+    """La consulta por HTTP no se pudo completar y debe hacerse con el navegador"""
+
+    def __init__(self, motivo: str, detalle: str):
+        self.motivo = motivo
+        super().__init__(f"{motivo}: {detalle}")
+
+
+class CaptchaSunatError(SunatHttpNoDisponibleError):
+    def __init__(self, detalle: str = "SUNAT pidió captcha"):
+        super().__init__("captcha", detalle)
+
+
+class MarcadoInesperadoError(SunatHttpNoDisponibleError):
+    def __init__(self, detalle: str):
+        super().__init__("marcado", detalle)
+
+
+def _generar_token() -> str:
+    """Token aleatorio como el que genera el JavaScript de la página de búsqueda"""
+    return "".join(random.choices(string.ascii_lowercase + string.digits, k=52))
+
+
+def _campos_formulario(form) -> Dict[str, str]:
+    """Campos con nombre de un formulario (inputs y selects) y sus valores actuales"""
+    campos = {}
+    for campo in form.find_all(["input", "select"]):
+        nombre = campo.get("name")
+        if not nombre or campo.get("type") in ("button", "submit", "radio", "checkbox"):
+            continue
+        campos[nombre] = campo.get("value", "")
+    return campos
+
+
+def _texto(elemento) -> str:
+    # Igual que textContent del navegador: nodos de texto concatenados, luego espacios normalizados
+    return limpiar_texto(elemento.get_text()) if elemento is not None else ""
+
+
+def parsear_resultado(html: str, ruc: str) -> DatosRucDTO:
+    """
+    Convierte la página de resultados de SUNAT en un DatosRucDTO (sin ubigeo ni secciones secundarias).
+
+    Raises:
+        CaptchaSunatError: Si la página pide captcha
+        MarcadoInesperadoError: Si no tiene la estructura de la página de resultados
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    encabezados = soup.select("h4.list-group-item-heading")
+
+    if len(encabezados) < 2:
+        texto = soup.get_text(" ", strip=True)
+        if soup.find("input", attrs={"name": "codigo"}) or "captcha" in html.lower():
+            raise CaptchaSunatError()
+        if _PATRON_NO_ENCONTRADO.search(texto):
+            return DatosRucDTO.crear_no_encontrado(ruc)
+        raise MarcadoInesperadoError("no se encontró el encabezado de resultados")
+
+    dto = DatosRucDTO(numero_documento=ruc)
+    ruc_info = _texto(encabezados[1])
+    if " - " not in ruc_info:
+        raise MarcadoInesperadoError(f"encabezado de RUC inesperado: {ruc_info[:40]}")
+    dto.razon_social = ruc_info.split(" - ", 1)[1]
+
+    datos = soup.select("p.list-group-item-text")
+    if len(datos) < 7:
+        raise MarcadoInesperadoError(f"se esperaban al menos 7 datos y hay {len(datos)}")
+    dto.tipo_contribuyente = _texto(datos[0])
+    dto.nombre_comercial = _texto(datos[1])
+    dto.fecha_inicio_actividades = _texto(datos[3])
+    dto.activo = _texto(datos[4]) == "ACTIVO"
+    dto.condicion_contribuyente = _texto(datos[5])
+    dto.asignar_domicilio_fiscal(_texto(datos[6]))
+
+    tablas = soup.select(".tblResultado")
+    if tablas:
+        filas_rubros = tablas[0].find_all("tr")
+        if len(filas_rubros) >= 1:
+            dto.actividad_economica = _texto(filas_rubros[0])
+        if len(filas_rubros) >= 2:
+            dto.actividad_economica2 = _texto(filas_rubros[1])
+    if len(tablas) >= 4:
+        filas_agente = tablas[3].find_all("tr")
+        dto.es_agente_retencion = bool(filas_agente) and _texto(filas_agente[0]) != "NINGUNO"
+
+    return dto
+
+
+def parsear_trabajadores(html: str, dto: DatosRucDTO) -> None:
+    """Completa trabajadores y prestadores de servicios desde la vista de cantidad de trabajadores"""
+    filas = BeautifulSoup(html, "html.parser").select("table.table tbody tr")
+    if not filas:
+        raise MarcadoInesperadoError("vista de trabajadores sin tabla")
+    celdas = filas[-1].find_all("td")
+    if len(celdas) < 4:
+        raise MarcadoInesperadoError("tabla de trabajadores con columnas inesperadas")
+    dto.numero_trabajadores = _texto(celdas[1])
+    dto.prestadores_de_servicios = _texto(celdas[3])
+
+
+def parsear_representantes(html: str, dto: DatosRucDTO) -> None:
+    """Completa el primer representante legal desde la vista de representantes legales"""
+    filas = BeautifulSoup(html, "html.parser").select("table.table tbody tr")
+    if not filas:
+        raise MarcadoInesperadoError("vista de representantes sin tabla")
+    celdas = filas[0].find_all("td")
+    if len(celdas) < 5:
+        raise MarcadoInesperadoError("tabla de representantes con columnas inesperadas")
+    dto.representante_legal = RepresentanteLegalDTO(
+        tipo_documento=_texto(celdas[0]),
+        nro_documento=_texto(celdas[1]),
+        nombre=_texto(celdas[2]),
+        cargo=_texto(celdas[3]),
+        fecha_desde=_texto(celdas[4])
+    )
+
+
+class SunatHttpClient:
+    """
+    Cliente HTTP para la consulta de RUC.
+
+    Mantiene un pool de sesiones `requests` (conexiones keep-alive reutilizadas);
+    cada consulta usa una sesión a la vez y empieza sin cookies.
+    """
+
+    def __init__(self, sesiones: int = 4, timeout: float = 10.0):
+        self.timeout = timeout
+        self._sesiones: "queue.Queue[requests.Session]" = queue.Queue()
+        for _ in range(sesiones):
+            session = requests.Session()
+            session.headers.update(CABECERAS)
+            session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+            self._sesiones.put(session)
+
+    async def consultar_ruc(self, ruc: str) -> DatosRucDTO:
+        """
+        Consulta un RUC sin navegador (la E/S bloqueante corre en un thread).
+
+        Raises:
+            SunatHttpNoDisponibleError: Captcha, HTML inesperado, error HTTP o fallo del parser
+        """
+        return await asyncio.to_thread(self._consultar, ruc)
+
+    def _consultar(self, ruc: str) -> DatosRucDTO:
+        session = self._sesiones.get()
+        try:
+            session.cookies.clear()
+            return self._flujo(session, ruc)
+        except SunatHttpNoDisponibleError:
+            raise
+        except requests.RequestException as e:
+            raise SunatHttpNoDisponibleError("http", str(e))
+        except Exception as e:
+            # Un cambio de formato que el parser no detectó (AttributeError, IndexError...)
+            raise SunatHttpNoDisponibleError("parseo", f"{type(e).__name__}: {e}")
+        finally:
+            self._sesiones.put(session)
+
+    def _flujo(self, session: requests.Session, ruc: str) -> DatosRucDTO:
+        # 1. Página de búsqueda: cookies de sesión y campos del formulario
+        respuesta = session.get(URL_BUSQUEDA, timeout=self.timeout)
+        respuesta.raise_for_status()
+        soup = BeautifulSoup(respuesta.text, "html.parser")
+        form = soup.find("form")
+        if form is None:
+            raise MarcadoInesperadoError("la página de búsqueda no tiene formulario")
+        if soup.find("input", attrs={"name": "codigo"}):
+            raise CaptchaSunatError()
+
+        campos = _campos_formulario(form)
+        campos.update({"accion": "consPorRuc", "nroRuc": ruc, "search1": ruc})
+        if "token" in campos and not campos["token"]:
+            campos["token"] = _generar_token()
+        url_consulta = urljoin(respuesta.url, form.get("action") or "jcrS00Alias")
+
+        # 2. POST del RUC y parseo de la página de resultados
+        respuesta = session.post(url_consulta, data=campos, timeout=self.timeout, headers={"Referer": URL_BUSQUEDA})
+        respuesta.raise_for_status()
+        dto = parsear_resultado(respuesta.text, ruc)
+        if dto.error:
+            return dto
+
+        # 3. Secciones secundarias, solo si la página ofrece el botón correspondiente
+        resultado = BeautifulSoup(respuesta.text, "html.parser")
+        form_resultado = resultado.find("form")
+        base = _campos_formulario(form_resultado) if form_resultado else {}
+        base.update({"nroRuc": ruc, "desRuc": dto.razon_social, "contexto": base.get("contexto", "ti-it")})
+        url_seccion = urljoin(respuesta.url, (form_resultado.get("action") if form_resultado else None) or "jcrS00Alias")
+
+        for selector, accion, parser in (
+            (".btnInfNumTra", "getCantTrab", parsear_trabajadores),
+            (".btnInfRepLeg", "getRepLeg", parsear_representantes),
+        ):
+            if resultado.select_one(selector) is None:
+                continue
+            seccion = session.post(url_seccion, data={**base, "accion": accion}, timeout=self.timeout)
+            seccion.raise_for_status()
+            parser(seccion.text, dto)
+
+        return dto
+
+
+# Singleton: un pool de sesiones HTTP por proceso
+_sunat_http_client: Optional[SunatHttpClient] = None
+
+
+def get_sunat_http_client() -> SunatHttpClient:
+    global _sunat_http_client
+    if _sunat_http_client is None:
+        from app.config.settings import get_settings
+
+        settings = get_settings()
+        _sunat_http_client = SunatHttpClient(
+            sesiones=settings.sunat_http_sesiones,
+            timeout=settings.sunat_http_timeout
+        )
+    return _sunat_http_client
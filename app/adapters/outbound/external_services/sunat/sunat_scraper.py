@@ -1,145 +1,139 @@
-import pandas as pd
-import pickle
-import os
-import threading
-from typing import Dict, Optional, Any # Nuevo import para tipos
-from app.adapters.outbound.external_services.sunat.dto import DatosRucDTO, RepresentanteLegalDTO
-from playwright.sync_api import sync_playwright, Page
+import asyncio
+import math
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, Any # Nuevo import para tipos
+from app.adapters.outbound.external_services.sunat.dto import DatosRucDTO, RepresentanteLegalDTO, limpiar_texto
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+from app.adapters.outbound.external_services.sunat.browser_pool import (
+    BrowserPool,
+    PoolNavegadorOcupadoError,
+    get_browser_pool
+)
+from app.adapters.outbound.external_services.sunat.ubigeo import UbigeoMap
+from app.adapters.outbound.external_services.sunat.sunat_http_client import (
+    SunatHttpClient,
+    SunatHttpNoDisponibleError,
+    get_sunat_http_client
+)
+from app.shared.utils.admission_governor import AdmisionRechazadaError
+
+
+@dataclass(frozen=True)
+class TiemposSunat:
+  """Timeouts (ms) de cada paso del scraping, configurables por entorno"""
+  navegacion_ms: int = 30000
+  resultado_ms: int = 20000
+  seccion_ms: int = 10000
+  boton_ms: int = 2000
+
+  @classmethod
+  def desde_settings(cls) -> "TiemposSunat":
+    from app.config.settings import get_settings
+    settings = get_settings()
+    return cls(
+        navegacion_ms=settings.sunat_timeout_navegacion_ms,
+        resultado_ms=settings.sunat_timeout_resultado_ms,
+        seccion_ms=settings.sunat_timeout_seccion_ms,
+        boton_ms=settings.sunat_timeout_boton_ms
+    )
+
+
+# Selector que solo existe en la página de resultados (encabezado "Número de RUC")
+SELECTOR_RESULTADO = 'h4.list-group-item-heading >> nth=1'
+
+# Espera a que cargue la página de resultados o el aviso de RUC inexistente
+_JS_RESULTADO_O_NO_ENCONTRADO = """() =>
+  document.querySelectorAll('h4.list-group-item-heading').length > 1 ||
+  /no existe|no es v[aá]lido|no se encontr/i.test(document.body ? document.body.innerText : '')
+"""
+
+
+# Hace que los formularios de la página abran su resultado en otra pestaña del mismo contexto
+_JS_FORMULARIOS_EN_PESTANA_NUEVA = "() => document.querySelectorAll('form').forEach(f => f.target = '_blank')"
+
+
+async def _abrir_en_pagina_hermana(page: Page, selector: str, tiempos: TiemposSunat) -> Optional[Page]:
+  """
+  Abre la vista secundaria de `selector` en una página nueva del mismo contexto.
 
-# Obtener el directorio donde está ubicado este archivo
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-NOMBRE_CSV = os.path.join(SCRIPT_DIR, 'ubigeo_distritos.csv')
-NOMBRE_PICKLE = os.path.join(SCRIPT_DIR, 'ubigeo_map.pkl')
+  Los botones de la página de resultados envían un formulario; redirigiéndolo a
+  otra pestaña la página principal queda intacta y no hace falta volver con
+  "Nueva Consulta". Devuelve None si el botón no aparece en `boton_ms`
+  (la sección no existe para este RUC); un botón que se pinta tarde se espera.
+  """
+  boton_loc = page.locator(selector)
+  try:
+    await boton_loc.wait_for(state='visible', timeout=tiempos.boton_ms)
+  except PlaywrightTimeoutError:
+    return None
+
+  async with page.context.expect_page(timeout=tiempos.seccion_ms) as nueva_pagina:
+    await page.evaluate(_JS_FORMULARIOS_EN_PESTANA_NUEVA)
+    await boton_loc.click(timeout=tiempos.seccion_ms)
+  return await nueva_pagina.value
+
+
+async def _extraer_seccion(
+    nombre: str,
+    pagina: Optional[Page],
+    extractor: Callable[[Page], Awaitable[None]],
+    tiempos: TiemposSunat
+) -> None:
+  """Ejecuta el extractor de una sección opcional con su propio timeout y cierra su página"""
+  if pagina is None:
+    print(f"No se encontró la sección {nombre}. Se asume que no existe para este RUC.")
+    return
+  try:
+    await asyncio.wait_for(extractor(pagina), timeout=tiempos.seccion_ms / 1000)
+  except (asyncio.TimeoutError, PlaywrightTimeoutError):
+    print(f"La sección {nombre} no cargó dentro del tiempo límite.")
+  except Exception as e:
+    print(f"Error al extraer {nombre}: {e}")
+  finally:
+    try:
+      await pagina.close()
+    except Exception:
+      pass
 
 
-def get_archivo_pickle():
-    # Implementación mínima para satisfacer tu esqueleto original
-    return NOMBRE_PICKLE
+async def _extraer_trabajadores(page: Page, dto: DatosRucDTO) -> None:
+  """Extrae trabajadores y prestadores de servicios de la vista de cantidad de trabajadores"""
+  tabla_loc = page.locator('table.table')
+  await tabla_loc.wait_for(state='visible')
 
+  ultima_fila = tabla_loc.locator('tbody tr').last
+  dto.numero_trabajadores = limpiar_texto(await ultima_fila.locator('td').nth(1).text_content())
+  dto.prestadores_de_servicios = limpiar_texto(await ultima_fila.locator('td').nth(3).text_content())
 
-class UbigeoMap:
-    """
-    Clase Singleton para cargar y mantener el mapa de Distrito -> Ubigeo
-    de forma persistente (usando pickle) en memoria.
-    """
-    _instance = None
-    _lock = threading.Lock()
-    _ubigeo_map: Optional[Dict[str, Any]] = None
-
-    def __new__(cls, *args, **kwargs):
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super(UbigeoMap, cls).__new__(cls)
-                    cls._instance._load_map() # Cargar el mapa al crear la instancia
-        return cls._instance
-
-    def _load_map(self):
-        """
-        Intenta cargar el mapa desde el archivo pickle. Si falla, lo regenera desde CSV.
-        Esta función solo se llama UNA VEZ al inicio.
-        """
-        # 1. Intentar cargar desde Pickle
-        if os.path.exists(NOMBRE_PICKLE):
-            try:
-                with open(NOMBRE_PICKLE, 'rb') as f:
-                    self._ubigeo_map = pickle.load(f)
-                print(f"[OK] UbigeoMap cargado desde {NOMBRE_PICKLE} (Persistencia). Total: {len(self._ubigeo_map)} distritos.")
-                return
-            except Exception as e:
-                print(f"[ERROR] Error al cargar {NOMBRE_PICKLE}: {e}. Regenerando desde CSV.")
-
-        # 2. Si el pickle falla, regenerar desde CSV
-        print(f"[INFO] Generando UbigeoMap desde {NOMBRE_CSV} (Lento).")
-        try:
-            # Verificar que el archivo existe
-            if not os.path.exists(NOMBRE_CSV):
-                raise FileNotFoundError(f"No se encontró el archivo: {NOMBRE_CSV}")
-
-            print(f"[INFO] Archivo CSV encontrado en: {NOMBRE_CSV}")
-
-            # Usar encoding='utf-8-sig' para manejar el BOM automáticamente
-            # El separador es coma, no punto y coma
-            df = pd.read_csv(NOMBRE_CSV, sep=',', encoding='utf-8-sig')
-            print(f"[INFO] CSV cargado. Filas: {len(df)}, Columnas: {list(df.columns)}")
-
-            # Limpiar el dataframe
-            df = df.dropna(subset=['Distrito', 'Ubigeo']).drop_duplicates(subset=['Distrito'])
-            print(f"[INFO] Después de limpieza. Filas: {len(df)}")
-
-            # La clave es convertir a MAYÚSCULAS para que la búsqueda sea robusta
-            diccionario_ubigeo = df.set_index(
-                df['Distrito'].str.strip().str.upper()
-            ).to_dict()['Ubigeo']
-
-            self._ubigeo_map = diccionario_ubigeo
-            print(f"[INFO] Diccionario creado con {len(self._ubigeo_map)} distritos")
-
-            # Guardar el diccionario como pickle para el futuro
-            with open(NOMBRE_PICKLE, 'wb') as f:
-                pickle.dump(diccionario_ubigeo, f)
-            print(f"[OK] UbigeoMap generado y guardado en {NOMBRE_PICKLE} para persistencia.")
-
-        except FileNotFoundError as e:
-            print(f"[ERROR] El archivo CSV '{NOMBRE_CSV}' no fue encontrado.")
-            print(f"[ERROR] Ruta completa: {os.path.abspath(NOMBRE_CSV)}")
-            print(f"[ERROR] Directorio actual: {os.getcwd()}")
-            print(f"[ERROR] Error: {e}")
-            self._ubigeo_map = {} # Devolver un diccionario vacío para evitar fallos
-        except Exception as e:
-            print(f"[ERROR] Fallo la generacion del UbigeoMap desde CSV: {e}")
-            import traceback
-            print(f"[ERROR] Traceback: {traceback.format_exc()}")
-            self._ubigeo_map = {}
-            
-
-    def obtener_ubigeo(self, distrito: str) -> str:
-        """
-        Busca el Ubigeo. Retorna el código o "Sin ubigeo" si no lo encuentra.
-        """
-        if not self._ubigeo_map:
-            return "Sin ubigeo (Error de carga)"
-            
-        # Limpiar el input para que coincida con la clave del diccionario (MAYÚSCULAS)
-        distrito_limpio = distrito.strip().upper() 
-        
-        # Búsqueda instantánea O(1)
-        ubigeo = self._ubigeo_map.get(distrito_limpio)
-        
-        return str(ubigeo).strip() if ubigeo else "Sin ubigeo"
-
-
-def _extraer_trabajadores(page: Page, dto: DatosRucDTO) -> None:
-  """Extrae información de trabajadores y prestadores de servicios"""
-  try:
-    boton_trabajadores_loc = page.locator('.btnInfNumTra')
-
-    if boton_trabajadores_loc.is_visible():
-        boton_trabajadores_loc.click()
-        page.wait_for_load_state('networkidle')
-
-        if page.locator('table.table').is_visible():
-            ultima_fila = page.locator('table.table tbody tr').last
-            dto.numero_trabajadores = ultima_fila.locator('td').nth(1).text_content()
-            dto.prestadores_de_servicios = ultima_fila.locator('td').nth(3).text_content()
-            page.click('.btnNuevaConsulta')
-            page.wait_for_load_state('networkidle')
-  except Exception as e:
-    print(f"Error al extraer trabajadores: {e}")
+
+async def _extraer_representantes_legales(page: Page, dto: DatosRucDTO) -> None:
+  """Extrae el primer representante legal de la vista de representantes legales"""
+  tabla_representantes_loc = page.locator('table.table')
+  await tabla_representantes_loc.wait_for(state='visible')
+  celdas = tabla_representantes_loc.locator('tbody tr').first.locator('td')
+
+  dto.representante_legal = RepresentanteLegalDTO(
+        tipo_documento=limpiar_texto(await celdas.nth(0).text_content()),
+        nro_documento=limpiar_texto(await celdas.nth(1).text_content()),
+        nombre=limpiar_texto(await celdas.nth(2).text_content()),
+        cargo=limpiar_texto(await celdas.nth(3).text_content()),
+        fecha_desde=limpiar_texto(await celdas.nth(4).text_content())
+    )
+  print("Representante legal extraído con éxito.")
 
 
-def _extraer_rubros(page: Page, dto: DatosRucDTO) -> None:
+async def _extraer_rubros(page: Page, dto: DatosRucDTO) -> None:
   """Extrae actividades económicas y las asigna al DTO"""
   try:
     tabla_rubros = page.locator('.tblResultado').nth(0)
     filas_en_tabla = tabla_rubros.locator('tr')
-    numero_filas = filas_en_tabla.count()
+    numero_filas = await filas_en_tabla.count()
 
     if numero_filas >= 1:
-        dto.actividad_economica = filas_en_tabla.nth(0).text_content().strip()
+        dto.actividad_economica = limpiar_texto(await filas_en_tabla.nth(0).text_content())
 
     if numero_filas >= 2:
-        dto.actividad_economica2 = filas_en_tabla.nth(1).text_content().strip()
+        dto.actividad_economica2 = limpiar_texto(await filas_en_tabla.nth(1).text_content())
     else:
         print("Solo se encontró una actividad económica.")
   except Exception as e:
@@ -148,160 +142,152 @@ def _extraer_rubros(page: Page, dto: DatosRucDTO) -> None:
 
 class SunatScrapper:
   """
-  Servicio que realiza web scraping en la pagina de la SUNAT
+  Servicio que realiza web scraping en la pagina de la SUNAT.
+
+  Primero intenta la consulta por HTTP simple (sunat_http_client.py); si SUNAT
+  pide captcha o el HTML no es el esperado, usa una página prestada por el pool
+  de navegadores persistente (ver browser_pool.py).
   """
 
-  def __init__(self, headless: bool = True) -> None:
+  def __init__(
+      self,
+      browser_pool: Optional[BrowserPool] = None,
+      tiempos: Optional[TiemposSunat] = None,
+      http_client: Optional[SunatHttpClient] = None
+  ) -> None:
+    from app.config.settings import get_settings
+
     self.url = "https://e-consultaruc.sunat.gob.pe/cl-ti-itmrconsruc/FrameCriterioBusquedaWeb.jsp"
     self.ubigeo_map = UbigeoMap()
-    self.headless = headless  # Por defecto True para Docker/producción
-
-  def consultar_ruc(self,ruc_numero)->Dict:
+    self.browser_pool = browser_pool or get_browser_pool()
+    self.tiempos = tiempos or TiemposSunat.desde_settings()
+    if http_client is None and get_settings().sunat_modo_http:
+      http_client = get_sunat_http_client()
+    self.http_client = http_client
+    self._metricas = {"http": 0, "navegador": 0, "fallback": {}}
+
+  def metricas(self) -> Dict[str, Any]:
+    """Consultas resueltas por cada estrategia y motivos de fallback al navegador"""
+    return {
+        "http": self._metricas["http"],
+        "navegador": self._metricas["navegador"],
+        "fallback": dict(self._metricas["fallback"]),
+        "http_habilitado": self.http_client is not None,
+    }
+
+  async def consultar_ruc(self, ruc_numero) -> Dict:
     """
-        Realiza web scraping en la página de la SUNAT para obtener datos de un RUC.
+        Obtiene los datos de un RUC desde la página de la SUNAT.
 
         Args:
             ruc_numero (str): Número de RUC a consultar
         Returns:
             dict: Diccionario con toda la información del RUC
     """
+    if self.http_client is not None:
+      try:
+        dto = await self.http_client.consultar_ruc(ruc_numero)
+        if not dto.error:
+          dto.ubigeo = self.ubigeo_map.obtener_ubigeo(dto.distrito, dto.provincia, dto.departamento)
+        self._metricas["http"] += 1
+        return dto.to_dict()
+      except SunatHttpNoDisponibleError as e:
+        fallback = self._metricas["fallback"]
+        fallback[e.motivo] = fallback.get(e.motivo, 0) + 1
+        print(f"Consulta HTTP de RUC {ruc_numero} no disponible ({e}), usando navegador")
+
+    self._metricas["navegador"] += 1
+    return await self._consultar_con_navegador(ruc_numero)
+
+  async def _consultar_con_navegador(self, ruc_numero) -> Dict:
+    """
+    Realiza web scraping con Playwright en una página del pool
 
-    try:
-      with sync_playwright() as p:
-        # Lanzar navegador con argumentos para evitar detección
-        browser = p.chromium.launch(
-            headless=self.headless,
-            args=[
-                '--disable-blink-features=AutomationControlled',
-                '--no-sandbox',
-                '--disable-dev-shm-usage'
-            ]
-        )
-
-        # Crear contexto con user agent realista
-        context = browser.new_context(
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
-            viewport={'width': 1920, 'height': 1080},
-            locale='es-PE',
-            timezone_id='America/Lima'
-        )
-
-        page = context.new_page()
-
-        # Navegar con timeout más largo y esperar hasta networkidle
-        page.goto(self.url, wait_until='networkidle', timeout=60000)
+    Raises:
+        AdmisionRechazadaError: Si no se liberó una página del pool a tiempo
+    """
 
-        # Esperar un poco para simular comportamiento humano
-        page.wait_for_timeout(1000)
+    try:
+      tiempos = self.tiempos
+      async with self.browser_pool.pagina() as page:
+        # Basta con el DOM y el campo de búsqueda: no esperar networkidle (imágenes, analytics...)
+        await page.goto(self.url, wait_until='domcontentloaded', timeout=tiempos.navegacion_ms)
+        await page.wait_for_selector('#txtRuc', state='visible', timeout=tiempos.navegacion_ms)
 
-        page.fill('#txtRuc', ruc_numero)
-        page.wait_for_timeout(500)
+        await page.fill('#txtRuc', ruc_numero)
+        await page.click('#btnAceptar')
 
-        page.click('#btnAceptar')
-        page.wait_for_load_state('networkidle', timeout=60000)
-        page.wait_for_selector('h4.list-group-item-heading', timeout=30000)
+        # La página de resultados está lista cuando aparece su encabezado
+        await page.wait_for_function(_JS_RESULTADO_O_NO_ENCONTRADO, timeout=tiempos.resultado_ms)
+        if await page.locator(SELECTOR_RESULTADO).count() == 0:
+          print(f"SUNAT no reconoce el RUC {ruc_numero}")
+          return DatosRucDTO.crear_no_encontrado(ruc_numero).to_dict()
 
         print("Extrayendo información...")
 
         # Inicializar DTO
         dto = DatosRucDTO(numero_documento=ruc_numero)
 
-        # Extraer datos y poblar DTO
-        self._extraer_datos_basicos(page, dto)
-        _extraer_trabajadores(page, dto)
-        page.wait_for_timeout(1000)
-        self._extraer_representantes_legales(page, dto)
-
-        context.close()
-        browser.close()
+        # Abrir las vistas secundarias en páginas hermanas y extraer todo en paralelo:
+        # la consulta tarda lo que la sección más lenta y no la suma de todas
+        pagina_trabajadores = await self._abrir_seccion(page, '.btnInfNumTra', 'trabajadores')
+        pagina_representantes = await self._abrir_seccion(page, '.btnInfRepLeg', 'representantes legales')
+
+        await asyncio.gather(
+            self._extraer_datos_basicos(page, dto),
+            _extraer_seccion(
+                'trabajadores', pagina_trabajadores,
+                lambda p: _extraer_trabajadores(p, dto), tiempos
+            ),
+            _extraer_seccion(
+                'representantes legales', pagina_representantes,
+                lambda p: _extraer_representantes_legales(p, dto), tiempos
+            ),
+        )
 
       return dto.to_dict()
 
+    except PoolNavegadorOcupadoError as e:
+      # Pool lleno es carga, no un fallo del scraping: 503 + Retry-After como el gobernador
+      raise AdmisionRechazadaError("sunat", "navegadores_ocupados", max(1, math.ceil(e.timeout)))
     except Exception as e:
       print(f"Error al consultar RUC {ruc_numero}: {e}")
       return DatosRucDTO.crear_error(ruc_numero, str(e)).to_dict()
 
-  def _extraer_datos_basicos(self, page: Page, dto: DatosRucDTO) -> None:
+  async def _extraer_datos_basicos(self, page: Page, dto: DatosRucDTO) -> None:
     """Extrae datos básicos y los asigna al DTO"""
     try:
-      ruc_info = page.locator('h4.list-group-item-heading').nth(1).inner_text()
-      dto.razon_social = ruc_info.split(' - ')[1].strip()
-
-      dto.tipo_contribuyente = page.locator('p.list-group-item-text').nth(0).inner_text()
-      dto.nombre_comercial = page.locator('p.list-group-item-text').nth(1).inner_text()
-      dto.fecha_inicio_actividades = page.locator('p.list-group-item-text').nth(3).inner_text()
-      dto.activo = page.locator('p.list-group-item-text').nth(4).inner_text() == "ACTIVO"
-      dto.condicion_contribuyente = page.locator('p.list-group-item-text').nth(5).inner_text()
-
-      texto_completo_domicilio_fiscal = page.locator('p.list-group-item-text').nth(6).inner_text()
-
-      if texto_completo_domicilio_fiscal == "-":
-          dto.direccion = "No especificado"
-          dto.departamento = "No especificado"
-          dto.provincia = "No especificado"
-          dto.distrito = "No especificado"
-      else:
-          partes = texto_completo_domicilio_fiscal.rsplit("-", 2)
-          if len(partes) == 3:
-              dto.distrito = partes[2].strip()
-              dto.provincia = partes[1].strip()
-              direccion_y_depto = partes[0].strip()
-
-              partes_direccion = direccion_y_depto.rsplit(" ", 1)
-              if len(partes_direccion) == 2:
-                  dto.departamento = partes_direccion[1].strip()
-                  dto.direccion = partes_direccion[0].strip()
-              else:
-                  dto.direccion = direccion_y_depto
-                  dto.departamento = "No especificado"
-          else:
-              dto.direccion = texto_completo_domicilio_fiscal.strip()
-              dto.departamento = dto.provincia = dto.distrito = "No especificado"
-
-      dto.ubigeo = self.ubigeo_map.obtener_ubigeo(dto.distrito)
+      # textContent normalizado, igual que la consulta HTTP (sunat_http_client._texto)
+      ruc_info = limpiar_texto(await page.locator('h4.list-group-item-heading').nth(1).text_content())
+      dto.razon_social = ruc_info.split(' - ', 1)[1]
+
+      datos = page.locator('p.list-group-item-text')
+      dto.tipo_contribuyente = limpiar_texto(await datos.nth(0).text_content())
+      dto.nombre_comercial = limpiar_texto(await datos.nth(1).text_content())
+      dto.fecha_inicio_actividades = limpiar_texto(await datos.nth(3).text_content())
+      dto.activo = limpiar_texto(await datos.nth(4).text_content()) == "ACTIVO"
+      dto.condicion_contribuyente = limpiar_texto(await datos.nth(5).text_content())
+
+      dto.asignar_domicilio_fiscal(limpiar_texto(await datos.nth(6).text_content()))
+
+      dto.ubigeo = self.ubigeo_map.obtener_ubigeo(dto.distrito, dto.provincia, dto.departamento)
 
       # Extraer rubros
-      _extraer_rubros(page, dto)
+      await _extraer_rubros(page, dto)
 
       # Verificar agente de retención
       tabla_agente = page.locator('.tblResultado').nth(3)
-      primera_fila = tabla_agente.locator('tr').nth(0).text_content()
+      primera_fila = limpiar_texto(await tabla_agente.locator('tr').nth(0).text_content())
       dto.es_agente_retencion = primera_fila != "NINGUNO"
 
     except Exception as e:
       print(f"Error al extraer datos básicos: {e}")
       dto.error = str(e)
 
-  @staticmethod
-  def _extraer_representantes_legales(page: Page, dto: DatosRucDTO) -> None:
-    """Extrae información del representante legal"""
+  async def _abrir_seccion(self, page: Page, selector: str, nombre: str) -> Optional[Page]:
+    """Abre una vista secundaria sin que un fallo interrumpa el resto de la consulta"""
     try:
-      boton_representantes_loc = page.locator('.btnInfRepLeg')
-      print("Buscando botón de Representantes Legales...")
-
-      boton_representantes_loc.click(timeout=5000) 
-
-        # Si el click tuvo éxito, esperamos a que la nueva información cargue.
-      page.wait_for_load_state('networkidle', timeout=10000)
-      tabla_representantes_loc = page.locator('table.table')
-      tabla_representantes_loc.wait_for(state='visible', timeout=5000)
-      primera_fila = tabla_representantes_loc.locator('tbody tr').first
-        
-      dto.representante_legal = RepresentanteLegalDTO(
-            tipo_documento=primera_fila.locator('td').nth(0).text_content().strip(),
-            nro_documento=primera_fila.locator('td').nth(1).text_content().strip(),
-            nombre=primera_fila.locator('td').nth(2).text_content().strip(),
-            cargo=primera_fila.locator('td').nth(3).text_content().strip(),
-            fecha_desde=primera_fila.locator('td').nth(4).text_content().strip()
-        )
-      print("Representante legal extraído con éxito.")
-
-    except TimeoutError:
-        # Esto es normal si el RUC no tiene representantes legales visibles.
-        # El error ocurre porque el .click() esperó 5 segundos y el botón nunca apareció.
-        print("No se encontró el botón de Representantes Legales. Se asume que no existe para este RUC.")
+      return await _abrir_en_pagina_hermana(page, selector, self.tiempos)
     except Exception as e:
-        # Captura cualquier otro error inesperado durante la extracción.
-        print(f"Error inesperado al extraer representantes legales: {e}")
-
-    
\ No newline at end of file
+      print(f"No se pudo abrir la sección {nombre}: {e}")
+      return None
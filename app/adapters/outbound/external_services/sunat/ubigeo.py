@@ -0,0 +1,148 @@
+"""
+Búsqueda de ubigeo (código INEI de 6 dígitos) a partir del distrito de SUNAT.
+
+El archivo ubigeo_distritos.csv (Distrito,Ubigeo) se lee con la librería
+estándar la primera vez que se busca un ubigeo, no al importar el módulo.
+Las claves se normalizan (sin tildes, mayúsculas, sin signos ni espacios
+repetidos) y los distritos homónimos se desambiguan con el departamento
+(2 primeros dígitos del ubigeo) y la provincia (4 primeros dígitos).
+"""
+import csv
+import difflib
+import os
+import re
+import threading
+import unicodedata
+from typing import Dict, List, Optional
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+NOMBRE_CSV = os.path.join(SCRIPT_DIR, 'ubigeo_distritos.csv')
+
+# Similitud mínima para aceptar un distrito escrito distinto (ej: "MAGDALENA DEL MAR" / "MAGDALENA MAR")
+SIMILITUD_MINIMA = 0.88
+
+DEPARTAMENTOS = {
+    '01': 'AMAZONAS', '02': 'ANCASH', '03': 'APURIMAC', '04': 'AREQUIPA', '05': 'AYACUCHO',
+    '06': 'CAJAMARCA', '07': 'CALLAO', '08': 'CUSCO', '09': 'HUANCAVELICA', '10': 'HUANUCO',
+    '11': 'ICA', '12': 'JUNIN', '13': 'LA LIBERTAD', '14': 'LAMBAYEQUE', '15': 'LIMA',
+    '16': 'LORETO', '17': 'MADRE DE DIOS', '18': 'MOQUEGUA', '19': 'PASCO', '20': 'PIURA',
+    '21': 'PUNO', '22': 'SAN MARTIN', '23': 'TACNA', '24': 'TUMBES', '25': 'UCAYALI',
+}
+
+
+def normalizar(texto: Optional[str]) -> str:
+    """Mayúsculas sin tildes, signos ni espacios repetidos ("Breña " -> "BRENA")"""
+    if not texto:
+        return ""
+    sin_tildes = "".join(
+        c for c in unicodedata.normalize("NFKD", texto) if not unicodedata.combining(c)
+    )
+    return " ".join(re.sub(r"[^A-Z0-9]+", " ", sin_tildes.upper()).split())
+
+
+class UbigeoMap:
+    """
+    Singleton con el índice distrito normalizado -> ubigeos, cargado en el primer uso
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(UbigeoMap, cls).__new__(cls)
+                    cls._instance._distritos = None
+                    cls._instance._provincias = None
+        return cls._instance
+
+    def _cargar(self) -> None:
+        """Lee el CSV una sola vez (orden del archivo = prioridad entre homónimos)"""
+        if self._distritos is not None:
+            return
+        with self._lock:
+            if self._distritos is not None:
+                return
+
+            distritos: Dict[str, List[str]] = {}
+            provincias: Dict[str, str] = {}
+            try:
+                with open(NOMBRE_CSV, encoding='utf-8-sig', newline='') as f:
+                    for fila in csv.DictReader(f):
+                        nombre = normalizar(fila.get('Distrito'))
+                        ubigeo = (fila.get('Ubigeo') or '').strip()
+                        if not nombre or not ubigeo.isdigit():
+                            continue
+                        # El CSV guarda algunos códigos sin el cero inicial (40101 -> 040101)
+                        ubigeo = ubigeo.zfill(6)
+                        distritos.setdefault(nombre, []).append(ubigeo)
+                        # El distrito XXYY01 es la capital y casi siempre da nombre a la provincia XXYY
+                        if ubigeo.endswith('01'):
+                            provincias[ubigeo[:4]] = nombre
+                print(f"[OK] UbigeoMap cargado desde {NOMBRE_CSV}. Total: {len(distritos)} distritos.")
+            except Exception as e:
+                print(f"[ERROR] Fallo la carga del UbigeoMap desde {NOMBRE_CSV}: {e}")
+
+            self._provincias = provincias
+            self._distritos = distritos
+
+    def _codigo_departamento(self, departamento: Optional[str]) -> Optional[str]:
+        nombre = normalizar(departamento)
+        if not nombre:
+            return None
+        for codigo, depto in DEPARTAMENTOS.items():
+            if depto == nombre:
+                return codigo
+        # Variantes como "PROV. CONST. DEL CALLAO"
+        for codigo, depto in DEPARTAMENTOS.items():
+            if re.search(rf"\b{depto}\b", nombre):
+                return codigo
+        return None
+
+    def _codigos_provincia(self, provincia: Optional[str]) -> List[str]:
+        nombre = normalizar(provincia)
+        if not nombre:
+            return []
+        exactas = [codigo for codigo, capital in self._provincias.items() if capital == nombre]
+        if exactas:
+            return exactas
+        # Capital con nombre distinto a la provincia (ej: CAÑETE -> SAN VICENTE DE CAÑETE)
+        return [codigo for codigo, capital in self._provincias.items()
+                if re.search(rf"\b{nombre}\b", capital)]
+
+    def obtener_ubigeo(
+        self,
+        distrito: str,
+        provincia: Optional[str] = None,
+        departamento: Optional[str] = None
+    ) -> str:
+        """
+        Busca el Ubigeo. Retorna el código o "Sin ubigeo" si no lo encuentra.
+
+        Args:
+            distrito: Nombre del distrito (se toleran tildes, signos y espacios)
+            provincia: Provincia, para elegir entre distritos homónimos
+            departamento: Departamento, para elegir entre distritos homónimos
+        """
+        self._cargar()
+        if not self._distritos:
+            return "Sin ubigeo (Error de carga)"
+
+        clave = normalizar(distrito)
+        candidatos = self._distritos.get(clave)
+        if not candidatos and clave:
+            parecidos = difflib.get_close_matches(clave, self._distritos.keys(), n=1, cutoff=SIMILITUD_MINIMA)
+            candidatos = self._distritos.get(parecidos[0]) if parecidos else None
+        if not candidatos:
+            return "Sin ubigeo"
+
+        if len(candidatos) > 1:
+            codigo_departamento = self._codigo_departamento(departamento)
+            if codigo_departamento:
+                candidatos = [u for u in candidatos if u.startswith(codigo_departamento)] or candidatos
+        if len(candidatos) > 1:
+            codigos_provincia = self._codigos_provincia(provincia)
+            if codigos_provincia:
+                candidatos = [u for u in candidatos if u[:4] in codigos_provincia] or candidatos
+
+        return candidatos[0]
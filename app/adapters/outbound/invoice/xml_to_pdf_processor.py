@@ -1,11 +1,12 @@
+from io import BytesIO
 from app.core.ports.services.invoice_processor_port import InvoiceProcessorPort
 from app.shared.utils.xml_processor import InvoiceExtractor
 from app.shared.serializers.pdf_generator.pdf_convert import generate_pdf
 
 class XmlToPdfProcessorAdapter(InvoiceProcessorPort):
-    def process_to_pdf(self, xml_file_path: str) -> tuple[bytes, str]:
-        # Aquí va la lógica de tu servicio original
-        extractor = InvoiceExtractor(xml_file_path)
+    def process_to_pdf(self, xml_content: bytes) -> tuple[bytes, str]:
+        # Todo en memoria: el XML se parsea desde un buffer y el PDF se genera en otro
+        extractor = InvoiceExtractor(BytesIO(xml_content))
         extractor.extract_data()
         
         registration_name, num_coti, fact, detalles, date, nombre_pdf = extractor.get_data()
@@ -0,0 +1,38 @@
+import os
+from typing import List, Optional
+
+from app.core.ports.services.audit_archive_storage_port import AuditArchiveStoragePort
+
+
+class LocalAuditArchiveStorage(AuditArchiveStoragePort):
+    """Archivo histórico de auditorías en el disco local"""
+
+    def __init__(self, base_dir: str = "./audit_archive"):
+        self.base_dir = base_dir
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    def _ruta(self, key: str) -> str:
+        return os.path.join(self.base_dir, *key.split("/"))
+
+    def save(self, key: str, content: bytes) -> None:
+        path = self._ruta(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Escribir a un temporal y renombrar: un lector nunca ve un archivo a medias
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(content)
+        os.replace(temp_path, path)
+
+    def read(self, key: str) -> Optional[bytes]:
+        path = self._ruta(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    def list_keys(self, prefix: str) -> List[str]:
+        claves = []
+        for directorio, _, archivos in os.walk(self._ruta(prefix.rstrip("/"))):
+            relativo = os.path.relpath(directorio, self.base_dir).replace(os.sep, "/")
+            claves.extend(f"{relativo}/{nombre}" for nombre in archivos if not nombre.endswith(".tmp"))
+        return claves
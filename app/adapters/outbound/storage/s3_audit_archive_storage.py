@@ -0,0 +1,50 @@
+import logging
+from typing import List, Optional
+
+from botocore.exceptions import ClientError
+
+from app.adapters.outbound.external_services.aws.s3_service import S3Service
+from app.config.settings import get_settings
+from app.core.ports.services.audit_archive_storage_port import AuditArchiveStoragePort
+
+logger = logging.getLogger(__name__)
+
+
+class S3AuditArchiveStorage(AuditArchiveStoragePort):
+    """
+    Archivo histórico de auditorías en S3.
+
+    A diferencia de AWSFileStorage los objetos son privados (sin ACL public-read):
+    contienen el historial de cambios y solo los lee el backend.
+    """
+
+    def __init__(self, prefix: str = "auditoria_archivo"):
+        settings = get_settings()
+        self.bucket_name = settings.aws_bucket_name
+        self.prefix = prefix.lstrip("./").rstrip("/")
+        self.s3_client = S3Service().s3_client
+
+    def _clave(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def save(self, key: str, content: bytes) -> None:
+        self.s3_client.put_object(Bucket=self.bucket_name, Key=self._clave(key), Body=content)
+        logger.info(f"Archivo de auditoría guardado en S3: {self._clave(key)}")
+
+    def read(self, key: str) -> Optional[bytes]:
+        try:
+            respuesta = self.s3_client.get_object(Bucket=self.bucket_name, Key=self._clave(key))
+            return respuesta["Body"].read()
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                return None
+            logger.error(f"Error al leer archivo de auditoría desde S3: {e}")
+            raise
+
+    def list_keys(self, prefix: str) -> List[str]:
+        inicio = len(self._clave(""))
+        claves = []
+        paginador = self.s3_client.get_paginator("list_objects_v2")
+        for pagina in paginador.paginate(Bucket=self.bucket_name, Prefix=self._clave(prefix)):
+            claves.extend(objeto["Key"][inicio:] for objeto in pagina.get("Contents", []))
+        return claves
@@ -18,6 +18,7 @@ class RedisCacheService:
     # Por defecto: redis://localhost:6379 (desarrollo local)
     redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379')
 
+    self.client = None
     try:
       self.client=redis.from_url(
         redis_url,
@@ -28,7 +29,9 @@ class RedisCacheService:
       )
       self.client.ping()
       print(f"✅ Conectado a Redis: {redis_url}")
-    except redis.ConnectionError as e:
+    except (redis.ConnectionError, redis.TimeoutError) as e:
+      # Sin Redis las operaciones devuelven "sin caché" en lugar de fallar
+      self.client = None
       print(f"Error conectado a Redis",e)
 
   def get(self, key: str) -> Optional[Dict[str, Any]]:
@@ -120,17 +123,23 @@ class RedisCacheService:
             return 0
 
         try:
-            keys = self.client.keys(pattern)
-            if keys:
-                deleted = self.client.delete(*keys)
+            # SCAN + UNLINK por lotes: KEYS bloquea Redis con muchos datos
+            deleted = 0
+            lote = []
+            for key in self.client.scan_iter(match=pattern, count=500):
+                lote.append(key)
+                if len(lote) >= 500:
+                    deleted += self.client.unlink(*lote)
+                    lote = []
+            if lote:
+                deleted += self.client.unlink(*lote)
+            if deleted:
                 print(f"🗑️ Eliminadas {deleted} claves con patrón: {pattern}")
-                return deleted
-            return 0
+            return deleted
         except Exception as e:
             print(f"⚠️ Error limpiando caché: {e}")
             return 0
 
-  
   def health_check(self) -> bool:
         """
         Verifica si Redis está funcionando
@@ -0,0 +1,168 @@
+"""
+Caché de dos niveles: LRU en memoria del proceso delante de Redis.
+
+Cada entrada tiene dos vencimientos:
+- soft: a partir de aquí el valor sigue sirviéndose pero se marca como no
+  fresco, para que el llamador lo refresque en segundo plano
+- hard: expiración real (TTL de Redis); pasado este punto la entrada no existe
+
+Las entradas negativas (ej: RUC inexistente) se guardan igual, con TTL corto.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.ports.services.cache_port import CachePort
+
+# Marca del sobre guardado en Redis (los valores anteriores se guardaban sin sobre)
+_MARCA_SOBRE = "_tc"
+
+
+@dataclass(frozen=True)
+class EntradaCache:
+    """Valor leído del caché y su estado"""
+    valor: Any
+    fresca: bool
+    negativa: bool = False
+
+
+class TieredCacheService:
+    """
+    LRU acotado en memoria + caché compartido (Redis, vía CachePort).
+
+    Las lecturas intentan primero la memoria; si la entrada falta o ya no es
+    fresca se consulta Redis (otro worker pudo haberla refrescado).
+    """
+
+    def __init__(self, cache: CachePort, max_entradas: int = 1000):
+        self.cache = cache
+        self.max_entradas = max_entradas
+        # key -> (sobre, hard_hasta)
+        self._memoria: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[EntradaCache]:
+        """
+        Obtiene una entrada del caché
+
+        Returns:
+            EntradaCache (fresca o no) o None si no existe o pasó su vencimiento hard
+        """
+        ahora = time.time()
+        sobre = self._leer_memoria(key, ahora)
+        if sobre is not None and sobre["soft_hasta"] > ahora:
+            return _entrada(sobre, ahora)
+
+        sobre_redis = self._desempacar(await self.cache.get(key), ahora)
+        if sobre_redis is not None:
+            self._guardar_memoria(key, sobre_redis)
+            return _entrada(sobre_redis, ahora)
+        return _entrada(sobre, ahora) if sobre is not None else None
+
+    async def get_many(self, keys: List[str]) -> List[Optional[EntradaCache]]:
+        """Obtiene varias entradas; las que no están frescas en memoria se piden a Redis en un solo MGET"""
+        ahora = time.time()
+        resultado: List[Optional[EntradaCache]] = [None] * len(keys)
+        pendientes = []
+        for i, key in enumerate(keys):
+            sobre = self._leer_memoria(key, ahora)
+            if sobre is not None:
+                resultado[i] = _entrada(sobre, ahora)
+            if sobre is None or sobre["soft_hasta"] <= ahora:
+                pendientes.append(i)
+
+        if pendientes:
+            valores = await self.cache.mget([keys[i] for i in pendientes])
+            for i, valor in zip(pendientes, valores):
+                sobre = self._desempacar(valor, ahora)
+                if sobre is not None:
+                    self._guardar_memoria(keys[i], sobre)
+                    resultado[i] = _entrada(sobre, ahora)
+        return resultado
+
+    async def set(self, key: str, valor: Any, soft_ttl: int, hard_ttl: int, negativo: bool = False) -> bool:
+        """
+        Guarda un valor en memoria y en Redis
+
+        Args:
+            key: Clave del caché
+            valor: Datos serializables a JSON
+            soft_ttl: Segundos durante los que el valor se considera fresco
+            hard_ttl: Segundos tras los que el valor se elimina (TTL de Redis)
+            negativo: Marca la entrada como resultado negativo
+        """
+        ahora = time.time()
+        sobre = {
+            _MARCA_SOBRE: 1,
+            "valor": valor,
+            "soft_hasta": ahora + min(soft_ttl, hard_ttl),
+            "hard_hasta": ahora + hard_ttl,
+            "negativo": negativo,
+        }
+        self._guardar_memoria(key, sobre)
+        return await self.cache.set(key, sobre, hard_ttl)
+
+    async def delete(self, key: str) -> bool:
+        with self._lock:
+            self._memoria.pop(key, None)
+        return await self.cache.delete(key)
+
+    def _leer_memoria(self, key: str, ahora: float) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._memoria.get(key)
+            if item is None:
+                return None
+            sobre, hard_hasta = item
+            if hard_hasta <= ahora:
+                del self._memoria[key]
+                return None
+            self._memoria.move_to_end(key)
+            return sobre
+
+    def _guardar_memoria(self, key: str, sobre: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memoria[key] = (sobre, sobre["hard_hasta"])
+            self._memoria.move_to_end(key)
+            while len(self._memoria) > self.max_entradas:
+                self._memoria.popitem(last=False)
+
+    @staticmethod
+    def _desempacar(valor: Optional[Dict[str, Any]], ahora: float) -> Optional[Dict[str, Any]]:
+        """Sobre de una entrada de Redis; los valores guardados sin sobre se tratan como frescos"""
+        if valor is None:
+            return None
+        if isinstance(valor, dict) and valor.get(_MARCA_SOBRE) == 1:
+            return valor if valor["hard_hasta"] > ahora else None
+        # Formato anterior: Redis ya controla su expiración, se conserva 1 hora en memoria
+        return {_MARCA_SOBRE: 1, "valor": valor, "soft_hasta": ahora + 3600,
+                "hard_hasta": ahora + 3600, "negativo": False}
+
+
+def _entrada(sobre: Dict[str, Any], ahora: float) -> EntradaCache:
+    return EntradaCache(
+        valor=sobre["valor"],
+        fresca=sobre["soft_hasta"] > ahora,
+        negativa=sobre.get("negativo", False)
+    )
+
+
+# Singleton: Una única instancia para toda la aplicación
+_tiered_cache_service: Optional[TieredCacheService] = None
+
+
+def get_tiered_cache_service() -> TieredCacheService:
+    """
+    Obtiene la instancia única del caché de dos niveles
+    """
+    global _tiered_cache_service
+    if _tiered_cache_service is None:
+        from app.adapters.outbound.cache.redis_async_cache import get_redis_async_cache
+        from app.config.settings import get_settings
+
+        _tiered_cache_service = TieredCacheService(
+            get_redis_async_cache(),
+            max_entradas=get_settings().cache_memoria_max_entradas
+        )
+    return _tiered_cache_service
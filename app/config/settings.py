@@ -90,6 +90,311 @@ class Settings(BaseSettings):
         description="Timeout en segundos para apagar workers"
     )
 
+    # Configuración del caché de tipo de cambio SUNAT
+    tipo_cambio_cache_ttl: int = Field(
+        default=3600,
+        env="TIPO_CAMBIO_CACHE_TTL",
+        description="Segundos que el historial de tipo de cambio permanece en memoria antes de recargarse"
+    )
+    tipo_cambio_verificacion_intervalo: int = Field(
+        default=60,
+        env="TIPO_CAMBIO_VERIFICACION_INTERVALO",
+        description="Segundos entre comprobaciones del último registro de tasa_cambio_sunat "
+                    "(lo inserta otro proceso; si cambió, el historial se recarga antes del TTL)"
+    )
+
+    # Configuración de retención y archivo de auditorías
+    auditoria_retencion_habilitada: bool = Field(
+        default=False,
+        env="AUDITORIA_RETENCION_HABILITADA",
+        description="Activa el job diario que mueve auditorías antiguas al archivo comprimido"
+    )
+    auditoria_retencion_dias: int = Field(
+        default=365,
+        env="AUDITORIA_RETENCION_DIAS",
+        description="Días que las auditorías permanecen en las tablas; se archivan meses completos más antiguos"
+    )
+    auditoria_archivo_backend: Literal["", "local", "s3"] = Field(
+        default="",
+        env="AUDITORIA_ARCHIVO_BACKEND",
+        description="Almacenamiento del archivo de auditorías: local o s3 (vacío = sin archivo, no se borra nada)"
+    )
+    auditoria_archivo_dir: str = Field(
+        default="./audit_archive",
+        env="AUDITORIA_ARCHIVO_DIR",
+        description="Directorio del archivo de auditorías (backend local) o prefijo de claves (backend s3)"
+    )
+    auditoria_archivo_local_persistente: bool = Field(
+        default=False,
+        env="AUDITORIA_ARCHIVO_LOCAL_PERSISTENTE",
+        description="Confirma que AUDITORIA_ARCHIVO_DIR es un volumen persistente; sin esto el backend "
+                    "local no archiva (las filas archivadas se borran de la BD)"
+    )
+    auditoria_archivo_filas_por_parte: int = Field(
+        default=5000,
+        env="AUDITORIA_ARCHIVO_FILAS_POR_PARTE",
+        description="Filas máximas leídas, archivadas y borradas por transacción"
+    )
+
+    # Schedulers con elección de líder (solo un worker ejecuta los jobs)
+    scheduler_lider_lock: str = Field(
+        default="crm_scheduler_lider",
+        env="SCHEDULER_LIDER_LOCK",
+        description="Nombre del lock consultivo de MySQL que elige al worker que ejecuta los jobs programados"
+    )
+    scheduler_lider_intervalo: float = Field(
+        default=15.0,
+        env="SCHEDULER_LIDER_INTERVALO",
+        description="Segundos entre intentos de tomar el liderazgo y comprobaciones del líder (tiempo máximo de failover)"
+    )
+    scheduler_misfire_gracia: int = Field(
+        default=21600,
+        env="SCHEDULER_MISFIRE_GRACIA",
+        description="Segundos dentro de los cuales una ejecución perdida (sin líder a la hora programada) se recupera"
+    )
+
+    admin_token: str = Field(
+        default="",
+        env="ADMIN_TOKEN",
+        description="Token exigido en el header X-Admin-Token de los endpoints /admin (vacío = endpoints deshabilitados)"
+    )
+
+    # Configuración del pool de navegadores para SUNAT
+    sunat_pool_size: int = Field(
+        default=2,
+        env="SUNAT_POOL_SIZE",
+        description="Páginas (contextos) de Chromium abiertas para consultas SUNAT en paralelo"
+    )
+    sunat_pool_max_usos: int = Field(
+        default=200,
+        env="SUNAT_POOL_MAX_USOS",
+        description="Consultas tras las cuales se recicla el navegador del pool"
+    )
+    sunat_pool_timeout_cola: float = Field(
+        default=30.0,
+        env="SUNAT_POOL_TIMEOUT_COLA",
+        description="Segundos máximos que una consulta espera una página libre del pool"
+    )
+    sunat_modo_http: bool = Field(
+        default=True,
+        env="SUNAT_MODO_HTTP",
+        description="Consultar primero por HTTP simple y usar el navegador solo ante captcha o HTML inesperado"
+    )
+    sunat_http_sesiones: int = Field(
+        default=4,
+        env="SUNAT_HTTP_SESIONES",
+        description="Sesiones HTTP (con conexiones keep-alive) para consultas SUNAT sin navegador"
+    )
+    sunat_http_timeout: float = Field(
+        default=10.0,
+        env="SUNAT_HTTP_TIMEOUT",
+        description="Timeout en segundos de cada petición HTTP a SUNAT"
+    )
+    sunat_recursos_bloqueados: str = Field(
+        default="image,font,media",
+        env="SUNAT_RECURSOS_BLOQUEADOS",
+        description="Tipos de recurso que el navegador no descarga, separados por coma. "
+                    "Las hojas de estilo se cargan por defecto porque las comprobaciones de visibilidad dependen de ellas"
+    )
+    sunat_timeout_navegacion_ms: int = Field(
+        default=30000,
+        env="SUNAT_TIMEOUT_NAVEGACION_MS",
+        description="Timeout (ms) para cargar el formulario de búsqueda de SUNAT"
+    )
+    sunat_timeout_resultado_ms: int = Field(
+        default=20000,
+        env="SUNAT_TIMEOUT_RESULTADO_MS",
+        description="Timeout (ms) para que aparezca la página de resultados tras enviar el RUC"
+    )
+    sunat_timeout_seccion_ms: int = Field(
+        default=10000,
+        env="SUNAT_TIMEOUT_SECCION_MS",
+        description="Timeout (ms) de cada sub-consulta (trabajadores, representantes legales)"
+    )
+    sunat_timeout_boton_ms: int = Field(
+        default=2000,
+        env="SUNAT_TIMEOUT_BOTON_MS",
+        description="Espera (ms) a que aparezca el botón de una sección opcional antes de darla por inexistente"
+    )
+
+    # Configuración de Redis (cliente async del caché)
+    redis_url: str = Field(
+        default="redis://localhost:6379",
+        env="REDIS_URL",
+        description="URL de conexión a Redis"
+    )
+    redis_max_conexiones: int = Field(
+        default=20,
+        env="REDIS_MAX_CONEXIONES",
+        description="Tamaño máximo del pool de conexiones async a Redis por proceso"
+    )
+    redis_reintento_segundos: float = Field(
+        default=30.0,
+        env="REDIS_REINTENTO_SEGUNDOS",
+        description="Segundos que se usa el caché en memoria tras una caída de Redis antes de volver a probarlo"
+    )
+
+    # Caché de dos niveles (memoria + Redis) para datos de RUC
+    cache_memoria_max_entradas: int = Field(
+        default=1000,
+        env="CACHE_MEMORIA_MAX_ENTRADAS",
+        description="Entradas máximas del LRU en memoria que está delante de Redis"
+    )
+    sunat_cache_soft_ttl: int = Field(
+        default=604800,
+        env="SUNAT_CACHE_SOFT_TTL",
+        description="Segundos que los datos de un RUC se consideran frescos; después se sirven y se refrescan en segundo plano"
+    )
+    sunat_cache_hard_ttl: int = Field(
+        default=2592000,
+        env="SUNAT_CACHE_HARD_TTL",
+        description="Segundos tras los que los datos de un RUC se eliminan y la consulta espera un scraping nuevo"
+    )
+    sunat_cache_negativo_ttl: int = Field(
+        default=3600,
+        env="SUNAT_CACHE_NEGATIVO_TTL",
+        description="Segundos que se recuerda que un RUC no existe en SUNAT"
+    )
+
+    # Refresco programado de datos SUNAT de proveedores
+    sunat_refresco_habilitado: bool = Field(
+        default=True,
+        env="SUNAT_REFRESCO_HABILITADO",
+        description="Activa el job diario que vuelve a consultar los RUC de proveedores con datos más antiguos"
+    )
+    sunat_refresco_hora: int = Field(
+        default=2,
+        env="SUNAT_REFRESCO_HORA",
+        description="Hora (0-23, hora Perú) en que corre el refresco de datos SUNAT"
+    )
+    sunat_refresco_limite: int = Field(
+        default=200,
+        env="SUNAT_REFRESCO_LIMITE",
+        description="RUC de proveedores refrescados como máximo en cada ejecución"
+    )
+    sunat_refresco_concurrencia: int = Field(
+        default=1,
+        env="SUNAT_REFRESCO_CONCURRENCIA",
+        description="Consultas a SUNAT simultáneas durante el refresco programado"
+    )
+
+    # Coalescencia de consultas SUNAT concurrentes (single-flight)
+    sunat_single_flight_timeout: float = Field(
+        default=45.0,
+        env="SUNAT_SINGLE_FLIGHT_TIMEOUT",
+        description="Segundos que una petición espera la consulta en curso del mismo RUC antes de usar datos anteriores"
+    )
+    sunat_lock_ttl: int = Field(
+        default=60,
+        env="SUNAT_LOCK_TTL",
+        description="Expiración (s) del lock Redis que reserva el scraping de un RUC a un solo worker. "
+                    "Se renueva cada TTL/3 mientras dura la consulta; solo vence si el worker muere"
+    )
+
+    # Consulta de RUC por lote
+    sunat_lote_concurrencia: int = Field(
+        default=2,
+        env="SUNAT_LOTE_CONCURRENCIA",
+        description="Scrapings simultáneos como máximo por cada consulta por lote"
+    )
+    sunat_lote_deadline: float = Field(
+        default=120.0,
+        env="SUNAT_LOTE_DEADLINE",
+        description="Segundos máximos de una consulta por lote; los RUC pendientes se informan como error"
+    )
+
+    # Caché del último valor del dólar (/dolar/ultimo)
+    dolar_cache_ttl: int = Field(
+        default=3600,
+        env="DOLAR_CACHE_TTL",
+        description="Segundos que el último valor del dólar se sirve desde memoria sin releer la BD "
+                    "(las inserciones lo invalidan antes en todos los workers)"
+    )
+    dolar_ultimo_max_age: int = Field(
+        default=60,
+        env="DOLAR_ULTIMO_MAX_AGE",
+        description="max-age (s) de Cache-Control en /dolar/ultimo; pasado ese tiempo el navegador revalida con ETag"
+    )
+
+    # Fuentes del tipo de cambio (consultadas en paralelo)
+    dolar_fuentes: str = Field(
+        default="securex",
+        env="DOLAR_FUENTES",
+        description="Fuentes del tipo de cambio separadas por coma (securex, sunat_apis_net_pe)"
+    )
+    dolar_quorum: int = Field(
+        default=1,
+        env="DOLAR_QUORUM",
+        description="Fuentes que deben coincidir para aceptar el valor (1 = primer resultado válido)"
+    )
+    dolar_tolerancia: float = Field(
+        default=0.05,
+        env="DOLAR_TOLERANCIA",
+        description="Diferencia máxima de venta entre fuentes para considerarlas coincidentes"
+    )
+    dolar_reintentos: int = Field(
+        default=2,
+        env="DOLAR_REINTENTOS",
+        description="Reintentos por fuente (con backoff exponencial) tras un error de red o de parseo"
+    )
+    dolar_timeout: float = Field(
+        default=10.0,
+        env="DOLAR_TIMEOUT",
+        description="Timeout en segundos de cada petición a una fuente del tipo de cambio"
+    )
+
+    # Control de admisión de llamadas a sitios externos (503 + Retry-After al saturarse)
+    sunat_admision_concurrencia: int = Field(
+        default=4,
+        env="SUNAT_ADMISION_CONCURRENCIA",
+        description="Consultas a SUNAT simultáneas como máximo por proceso"
+    )
+    sunat_admision_tasa: float = Field(
+        default=2.0,
+        env="SUNAT_ADMISION_TASA",
+        description="Consultas nuevas a SUNAT por segundo en régimen (token bucket, 0 = sin límite)"
+    )
+    sunat_admision_rafaga: int = Field(
+        default=4,
+        env="SUNAT_ADMISION_RAFAGA",
+        description="Consultas a SUNAT que pueden iniciarse seguidas tras un periodo sin uso"
+    )
+    sunat_admision_max_espera: float = Field(
+        default=10.0,
+        env="SUNAT_ADMISION_MAX_ESPERA",
+        description="Segundos máximos que una consulta espera turno antes de responder 503"
+    )
+    sunat_admision_max_cola: int = Field(
+        default=50,
+        env="SUNAT_ADMISION_MAX_COLA",
+        description="Consultas a SUNAT en espera como máximo; las siguientes reciben 503 al instante"
+    )
+    dolar_admision_concurrencia: int = Field(
+        default=1,
+        env="DOLAR_ADMISION_CONCURRENCIA",
+        description="Consultas simultáneas del tipo de cambio como máximo por proceso"
+    )
+    dolar_admision_tasa: float = Field(
+        default=0.2,
+        env="DOLAR_ADMISION_TASA",
+        description="Consultas nuevas del tipo de cambio por segundo en régimen (0 = sin límite)"
+    )
+    dolar_admision_rafaga: int = Field(
+        default=2,
+        env="DOLAR_ADMISION_RAFAGA",
+        description="Consultas del tipo de cambio que pueden iniciarse seguidas"
+    )
+    dolar_admision_max_espera: float = Field(
+        default=15.0,
+        env="DOLAR_ADMISION_MAX_ESPERA",
+        description="Segundos máximos que una consulta del tipo de cambio espera turno"
+    )
+    dolar_admision_max_cola: int = Field(
+        default=5,
+        env="DOLAR_ADMISION_MAX_COLA",
+        description="Consultas del tipo de cambio en espera como máximo"
+    )
+
     # Configuración de AWS
     aws_access_key_id: str = Field(default="", env="AWS_ACCESS_KEY_ID")
     aws_secret_access_key: str = Field(default="", env="AWS_SECRET_ACCESS_KEY")
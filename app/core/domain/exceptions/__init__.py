@@ -15,6 +15,7 @@ from .orden_compra_exceptions import (
     AlmacenamientoError,
     ActualizacionOrdenError,
     EliminacionOrdenError,
+    CursorAuditoriaInvalidoError,
 )
 
 __all__ = [
@@ -27,4 +28,5 @@ __all__ = [
     "AlmacenamientoError",
     "ActualizacionOrdenError",
     "EliminacionOrdenError",
+    "CursorAuditoriaInvalidoError",
 ]
@@ -103,3 +103,14 @@ class EliminacionOrdenError(OrdenCompraError):
             f"Error al eliminar orden {id_orden}: {detalle}",
             {"id_orden": id_orden, "detalle": detalle}
         )
+
+
+class CursorAuditoriaInvalidoError(OrdenCompraError):
+    """Se lanza cuando el cursor de paginación de auditorías no es válido."""
+
+    def __init__(self, cursor: str):
+        self.cursor = cursor
+        super().__init__(
+            "El cursor de paginación no es válido o está corrupto.",
+            {"cursor": cursor}
+        )
@@ -0,0 +1,312 @@
+"""
+Registro de jobs periódicos de la aplicación.
+
+Cada job se declara con una DefinicionJob (cron u intervalo, jitter, duración
+máxima) y todos se ejecutan por el mismo camino:
+- un solo AsyncIOScheduler con job store en BD, activo solo en el worker líder
+  (ver SchedulerLiderado); las funciones síncronas corren en un thread
+- sin solapamiento: una ejecución en curso (en este proceso o, vía lock Redis,
+  en otro worker) hace que la siguiente se omita
+- métricas por job: ejecuciones, duración, último éxito y último error
+- disparo manual desde el endpoint de administración
+"""
+import asyncio
+import inspect
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+
+from app.core.infrastructure.scheduler.scheduler_liderado import SchedulerLiderado
+
+logger = logging.getLogger(__name__)
+
+# TTL del lock entre workers para jobs sin duración máxima declarada
+TTL_LOCK_SIN_LIMITE = 3600
+
+
+class JobNoEncontradoError(Exception):
+    """El job pedido no está registrado"""
+
+
+class JobEnCursoError(Exception):
+    """El job ya se está ejecutando (en este proceso o en otro worker)"""
+
+
+@dataclass(frozen=True)
+class DefinicionJob:
+    """
+    Declaración de un job periódico.
+
+    `funcion` debe ser una función de módulo sin argumentos, síncrona (corre en
+    un thread) o async (corre en el event loop). Se indica `cron` (argumentos de
+    CronTrigger, hora Perú) o `intervalo_segundos`.
+    """
+    id: str
+    nombre: str
+    funcion: Callable[[], Any]
+    cron: Optional[Dict[str, Any]] = None
+    intervalo_segundos: Optional[int] = None
+    jitter_segundos: int = 0
+    max_duracion_segundos: Optional[float] = None
+    gracia_recuperacion: Optional[int] = None
+    habilitado: Callable[[], bool] = lambda: True
+
+    def __post_init__(self):
+        if (self.cron is None) == (self.intervalo_segundos is None):
+            raise ValueError(f"El job '{self.id}' debe declarar cron o intervalo_segundos (solo uno)")
+
+
+@dataclass
+class MetricasJob:
+    """Métricas de ejecución de un job en este proceso"""
+    ejecuciones: int = 0
+    exitos: int = 0
+    fallos: int = 0
+    timeouts: int = 0
+    omitidas: int = 0
+    duracion_total: float = 0.0
+    duracion_max: float = 0.0
+    ultima_duracion: Optional[float] = None
+    ultima_ejecucion: Optional[datetime] = None
+    ultimo_exito: Optional[datetime] = None
+    ultimo_error: Optional[str] = None
+    ultimo_origen: Optional[str] = None
+
+    def a_dict(self) -> Dict[str, Any]:
+        terminadas = self.exitos + self.fallos + self.timeouts
+        return {
+            "ejecuciones": self.ejecuciones,
+            "exitos": self.exitos,
+            "fallos": self.fallos,
+            "timeouts": self.timeouts,
+            "omitidas_por_solapamiento": self.omitidas,
+            "ultima_duracion_s": round(self.ultima_duracion, 3) if self.ultima_duracion is not None else None,
+            "duracion_promedio_s": round(self.duracion_total / terminadas, 3) if terminadas else None,
+            "duracion_max_s": round(self.duracion_max, 3),
+            "ultima_ejecucion": self.ultima_ejecucion.isoformat() if self.ultima_ejecucion else None,
+            "ultimo_exito": self.ultimo_exito.isoformat() if self.ultimo_exito else None,
+            "ultimo_error": self.ultimo_error,
+            "ultimo_origen": self.ultimo_origen,
+        }
+
+
+class JobScheduler(SchedulerLiderado):
+    """Scheduler único de la aplicación con registro de jobs declarativos"""
+
+    def __init__(self):
+        super().__init__(AsyncIOScheduler, tabla_jobs='scheduler_jobs', nombre='jobs periódicos')
+        self._definiciones: Dict[str, DefinicionJob] = {}
+        self._metricas: Dict[str, MetricasJob] = {}
+        self._en_curso: Dict[str, str] = {}
+        # Referencia fuerte a las ejecuciones manuales y a las liberaciones pendientes
+        self._tareas_manuales = set()
+        self._liberaciones = set()
+
+    def registrar(self, definicion: DefinicionJob) -> None:
+        """Agrega un job al registro (antes de `start`)"""
+        if definicion.id in self._definiciones:
+            raise ValueError(f"Ya hay un job registrado con id '{definicion.id}'")
+        self._definiciones[definicion.id] = definicion
+        self._metricas[definicion.id] = MetricasJob()
+
+    def programar_jobs(self) -> None:
+        """Sincroniza el job store con el registro (se llama al ganar el liderazgo)"""
+        for job in self.scheduler.get_jobs():
+            definicion = self._definiciones.get(job.id)
+            if definicion is None or not definicion.habilitado():
+                self.scheduler.remove_job(job.id)
+                logger.info(f"🗑️ Job '{job.id}' quitado del scheduler (no registrado o deshabilitado)")
+
+        for definicion in self._definiciones.values():
+            if not definicion.habilitado():
+                logger.info(f"ℹ️ Job '{definicion.id}' deshabilitado, no se programa")
+                continue
+            opciones = {"args": [definicion.id]}
+            if definicion.gracia_recuperacion is not None:
+                opciones["misfire_grace_time"] = definicion.gracia_recuperacion
+            self.asegurar_job(
+                func=ejecutar_job_programado,
+                trigger=self._trigger(definicion),
+                id=definicion.id,
+                name=definicion.nombre,
+                **opciones
+            )
+
+    def _trigger(self, definicion: DefinicionJob):
+        jitter = definicion.jitter_segundos or None
+        if definicion.cron is not None:
+            return CronTrigger(timezone=self.peru_tz, jitter=jitter, **definicion.cron)
+        return IntervalTrigger(seconds=definicion.intervalo_segundos, timezone=self.peru_tz, jitter=jitter)
+
+    async def ejecutar(self, job_id: str, origen: str = "programado") -> bool:
+        """
+        Ejecuta un job registrando sus métricas
+
+        Returns:
+            bool: False si se omitió porque ya había una ejecución en curso
+
+        Raises:
+            JobNoEncontradoError: Si el job no está registrado
+        """
+        definicion = self._definiciones.get(job_id)
+        if definicion is None:
+            raise JobNoEncontradoError(job_id)
+        metricas = self._metricas[job_id]
+
+        token = await self._reservar(definicion)
+        if token is None:
+            metricas.omitidas += 1
+            logger.warning(f"⏭️ Job '{job_id}' omitido ({origen}): ya hay una ejecución en curso")
+            return False
+
+        self._en_curso[job_id] = origen
+        metricas.ejecuciones += 1
+        metricas.ultima_ejecucion = datetime.now()
+        metricas.ultimo_origen = origen
+        logger.info(f"🚀 INICIO job '{job_id}' ({origen})")
+        inicio = time.monotonic()
+
+        # Se marca cuando el job termina de verdad: para uno síncrono, al salir su
+        # thread (cancelar la tarea de to_thread no detiene el thread)
+        terminado = asyncio.Event()
+        if inspect.iscoroutinefunction(definicion.funcion):
+            tarea = asyncio.ensure_future(definicion.funcion())
+            tarea.add_done_callback(lambda _: terminado.set())
+        else:
+            tarea = asyncio.ensure_future(asyncio.to_thread(
+                _en_thread, definicion.funcion, asyncio.get_running_loop(), terminado
+            ))
+
+        cancelado = False
+        try:
+            await asyncio.wait({tarea}, timeout=definicion.max_duracion_segundos)
+        except asyncio.CancelledError:
+            # Apagado del scheduler: se cancela el job y se propaga la cancelación
+            cancelado = True
+
+        duracion = time.monotonic() - inicio
+        metricas.ultima_duracion = duracion
+        metricas.duracion_total += duracion
+        metricas.duracion_max = max(metricas.duracion_max, duracion)
+
+        if not tarea.done():
+            # Un job async se cancela; uno síncrono no puede interrumpirse y
+            # sigue reservado (en este proceso y en Redis) hasta que su thread termine
+            tarea.cancel()
+            liberacion = asyncio.ensure_future(self._liberar_al_terminar(job_id, token, terminado))
+            self._liberaciones.add(liberacion)
+            liberacion.add_done_callback(self._liberaciones.discard)
+            if cancelado:
+                metricas.fallos += 1
+                metricas.ultimo_error = "cancelado"
+                raise asyncio.CancelledError()
+            metricas.timeouts += 1
+            metricas.ultimo_error = f"Superó la duración máxima de {definicion.max_duracion_segundos}s"
+            logger.error(f"⏱️ Job '{job_id}' superó su duración máxima ({definicion.max_duracion_segundos}s)")
+            return True
+
+        await self._liberar(job_id, token)
+        error = "cancelado" if tarea.cancelled() else tarea.exception()
+        if error is None:
+            metricas.exitos += 1
+            metricas.ultimo_exito = datetime.now()
+            logger.info(f"✅ Job '{job_id}' completado en {duracion:.1f}s")
+        else:
+            metricas.fallos += 1
+            metricas.ultimo_error = str(error)
+            logger.error(f"❌ Job '{job_id}' falló tras {duracion:.1f}s: {error}")
+        if cancelado:
+            raise asyncio.CancelledError()
+        return True
+
+    async def disparar(self, job_id: str) -> None:
+        """
+        Ejecuta un job ahora, en segundo plano (disparo manual)
+
+        Raises:
+            JobNoEncontradoError: Si el job no está registrado
+            JobEnCursoError: Si el job ya se está ejecutando en este u otro worker
+        """
+        from app.adapters.outbound.cache.redis_async_cache import get_redis_async_cache
+
+        if job_id not in self._definiciones:
+            raise JobNoEncontradoError(job_id)
+        if job_id in self._en_curso or await get_redis_async_cache().exists(_clave_lock(job_id)):
+            raise JobEnCursoError(job_id)
+        tarea = asyncio.create_task(self.ejecutar(job_id, origen="manual"))
+        self._tareas_manuales.add(tarea)
+        tarea.add_done_callback(self._tareas_manuales.discard)
+
+    def estado(self) -> List[Dict[str, Any]]:
+        """Definición, próxima ejecución y métricas de cada job registrado"""
+        jobs = []
+        for job_id, definicion in self._definiciones.items():
+            programado = self.scheduler.get_job(job_id) if self.scheduler.running else None
+            jobs.append({
+                "id": job_id,
+                "nombre": definicion.nombre,
+                "habilitado": definicion.habilitado(),
+                "programacion": str(self._trigger(definicion)),
+                "jitter_s": definicion.jitter_segundos,
+                "max_duracion_s": definicion.max_duracion_segundos,
+                "en_curso": self._en_curso.get(job_id),
+                "proxima_ejecucion": (
+                    programado.next_run_time.isoformat()
+                    if programado is not None and programado.next_run_time else None
+                ),
+                "metricas": self._metricas[job_id].a_dict(),
+            })
+        return jobs
+
+    async def _reservar(self, definicion: DefinicionJob) -> Optional[str]:
+        """Marca el job en curso en este proceso y en Redis (entre workers); None si ya lo estaba"""
+        from app.adapters.outbound.cache.redis_async_cache import get_redis_async_cache
+
+        if definicion.id in self._en_curso:
+            return None
+        ttl = int(definicion.max_duracion_segundos or TTL_LOCK_SIN_LIMITE) + 60
+        return await get_redis_async_cache().adquirir_lock(_clave_lock(definicion.id), ttl)
+
+    async def _liberar_al_terminar(self, job_id: str, token: str, terminado: asyncio.Event) -> None:
+        """Libera la reserva de un job que superó su duración máxima cuando por fin termina"""
+        await terminado.wait()
+        logger.info(f"🔓 Job '{job_id}' terminó tras superar su duración máxima, reserva liberada")
+        await self._liberar(job_id, token)
+
+    async def _liberar(self, job_id: str, token: str) -> None:
+        from app.adapters.outbound.cache.redis_async_cache import get_redis_async_cache
+
+        self._en_curso.pop(job_id, None)
+        await get_redis_async_cache().liberar_lock(_clave_lock(job_id), token)
+
+
+def _en_thread(funcion: Callable[[], Any], loop: asyncio.AbstractEventLoop, terminado: asyncio.Event) -> Any:
+    """Ejecuta un job síncrono en su thread y avisa al event loop cuando termina"""
+    try:
+        return funcion()
+    finally:
+        try:
+            loop.call_soon_threadsafe(terminado.set)
+        except RuntimeError:
+            # El event loop ya se cerró (apagado): no queda nada que liberar
+            pass
+
+
+def _clave_lock(job_id: str) -> str:
+    """Lock Redis que impide ejecutar el mismo job a la vez en dos workers"""
+    return f"scheduler:job:{job_id}"
+
+
+async def ejecutar_job_programado(job_id: str) -> None:
+    """Punto de entrada de todos los jobs programados (el job store guarda la referencia a esta función)"""
+    await job_scheduler.ejecutar(job_id, origen="programado")
+
+
+# Instancia global del scheduler
+job_scheduler = JobScheduler()
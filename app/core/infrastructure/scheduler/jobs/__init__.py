@@ -0,0 +1,24 @@
+"""
+Jobs periódicos de la aplicación.
+
+Para agregar un job: crear un módulo con su función y su `JOB = DefinicionJob(...)`
+y sumarlo a JOBS.
+"""
+from app.core.infrastructure.scheduler.job_registry import JobScheduler
+from app.core.infrastructure.scheduler.jobs import (
+    auditoria_retencion_job,
+    ruc_refresco_job,
+    valor_dolar_job,
+)
+
+JOBS = [
+    valor_dolar_job.JOB,
+    auditoria_retencion_job.JOB,
+    ruc_refresco_job.JOB,
+]
+
+
+def registrar_jobs(scheduler: JobScheduler) -> None:
+    """Registra todos los jobs de la aplicación en el scheduler"""
+    for job in JOBS:
+        scheduler.registrar(job)
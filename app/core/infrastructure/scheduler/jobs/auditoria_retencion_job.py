@@ -0,0 +1,37 @@
+"""
+Job: archivado de auditorías antiguas.
+
+Todos los días a las 3:00 AM hora Perú mueve los meses completos más antiguos
+que AUDITORIA_RETENCION_DIAS a archivos comprimidos. Solo se programa si
+AUDITORIA_RETENCION_HABILITADA está activo, y falla sin borrar nada si el
+almacenamiento del archivo no está configurado como duradero.
+"""
+import logging
+from app.config.settings import get_settings
+from app.core.infrastructure.scheduler.job_registry import DefinicionJob
+from app.core.services.auditoria_archivo_service import (
+    ArchivoAuditoriaNoDuraderoError,
+    get_auditoria_archivo_service,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def archivar_auditorias():
+    """Archiva las auditorías fuera del horizonte de retención"""
+    servicio = get_auditoria_archivo_service()
+    if servicio is None:
+        raise ArchivoAuditoriaNoDuraderoError("AUDITORIA_ARCHIVO_BACKEND no está configurado")
+    resumen = servicio.archivar_antiguos()
+    logger.info(f"✅ Archivado de auditorías completado: {resumen}")
+
+
+JOB = DefinicionJob(
+    id='archivar_auditorias_diario',
+    nombre='Archivado diario de auditorías antiguas',
+    funcion=archivar_auditorias,
+    cron={"hour": 3, "minute": 0},
+    jitter_segundos=300,
+    max_duracion_segundos=2 * 3600,
+    habilitado=lambda: get_settings().auditoria_retencion_habilitada
+)
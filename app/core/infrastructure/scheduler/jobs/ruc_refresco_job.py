@@ -0,0 +1,44 @@
+"""
+Job: refresco de los datos SUNAT de proveedores.
+
+Todos los días en horario de baja carga (SUNAT_REFRESCO_HORA, hora Perú)
+vuelve a consultar los SUNAT_REFRESCO_LIMITE RUC de proveedores con datos
+más antiguos, con a lo sumo SUNAT_REFRESCO_CONCURRENCIA consultas a la vez.
+
+Es async porque la consulta corre en el event loop de la aplicación (pool de
+navegadores Playwright async).
+"""
+import logging
+from datetime import timedelta
+from app.config.settings import get_settings
+from app.core.infrastructure.scheduler.job_registry import DefinicionJob
+
+logger = logging.getLogger(__name__)
+
+# Una ejecución perdida se recupera solo si aún es madrugada (no compite con el tráfico del día)
+GRACIA_RECUPERACION = 3 * 3600
+
+
+async def refrescar_rucs():
+    """Refresca los RUC de proveedores con datos más antiguos"""
+    from app.dependencies import get_integracion_sunat_use_case
+
+    settings = get_settings()
+    resumen = await get_integracion_sunat_use_case().refrescar_proveedores(
+        limite=settings.sunat_refresco_limite,
+        concurrencia=settings.sunat_refresco_concurrencia,
+        antiguedad_minima=timedelta(seconds=settings.sunat_cache_soft_ttl)
+    )
+    logger.info(f"✅ Refresco de datos SUNAT completado: {resumen}")
+
+
+JOB = DefinicionJob(
+    id='refrescar_rucs_proveedores',
+    nombre='Refresco diario de datos SUNAT de proveedores',
+    funcion=refrescar_rucs,
+    cron={"hour": get_settings().sunat_refresco_hora, "minute": 0},
+    jitter_segundos=600,
+    max_duracion_segundos=3 * 3600,
+    gracia_recuperacion=GRACIA_RECUPERACION,
+    habilitado=lambda: get_settings().sunat_refresco_habilitado
+)
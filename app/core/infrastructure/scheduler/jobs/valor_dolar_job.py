@@ -0,0 +1,62 @@
+"""
+Job: actualización diaria del valor del dólar.
+
+Consulta las fuentes del tipo de cambio (DOLAR_FUENTES) y guarda el valor en la
+base de datos todos los días a las 8:30 AM hora Perú (America/Lima). Con varios
+workers solo el líder lo ejecuta, así se inserta un solo registro por día.
+"""
+import asyncio
+import logging
+from typing import Dict
+
+from app.config.database import SessionLocal
+from app.core.infrastructure.scheduler.job_registry import DefinicionJob
+from app.adapters.outbound.external_services.currency.valor_dolar import get_valor_dolar
+from app.adapters.outbound.database.repositories.valor_dolar_repository import ValorDolarRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def actualizar_valor_dolar():
+    """
+    Obtiene el tipo de cambio y guarda el valor del dólar en la BD.
+
+    Raises:
+        RuntimeError: Si no se pudo obtener o guardar el valor (queda en las métricas del job)
+    """
+    data = await get_valor_dolar().obtener_cambio()
+
+    if not data:
+        raise RuntimeError("No se pudo obtener el valor del dólar de ninguna fuente")
+
+    logger.info(f"📊 Valores obtenidos - Compra: {data['compra']}, Venta: {data['venta']}")
+    print(f"📊 Valores obtenidos - Compra: {data['compra']}, Venta: {data['venta']}")
+
+    # Aumentar el valor de la venta en 0.03 (según lógica del endpoint)
+    logger.info("📈 Aumentando el valor de la venta en 0.03")
+    data["venta"] = data["venta"] + 0.03
+
+    # El guardado es síncrono: se hace en un thread para no bloquear el event loop
+    await asyncio.to_thread(_guardar, data)
+
+    logger.info(f"✅ Valor del dólar actualizado exitosamente - Venta final: {data['venta']}, Compra: {data['compra']}")
+    print(f"✅ Valor del dólar actualizado exitosamente - Venta final: {data['venta']}, Compra: {data['compra']}")
+
+
+def _guardar(data: Dict) -> None:
+    db = SessionLocal()
+    try:
+        repo = ValorDolarRepository(db)
+        if repo.create_valor_dolar(data) is None:
+            raise RuntimeError("No se pudo guardar el valor del dólar en la base de datos")
+    finally:
+        db.close()
+
+
+JOB = DefinicionJob(
+    id='actualizar_dolar_diario',
+    nombre='Actualización diaria del valor del dólar',
+    funcion=actualizar_valor_dolar,
+    cron={"hour": 8, "minute": 30},
+    max_duracion_segundos=300
+)
@@ -0,0 +1,175 @@
+"""
+Elección de líder entre workers/réplicas para los schedulers.
+
+Cada proceso intenta tomar un lock consultivo de MySQL (GET_LOCK) con una
+conexión dedicada. El lock pertenece a esa conexión: si el proceso líder muere
+o pierde la conexión, MySQL lo libera y otro proceso lo toma en el siguiente
+intento (cada `intervalo` segundos). El líder comprueba en cada ciclo que
+sigue siendo dueño del lock (renovación); si no, deja de serlo.
+
+Con otra base de datos (ej: SQLite en desarrollo) no hay varios workers que
+coordinar y el proceso es líder siempre.
+"""
+import logging
+import threading
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+
+class EleccionLider:
+    """Lock de liderazgo con notificación a los schedulers al ganarlo o perderlo"""
+
+    def __init__(self, engine: Engine, nombre_lock: str, intervalo: float = 15.0):
+        """
+        Args:
+            engine: Motor SQLAlchemy de la base de datos compartida por los workers
+            nombre_lock: Nombre del lock (MySQL lo comparte entre todas las bases del servidor)
+            intervalo: Segundos entre intentos de tomar el lock y comprobaciones del líder
+        """
+        self.engine = engine
+        # GET_LOCK acepta hasta 64 caracteres
+        self.nombre_lock = nombre_lock[:64]
+        self.intervalo = intervalo
+        self._conexion: Optional[Connection] = None
+        self._es_lider = False
+        self._oyentes: List[Tuple[Callable[[], None], Callable[[], None]]] = []
+        self._lock = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    @property
+    def es_lider(self) -> bool:
+        return self._es_lider
+
+    def agregar_oyente(self, al_ganar: Callable[[], None], al_perder: Callable[[], None]) -> None:
+        """
+        Registra callbacks de cambio de liderazgo (se llaman desde el thread de la elección)
+
+        Si el proceso ya es líder, `al_ganar` se llama de inmediato.
+        """
+        with self._lock:
+            self._oyentes.append((al_ganar, al_perder))
+            es_lider = self._es_lider
+        if es_lider:
+            self._notificar(al_ganar)
+
+    def start(self) -> None:
+        """Inicia el ciclo de elección en un thread en segundo plano"""
+        if self._hilo is not None:
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._ciclo, name="eleccion-lider-scheduler", daemon=True)
+        self._hilo.start()
+
+    def shutdown(self) -> None:
+        """Detiene la elección y libera el liderazgo para que otro worker lo tome de inmediato"""
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout=self.intervalo + 5)
+            self._hilo = None
+        if self._es_lider:
+            self._perder_liderazgo(liberar=True)
+
+    def _ciclo(self) -> None:
+        while not self._detener.is_set():
+            try:
+                if self._es_lider:
+                    if not self._sigue_siendo_lider():
+                        logger.warning("⚠️ Se perdió el lock de líder de los schedulers")
+                        self._perder_liderazgo(liberar=False)
+                elif self._intentar_tomar_lock():
+                    self._ganar_liderazgo()
+            except Exception as e:
+                logger.error(f"❌ Error en la elección de líder de los schedulers: {e}", exc_info=True)
+                if self._es_lider:
+                    self._perder_liderazgo(liberar=False)
+            self._detener.wait(self.intervalo)
+
+    def _intentar_tomar_lock(self) -> bool:
+        if self.engine.dialect.name != "mysql":
+            return True
+        conexion = self.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            tomado = conexion.execute(text("SELECT GET_LOCK(:nombre, 0)"), {"nombre": self.nombre_lock}).scalar()
+        except Exception:
+            conexion.close()
+            raise
+        if tomado == 1:
+            self._conexion = conexion
+            return True
+        conexion.close()
+        return False
+
+    def _sigue_siendo_lider(self) -> bool:
+        if self._conexion is None:
+            # Sin MySQL el proceso es líder siempre
+            return True
+        try:
+            return self._conexion.execute(
+                text("SELECT IS_USED_LOCK(:nombre) = CONNECTION_ID()"), {"nombre": self.nombre_lock}
+            ).scalar() == 1
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo verificar el lock de líder: {e}")
+            return False
+
+    def _ganar_liderazgo(self) -> None:
+        with self._lock:
+            self._es_lider = True
+            oyentes = list(self._oyentes)
+        logger.info(f"👑 Este proceso es el líder de los schedulers (lock '{self.nombre_lock}')")
+        for al_ganar, _ in oyentes:
+            self._notificar(al_ganar)
+
+    def _perder_liderazgo(self, liberar: bool) -> None:
+        with self._lock:
+            self._es_lider = False
+            oyentes = list(self._oyentes)
+        for _, al_perder in oyentes:
+            self._notificar(al_perder)
+
+        conexion, self._conexion = self._conexion, None
+        if conexion is not None:
+            try:
+                if liberar:
+                    conexion.execute(text("SELECT RELEASE_LOCK(:nombre)"), {"nombre": self.nombre_lock})
+                else:
+                    # Conexión en estado dudoso: se descarta en lugar de volver al pool
+                    conexion.invalidate()
+                conexion.close()
+            except Exception:
+                pass
+        logger.info("🔕 Este proceso dejó de ser el líder de los schedulers")
+
+    @staticmethod
+    def _notificar(callback: Callable[[], None]) -> None:
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"❌ Error al notificar cambio de líder: {e}", exc_info=True)
+
+
+# Instancia global: un solo lock de liderazgo para todos los schedulers del proceso
+_eleccion_lider: Optional[EleccionLider] = None
+_singleton_lock = threading.Lock()
+
+
+def get_eleccion_lider() -> EleccionLider:
+    """Obtiene la elección de líder compartida por los schedulers"""
+    global _eleccion_lider
+    if _eleccion_lider is None:
+        with _singleton_lock:
+            if _eleccion_lider is None:
+                from app.config.database import engine
+                from app.config.settings import get_settings
+
+                settings = get_settings()
+                _eleccion_lider = EleccionLider(
+                    engine,
+                    nombre_lock=f"{settings.scheduler_lider_lock}:{engine.url.database or ''}",
+                    intervalo=settings.scheduler_lider_intervalo
+                )
+    return _eleccion_lider
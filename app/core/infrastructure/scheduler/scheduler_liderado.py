@@ -0,0 +1,102 @@
+"""
+Base de los schedulers que ejecutan sus jobs solo en el proceso líder.
+
+Todos los workers arrancan su scheduler en pausa; el que gana la elección de
+líder (leader_election) lo reanuda y los demás lo mantienen pausado. Los jobs
+se guardan en una tabla de la base de datos (SQLAlchemyJobStore), con su
+próxima ejecución: si el líder cae y la hora de un job pasa sin ejecutarse,
+el nuevo líder lo ejecuta una vez al reanudar (coalesce), siempre que no
+hayan pasado más de `misfire_grace_time` segundos.
+"""
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Type
+
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.schedulers.base import BaseScheduler
+from pytz import timezone
+
+from app.config.database import engine
+from app.config.settings import get_settings
+from app.core.infrastructure.scheduler.leader_election import get_eleccion_lider
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulerLiderado(ABC):
+    """
+    Scheduler APScheduler con job store en BD que solo corre en el líder.
+
+    Las subclases definen `programar_jobs` (con `asegurar_job`). Las funciones
+    de los jobs deben ser funciones de módulo para que el job store pueda
+    guardar su referencia.
+    """
+
+    def __init__(self, clase_scheduler: Type[BaseScheduler], tabla_jobs: str, nombre: str):
+        """
+        Args:
+            clase_scheduler: BackgroundScheduler (jobs síncronos) o AsyncIOScheduler (jobs async)
+            tabla_jobs: Tabla del job store (una por scheduler, creada por migración)
+            nombre: Nombre para los logs
+        """
+        self.nombre = nombre
+        self.peru_tz = timezone('America/Lima')
+        self.scheduler = clase_scheduler(
+            jobstores={"default": SQLAlchemyJobStore(engine=engine, tablename=tabla_jobs)},
+            job_defaults={
+                "coalesce": True,
+                "max_instances": 1,
+                "misfire_grace_time": get_settings().scheduler_misfire_gracia,
+            },
+            timezone=self.peru_tz
+        )
+
+    @abstractmethod
+    def programar_jobs(self) -> None:
+        """Registra los jobs del scheduler (se llama al ganar el liderazgo)"""
+        pass
+
+    def asegurar_job(self, func: Callable, trigger: Any, id: str, name: str, **opciones) -> None:
+        """
+        Crea el job o lo actualiza si cambió su programación.
+
+        Si ya existe con el mismo trigger se conserva tal cual: su próxima
+        ejecución guardada es lo que permite recuperar una ejecución perdida.
+        """
+        existente = self.scheduler.get_job(id)
+        if existente is not None and str(existente.trigger) == str(trigger):
+            return
+        self.scheduler.add_job(func=func, trigger=trigger, id=id, name=name, replace_existing=True, **opciones)
+        logger.info(f"📅 Job '{id}' programado: {trigger}")
+
+    def start(self):
+        """Inicia el scheduler en pausa y lo activa cuando este proceso sea el líder"""
+        try:
+            self.scheduler.start(paused=True)
+            get_eleccion_lider().agregar_oyente(self._activar, self._pausar)
+            logger.info(f"✅ Scheduler de {self.nombre} iniciado (ejecuta jobs solo en el líder)")
+        except Exception as e:
+            logger.error(f"❌ Error al iniciar el scheduler de {self.nombre}: {e}", exc_info=True)
+
+    def _activar(self) -> None:
+        if not self.scheduler.running:
+            return
+        self.programar_jobs()
+        self.scheduler.resume()
+        logger.info(f"▶️ Scheduler de {self.nombre} activo en este proceso (líder)")
+
+    def _pausar(self) -> None:
+        if not self.scheduler.running:
+            return
+        self.scheduler.pause()
+        logger.info(f"⏸️ Scheduler de {self.nombre} en pausa (este proceso no es el líder)")
+
+    def shutdown(self):
+        """Detiene el scheduler de forma segura"""
+        if not self.scheduler.running:
+            return
+        try:
+            self.scheduler.shutdown()
+            logger.info(f"🛑 Scheduler de {self.nombre} detenido")
+        except Exception as e:
+            logger.error(f"❌ Error al detener el scheduler de {self.nombre}: {e}", exc_info=True)
@@ -0,0 +1,38 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+
+class RucSnapshotRepositoryPort(ABC):
+    """
+    Port para el repositorio de datos de RUC consultados en SUNAT
+    """
+
+    @abstractmethod
+    def obtener(self, rucs: List[str]) -> Dict[str, Tuple[Dict, datetime]]:
+        """
+        Obtiene los datos guardados de varios RUC en una sola consulta
+
+        Returns:
+            Dict[str, Tuple[Dict, datetime]]: RUC -> (datos, fecha de consulta); los RUC sin datos no aparecen
+        """
+        pass
+
+    @abstractmethod
+    def guardar(self, ruc: str, datos: Dict, fetched_at: datetime) -> None:
+        """
+        Guarda (o reemplaza) los datos de un RUC
+        """
+        pass
+
+    @abstractmethod
+    def rucs_proveedores_a_refrescar(self, limite: int, consultados_antes_de: datetime) -> List[str]:
+        """
+        RUC de proveedores sin datos guardados o consultados antes de la fecha indicada,
+        los más antiguos primero
+
+        Args:
+            limite: Cantidad máxima de RUC
+            consultados_antes_de: Solo RUC cuya última consulta es anterior a esta fecha
+        """
+        pass
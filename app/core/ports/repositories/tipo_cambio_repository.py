@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from decimal import Decimal
-from typing import Optional
+from typing import Optional, List, Tuple
 from datetime import date
 
 
@@ -31,3 +31,25 @@ class TipoCambioRepositoryPort(ABC):
             Decimal: Tipo de cambio venta, None si no hay datos
         """
         pass
+
+    @abstractmethod
+    def obtener_historial_tipo_cambio(self) -> List[Tuple[date, Decimal]]:
+        """
+        Obtiene el historial completo de tipos de cambio (venta) ordenado por fecha ascendente
+
+        Returns:
+            List[Tuple[date, Decimal]]: Pares (fecha, venta), uno por fecha
+        """
+        pass
+
+    @abstractmethod
+    def obtener_ultima_version_tipo_cambio(self) -> Optional[Tuple[int, date]]:
+        """
+        Obtiene el id y la fecha del último registro de tipo de cambio
+
+        Consulta barata para saber si otro proceso insertó un tipo de cambio nuevo.
+
+        Returns:
+            Tuple[int, date]: (id máximo, fecha máxima), None si no hay datos o falla la consulta
+        """
+        pass
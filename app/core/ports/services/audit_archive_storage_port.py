@@ -0,0 +1,21 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+
+class AuditArchiveStoragePort(ABC):
+  """Puerto para guardar y leer archivos del archivo histórico de auditorías"""
+
+  @abstractmethod
+  def save(self, key: str, content: bytes) -> None:
+    """Guarda (o reemplaza) el contenido bajo la clave indicada"""
+    pass
+
+  @abstractmethod
+  def read(self, key: str) -> Optional[bytes]:
+    """Lee el contenido de una clave, None si no existe"""
+    pass
+
+  @abstractmethod
+  def list_keys(self, prefix: str) -> List[str]:
+    """Claves que empiezan con el prefijo indicado"""
+    pass
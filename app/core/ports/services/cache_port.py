@@ -0,0 +1,66 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+
+class CachePort(ABC):
+  """Puerto asíncrono para el caché clave/valor (valores serializables a JSON)"""
+
+  @abstractmethod
+  async def get(self, key: str) -> Optional[Any]:
+    """Obtiene un valor, None si no existe"""
+    pass
+
+  @abstractmethod
+  async def mget(self, keys: List[str]) -> List[Optional[Any]]:
+    """Obtiene varios valores en una sola operación, alineados con `keys`"""
+    pass
+
+  @abstractmethod
+  async def set(self, key: str, value: Any, ttl_seconds: int) -> bool:
+    """Guarda un valor con tiempo de expiración"""
+    pass
+
+  @abstractmethod
+  async def mset(self, values: Dict[str, Any], ttl_seconds: int) -> bool:
+    """Guarda varios valores con el mismo tiempo de expiración en una sola operación"""
+    pass
+
+  @abstractmethod
+  async def delete(self, key: str) -> bool:
+    """Elimina una clave"""
+    pass
+
+  @abstractmethod
+  async def delete_pattern(self, pattern: str) -> int:
+    """Elimina las claves que coinciden con un patrón glob (ej: "sunat:ruc:*"), devuelve cuántas"""
+    pass
+
+  @abstractmethod
+  async def exists(self, key: str) -> bool:
+    """Indica si la clave existe"""
+    pass
+
+  @abstractmethod
+  async def adquirir_lock(self, key: str, ttl_seconds: int) -> Optional[str]:
+    """Adquiere un lock con expiración; devuelve el token del dueño o None si otro lo tiene"""
+    pass
+
+  @abstractmethod
+  async def renovar_lock(self, key: str, token: str, ttl_seconds: int) -> bool:
+    """Extiende la expiración del lock si sigue perteneciendo a `token`; False si ya se perdió"""
+    pass
+
+  @abstractmethod
+  async def liberar_lock(self, key: str, token: str) -> bool:
+    """Libera el lock solo si sigue perteneciendo a `token`"""
+    pass
+
+  @abstractmethod
+  async def health_check(self) -> bool:
+    """Indica si el backend del caché responde"""
+    pass
+
+  @abstractmethod
+  async def close(self) -> None:
+    """Libera las conexiones del caché"""
+    pass
@@ -0,0 +1,428 @@
+"""
+Servicio de retención y archivo de auditorías.
+
+Las tablas `ordenes_compra_auditoria` y `registro_compra_auditoria` reciben una
+fila por cada creación, edición y eliminación. Para que se mantengan pequeñas,
+los meses completos más antiguos que el horizonte de retención se mueven a
+archivos JSONL comprimidos (gzip) en el almacenamiento de archivo (local o S3):
+
+    {tabla}/{AAAA-MM}/{tabla}-{AAAA-MM}-{id_min}-{id_max}.jsonl.gz
+
+Cada archivo tiene su propia entrada de manifiesto, un objeto aparte
+(`manifest/{tabla}/{AAAA-MM}/{nombre}.json`) con su rango de IDs y de fechas.
+Escribir una entrada nunca modifica otra, así que varios procesos pueden
+archivar sin pisarse; el índice se arma listando el prefijo `manifest/`.
+La lectura usa esos rangos para descomprimir solo los archivos necesarios y
+se detiene al completar la página.
+
+Orden de escritura: archivo → entrada de manifiesto → DELETE + commit. Si el
+proceso se interrumpe entre pasos, las filas siguen en la tabla y se vuelven a
+archivar en la siguiente corrida; la lectura descarta IDs repetidos.
+
+Como las filas se borran de la BD, solo se archiva con un almacenamiento
+declarado duradero (S3, o un directorio local en un volumen persistente).
+"""
+import gzip
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import delete, func
+from sqlalchemy.orm import Session
+
+from app.adapters.outbound.database.models.ordenes_compra_auditoria_model import OrdenesCompraAuditoriaModel
+from app.adapters.outbound.database.models.ordenes_compra_auditoria_producto_model import OrdenesCompraAuditoriaProductoModel
+from app.adapters.outbound.database.models.ordenes_compra_model import OrdenesCompraModel
+from app.adapters.outbound.database.models.registro_compra_auditoria_model import RegistroCompraAuditoriaModel
+from app.adapters.outbound.database.models.trabajadores_model import TrabajadoresModel
+from app.adapters.outbound.database.models.usuarios_model import UsuariosModel
+from app.core.ports.services.audit_archive_storage_port import AuditArchiveStoragePort
+from app.shared.utils.json_encoder import dumps
+
+logger = logging.getLogger(__name__)
+
+TABLA_ORDENES_COMPRA = OrdenesCompraAuditoriaModel.__tablename__
+TABLA_REGISTRO_COMPRA = RegistroCompraAuditoriaModel.__tablename__
+TABLAS = {
+    TABLA_ORDENES_COMPRA: OrdenesCompraAuditoriaModel,
+    TABLA_REGISTRO_COMPRA: RegistroCompraAuditoriaModel,
+}
+
+PREFIJO_MANIFIESTO = "manifest/"
+# Segundos que se reutiliza el índice leído (otro worker pudo archivar)
+_MANIFIESTO_TTL = 300
+# Archivos descomprimidos retenidos en memoria (son inmutables)
+_PARTES_CACHE_MAX = 16
+
+
+class ArchivoAuditoriaNoDuraderoError(Exception):
+    """El almacenamiento del archivo no está declarado duradero: no se borran auditorías"""
+
+
+class AuditoriaArchivoService:
+    """
+    Mueve auditorías antiguas a archivos comprimidos y las lee de vuelta.
+
+    Características:
+    - Archiva solo meses completos anteriores al horizonte de retención
+    - Lotes acotados (filas_por_parte) por transacción: memoria constante
+    - Una entrada de manifiesto por archivo (sin read-modify-write compartido)
+    - Lectura perezosa en orden descendente: solo los archivos que cubren la página
+    - Caché LRU de archivos leídos (el contenido archivado no cambia)
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        storage: AuditArchiveStoragePort,
+        retencion_dias: int = 365,
+        filas_por_parte: int = 5000,
+        almacenamiento_durable: bool = False
+    ):
+        """
+        Args:
+            session_factory: Fábrica de sesiones DB
+            storage: Almacenamiento del archivo (local o S3)
+            retencion_dias: Días que las auditorías permanecen en las tablas
+            filas_por_parte: Filas máximas por lote archivado
+            almacenamiento_durable: El almacenamiento sobrevive a reinicios y redeploys;
+                                    sin esto `archivar_antiguos` no borra nada
+        """
+        self._session_factory = session_factory
+        self._storage = storage
+        self._retencion_dias = retencion_dias
+        self._filas_por_parte = filas_por_parte
+        self._almacenamiento_durable = almacenamiento_durable
+        self._lock = threading.Lock()
+        # Entradas ya leídas por clave (son inmutables: se leen una sola vez)
+        self._entradas_leidas: Dict[str, Dict[str, Any]] = {}
+        self._manifiesto: Optional[List[Dict[str, Any]]] = None
+        self._manifiesto_leido_en: Optional[float] = None
+        self._partes: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+
+    # ------------------------------------------------------------------
+    # Manifiesto
+    # ------------------------------------------------------------------
+
+    def _leer_manifiesto(self) -> List[Dict[str, Any]]:
+        """Todas las entradas de manifiesto (se relista el prefijo cada _MANIFIESTO_TTL)"""
+        vigente = (
+            self._manifiesto is not None
+            and time.monotonic() - self._manifiesto_leido_en < _MANIFIESTO_TTL
+        )
+        if vigente:
+            return self._manifiesto
+
+        with self._lock:
+            for clave in self._storage.list_keys(PREFIJO_MANIFIESTO):
+                if clave.endswith(".json") and clave not in self._entradas_leidas:
+                    contenido = self._storage.read(clave)
+                    if contenido:
+                        self._entradas_leidas[clave] = json.loads(contenido)
+            entradas = list(self._entradas_leidas.values())
+
+            self._manifiesto = entradas
+            self._manifiesto_leido_en = time.monotonic()
+        return entradas
+
+    def _registrar_en_manifiesto(self, entrada: Dict[str, Any]) -> None:
+        """Escribe la entrada de un archivo como objeto propio"""
+        nombre = entrada["clave"].rsplit("/", 1)[-1].removesuffix(".jsonl.gz")
+        clave = f"{PREFIJO_MANIFIESTO}{entrada['tabla']}/{entrada['mes']}/{nombre}.json"
+        self._storage.save(clave, dumps(entrada).encode("utf-8"))
+        with self._lock:
+            self._entradas_leidas[clave] = entrada
+            if self._manifiesto is not None:
+                self._manifiesto.append(entrada)
+
+    def _entradas(self, tabla: str, desde: Optional[str], hasta: Optional[str]) -> List[Dict[str, Any]]:
+        """Entradas de una tabla cuyo rango de fechas (ISO) se cruza con el pedido"""
+        return [
+            e for e in self._leer_manifiesto()
+            if e["tabla"] == tabla
+            and (desde is None or e["fecha_max"] >= desde)
+            and (hasta is None or e["fecha_min"] <= hasta)
+        ]
+
+    # ------------------------------------------------------------------
+    # Archivado
+    # ------------------------------------------------------------------
+
+    def limite_retencion(self, ahora: Optional[datetime] = None) -> datetime:
+        """Inicio del mes que contiene (ahora - retención): todo lo anterior se archiva"""
+        referencia = (ahora or datetime.now()) - timedelta(days=self._retencion_dias)
+        return referencia.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    def archivar_antiguos(self) -> Dict[str, int]:
+        """
+        Archiva las auditorías de todas las tablas anteriores al límite de retención.
+
+        Returns:
+            dict: Filas archivadas por tabla
+
+        Raises:
+            ArchivoAuditoriaNoDuraderoError: Si el almacenamiento no está declarado duradero
+        """
+        if not self._almacenamiento_durable:
+            raise ArchivoAuditoriaNoDuraderoError(
+                "El archivo de auditorías no está en un almacenamiento duradero: configure "
+                "AUDITORIA_ARCHIVO_BACKEND=s3, o =local con AUDITORIA_ARCHIVO_LOCAL_PERSISTENTE=true "
+                "si AUDITORIA_ARCHIVO_DIR es un volumen persistente"
+            )
+        limite = self.limite_retencion()
+        logger.info(f"📦 Archivando auditorías anteriores a {limite:%Y-%m-%d}")
+        return {tabla: self._archivar_tabla(tabla, limite) for tabla in TABLAS}
+
+    def _archivar_tabla(self, tabla: str, limite: datetime) -> int:
+        modelo = TABLAS[tabla]
+        db = self._session_factory()
+        total = 0
+        try:
+            while True:
+                filas = (
+                    db.query(modelo)
+                    .filter(modelo.fecha_evento < limite)
+                    .order_by(modelo.id_auditoria)
+                    .limit(self._filas_por_parte)
+                    .all()
+                )
+                if not filas:
+                    break
+
+                por_mes = defaultdict(list)
+                for registro in self._serializar(db, tabla, filas):
+                    por_mes[registro["fecha_evento"][:7]].append(registro)
+                for mes, registros in sorted(por_mes.items()):
+                    self._escribir_parte(tabla, mes, registros)
+
+                # Solo se borra lo que ya quedó escrito y registrado en el manifiesto.
+                # En ordenes_compra_auditoria la tabla lateral de productos se borra por ON DELETE CASCADE
+                ids = [f.id_auditoria for f in filas]
+                db.execute(delete(modelo).where(modelo.id_auditoria.in_(ids)))
+                db.commit()
+                db.expunge_all()
+                total += len(filas)
+
+            if total:
+                logger.info(f"✅ {tabla}: {total} auditorías archivadas")
+            return total
+        except Exception as e:
+            db.rollback()
+            logger.error(f"❌ Error archivando {tabla} (archivadas hasta ahora: {total}): {e}", exc_info=True)
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _serializar(db: Session, tabla: str, filas: list) -> List[Dict[str, Any]]:
+        """
+        Convierte filas ORM en diccionarios con todas sus columnas.
+
+        Para órdenes de compra también guarda el número de OC y el nombre del usuario
+        ya resueltos y los productos afectados, porque la orden o el usuario pueden
+        no existir cuando se lea el archivo.
+        """
+        columnas = [c.key for c in TABLAS[tabla].__mapper__.column_attrs]
+        registros = [{c: getattr(f, c) for c in columnas} for f in filas]
+        for registro in registros:
+            registro["fecha_evento"] = registro["fecha_evento"].isoformat()
+
+        if tabla != TABLA_ORDENES_COMPRA:
+            return registros
+
+        ids = [r["id_auditoria"] for r in registros]
+        resueltos = {
+            id_auditoria: (numero_oc, nombre_usuario)
+            for id_auditoria, numero_oc, nombre_usuario in db.query(
+                OrdenesCompraAuditoriaModel.id_auditoria,
+                func.coalesce(OrdenesCompraAuditoriaModel.numero_oc, OrdenesCompraModel.correlative),
+                func.concat(TrabajadoresModel.nombre, ' ', TrabajadoresModel.apellido)
+            )
+            .outerjoin(OrdenesCompraModel, OrdenesCompraAuditoriaModel.id_orden_compra == OrdenesCompraModel.id_orden)
+            .outerjoin(UsuariosModel, OrdenesCompraAuditoriaModel.id_usuario == UsuariosModel.id_usuario)
+            .outerjoin(TrabajadoresModel, UsuariosModel.id_trabajador == TrabajadoresModel.id_trabajador)
+            .filter(OrdenesCompraAuditoriaModel.id_auditoria.in_(ids))
+            .all()
+        }
+        productos = defaultdict(list)
+        for id_auditoria, id_producto, tipo_cambio in db.query(
+            OrdenesCompraAuditoriaProductoModel.id_auditoria,
+            OrdenesCompraAuditoriaProductoModel.id_producto,
+            OrdenesCompraAuditoriaProductoModel.tipo_cambio
+        ).filter(OrdenesCompraAuditoriaProductoModel.id_auditoria.in_(ids)).all():
+            productos[id_auditoria].append({"id_producto": id_producto, "tipo_cambio": tipo_cambio})
+
+        for registro in registros:
+            numero_oc, nombre_usuario = resueltos.get(registro["id_auditoria"], (None, None))
+            registro["numero_oc_resuelto"] = numero_oc
+            registro["nombre_usuario"] = nombre_usuario
+            registro["productos_afectados"] = productos.get(registro["id_auditoria"], [])
+        return registros
+
+    def _escribir_parte(self, tabla: str, mes: str, registros: List[Dict[str, Any]]) -> None:
+        """Escribe un archivo JSONL.gz y lo registra en el manifiesto"""
+        id_min = min(r["id_auditoria"] for r in registros)
+        id_max = max(r["id_auditoria"] for r in registros)
+        clave = f"{tabla}/{mes}/{tabla}-{mes}-{id_min}-{id_max}.jsonl.gz"
+
+        lineas = "\n".join(dumps(r, default=str) for r in registros) + "\n"
+        self._storage.save(clave, gzip.compress(lineas.encode("utf-8")))
+
+        self._registrar_en_manifiesto({
+            "tabla": tabla,
+            "mes": mes,
+            "clave": clave,
+            "filas": len(registros),
+            "id_min": id_min,
+            "id_max": id_max,
+            "fecha_min": min(r["fecha_evento"] for r in registros),
+            "fecha_max": max(r["fecha_evento"] for r in registros),
+            "archivado_en": datetime.now().isoformat(),
+        })
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def tiene_archivo(self, tabla: str, fecha_desde: Optional[datetime] = None, fecha_hasta: Optional[datetime] = None) -> bool:
+        """Indica si hay auditorías archivadas de la tabla en el rango de fechas"""
+        return bool(self._entradas(tabla, _iso(fecha_desde), _iso(fecha_hasta)))
+
+    def fecha_max_archivada(self, tabla: str) -> Optional[datetime]:
+        """Fecha del evento archivado más reciente de la tabla, None si no hay archivo"""
+        entradas = self._entradas(tabla, None, None)
+        return datetime.fromisoformat(max(e["fecha_max"] for e in entradas)) if entradas else None
+
+    def contar_filas(self, tabla: str, fecha_desde: Optional[datetime] = None, fecha_hasta: Optional[datetime] = None) -> int:
+        """Filas de los archivos que se cruzan con el rango, según el manifiesto (estimado: no lee archivos)"""
+        return sum(e["filas"] for e in self._entradas(tabla, _iso(fecha_desde), _iso(fecha_hasta)))
+
+    def _leer_parte(self, clave: str) -> List[Dict[str, Any]]:
+        """Registros de un archivo, ordenados por fecha_evento desc, id_auditoria desc"""
+        with self._lock:
+            if clave in self._partes:
+                self._partes.move_to_end(clave)
+                return self._partes[clave]
+
+        contenido = self._storage.read(clave)
+        if contenido is None:
+            logger.warning(f"Archivo de auditoría listado en el manifiesto no encontrado: {clave}")
+            return []
+        registros = [json.loads(linea) for linea in gzip.decompress(contenido).decode("utf-8").splitlines() if linea]
+        registros.sort(key=_clave_orden, reverse=True)
+
+        with self._lock:
+            self._partes[clave] = registros
+            if len(self._partes) > _PARTES_CACHE_MAX:
+                self._partes.popitem(last=False)
+        return registros
+
+    def iterar_registros(
+        self,
+        tabla: str,
+        fecha_desde: Optional[datetime] = None,
+        fecha_hasta: Optional[datetime] = None,
+        antes_de: Optional[Tuple[datetime, int]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Recorre las auditorías archivadas de una tabla en el rango de fechas.
+
+        Los archivos se leen bajo demanda: se agrupan por rangos de fechas que se
+        solapan y cada grupo se descomprime solo cuando el recorrido llega a él,
+        así una página que se completa con los primeros registros no lee el resto.
+
+        Args:
+            tabla: Tabla de auditoría
+            fecha_desde: Fecha mínima del evento (incluida)
+            fecha_hasta: Fecha máxima del evento (incluida)
+            antes_de: (fecha_evento, id_auditoria) de un cursor: solo registros posteriores en el orden
+
+        Yields:
+            dict: Registros sin IDs repetidos, ordenados por fecha_evento desc, id_auditoria desc
+        """
+        desde, hasta = _iso(fecha_desde), _iso(fecha_hasta)
+        tope = (antes_de[0].isoformat(), antes_de[1]) if antes_de else None
+        if tope and (hasta is None or tope[0] < hasta):
+            hasta = tope[0]
+
+        entradas = sorted(self._entradas(tabla, desde, hasta), key=lambda e: e["fecha_max"], reverse=True)
+        vistos = set()
+        i = 0
+        while i < len(entradas):
+            # Grupo de archivos con fechas solapadas: se ordena en conjunto
+            grupo = [entradas[i]]
+            fecha_min_grupo = entradas[i]["fecha_min"]
+            i += 1
+            while i < len(entradas) and entradas[i]["fecha_max"] >= fecha_min_grupo:
+                grupo.append(entradas[i])
+                fecha_min_grupo = min(fecha_min_grupo, entradas[i]["fecha_min"])
+                i += 1
+
+            registros = [r for e in grupo for r in self._leer_parte(e["clave"])]
+            if len(grupo) > 1:
+                registros.sort(key=_clave_orden, reverse=True)
+
+            for registro in registros:
+                if registro["id_auditoria"] in vistos:
+                    continue
+                if (desde and registro["fecha_evento"] < desde) or (hasta and registro["fecha_evento"] > hasta):
+                    continue
+                if tope and _clave_orden(registro) >= tope:
+                    continue
+                vistos.add(registro["id_auditoria"])
+                yield registro
+
+
+def _iso(fecha: Optional[datetime]) -> Optional[str]:
+    return fecha.isoformat() if fecha else None
+
+
+def _clave_orden(registro: Dict[str, Any]) -> Tuple[str, int]:
+    return registro["fecha_evento"], registro["id_auditoria"]
+
+
+# Singleton: Una única instancia para toda la aplicación
+_auditoria_archivo_service: Optional[AuditoriaArchivoService] = None
+_singleton_lock = threading.Lock()
+
+
+def get_auditoria_archivo_service() -> Optional[AuditoriaArchivoService]:
+    """
+    Obtiene la instancia única del servicio de archivo de auditorías,
+    con el almacenamiento configurado en AUDITORIA_ARCHIVO_BACKEND
+
+    Returns:
+        AuditoriaArchivoService: None si no hay almacenamiento configurado
+    """
+    global _auditoria_archivo_service
+    if _auditoria_archivo_service is None:
+        with _singleton_lock:
+            if _auditoria_archivo_service is None:
+                from app.config.database import SessionLocal
+                from app.config.settings import get_settings
+
+                settings = get_settings()
+                if not settings.auditoria_archivo_backend:
+                    return None
+                if settings.auditoria_archivo_backend == "s3":
+                    from app.adapters.outbound.storage.s3_audit_archive_storage import S3AuditArchiveStorage
+                    storage = S3AuditArchiveStorage(prefix=settings.auditoria_archivo_dir)
+                else:
+                    from app.adapters.outbound.storage.local_audit_archive_storage import LocalAuditArchiveStorage
+                    storage = LocalAuditArchiveStorage(base_dir=settings.auditoria_archivo_dir)
+
+                _auditoria_archivo_service = AuditoriaArchivoService(
+                    session_factory=SessionLocal,
+                    storage=storage,
+                    retencion_dias=settings.auditoria_retencion_dias,
+                    filas_por_parte=settings.auditoria_archivo_filas_por_parte,
+                    almacenamiento_durable=(
+                        settings.auditoria_archivo_backend == "s3"
+                        or settings.auditoria_archivo_local_persistente
+                    )
+                )
+    return _auditoria_archivo_service
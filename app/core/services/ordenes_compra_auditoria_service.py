@@ -3,17 +3,52 @@ Servicio optimizado de auditoría para órdenes de compra.
 
 Este servicio registra cambios guardando solo IDs y concatenando valores
 en formato "anterior ----> nuevo". Los nombres se obtienen mediante JOINs.
+Los cambios de productos y otros datos van en un único registro compacto
+(ver app/shared/utils/auditoria_codec.py).
 """
-import json
 import logging
 from datetime import datetime
 from typing import Optional, Dict, Any, List
+from sqlalchemy import insert, func
 from sqlalchemy.orm import Session
 from app.adapters.outbound.database.models.ordenes_compra_auditoria_model import OrdenesCompraAuditoriaModel
+from app.adapters.outbound.database.models.ordenes_compra_auditoria_producto_model import OrdenesCompraAuditoriaProductoModel
+from app.adapters.outbound.database.models.ordenes_compra_model import OrdenesCompraModel
+from app.shared.utils.auditoria_codec import codificar_cambios
 
 logger = logging.getLogger(__name__)
 
 
+def _productos_afectados(**productos_por_tipo: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Construye las filas de la tabla lateral de productos afectados.
+
+    Args:
+        productos_por_tipo: tipo_cambio (AGREGADO, MODIFICADO, ELIMINADO) -> lista de productos con id_producto
+
+    Returns:
+        Filas sin duplicados por (id_producto, tipo_cambio)
+    """
+    filas = []
+    vistos = set()
+    for tipo_cambio, productos in productos_por_tipo.items():
+        for p in productos or []:
+            try:
+                id_producto = int(p.get('id_producto'))
+            except (ValueError, TypeError):
+                continue
+            if (id_producto, tipo_cambio) in vistos:
+                continue
+            vistos.add((id_producto, tipo_cambio))
+            filas.append({'id_producto': id_producto, 'tipo_cambio': tipo_cambio})
+    return filas
+
+
+def _modelos_productos_afectados(**productos_por_tipo: Optional[List[Dict[str, Any]]]) -> List[OrdenesCompraAuditoriaProductoModel]:
+    """Igual que _productos_afectados pero como modelos para asociarlos por relationship"""
+    return [OrdenesCompraAuditoriaProductoModel(**fila) for fila in _productos_afectados(**productos_por_tipo)]
+
+
 class OrdenesCompraAuditoriaService:
     """
     Servicio para registrar cambios en órdenes de compra con formato optimizado.
@@ -21,7 +56,9 @@ class OrdenesCompraAuditoriaService:
     Formato de datos:
     - IDs sin nombres (nombres se obtienen por JOIN)
     - Cambios concatenados: "anterior ----> nuevo"
-    - Productos solo como IDs
+    - Productos solo como IDs, en el registro compacto `cambios` junto con los demás cambios
+    - IDs de proveedor/contacto y productos afectados también en columnas
+      estructuradas e indexadas para filtrar por igualdad
     """
 
     def __init__(self, db: Session):
@@ -56,38 +93,23 @@ class OrdenesCompraAuditoriaService:
             numero_oc: Número correlativo de la OC (ej: OC-000512-2025)
         """
         try:
-            cantidad_productos = len(productos)
-
-            descripcion = (
-                f"Orden de compra creada con {cantidad_productos} producto(s). "
-                f"Monto total: S/ {monto_total:,.2f}"
-            )
-
-            # Solo guardar IDs de productos agregados
-            ids_productos = [str(p.get('id_producto')) for p in productos]
-            productos_agregados_json = json.dumps(ids_productos) if ids_productos else None
-
-            # Preparar cambios adicionales si existen
-            cambios_adicionales_json = None
-            if otros_datos:
-                cambios_adicionales_json = json.dumps(otros_datos)
-
-            # Crear registro de auditoría
-            auditoria = OrdenesCompraAuditoriaModel(
-                tipo_operacion="CREACION",
-                fecha_evento=datetime.now(),
+            fila = self._fila_creacion(
                 id_orden_compra=id_orden_compra,
-                numero_oc=numero_oc,  # Guardar número de OC
                 id_usuario=id_usuario,
                 id_cotizacion=id_cotizacion,
                 id_cotizacion_versiones=id_cotizacion_versiones,
-                # Solo IDs, sin flechas para creación
-                cambio_proveedor=str(id_proveedor),
-                cambio_contacto=str(id_contacto),
-                cambio_monto=str(monto_total),
-                productos_agregados=productos_agregados_json,
-                cambios_adicionales=cambios_adicionales_json,
-                descripcion=descripcion
+                id_proveedor=id_proveedor,
+                id_contacto=id_contacto,
+                productos=productos,
+                monto_total=monto_total,
+                otros_datos=otros_datos,
+                numero_oc=numero_oc
+            )
+
+            # Crear registro de auditoría
+            auditoria = OrdenesCompraAuditoriaModel(
+                **fila,
+                productos_afectados=_modelos_productos_afectados(AGREGADO=productos)
             )
 
             self.db.add(auditoria)
@@ -97,6 +119,119 @@ class OrdenesCompraAuditoriaService:
             logger.error(f"❌ Error al registrar auditoría de creación: {e}", exc_info=True)
             raise
 
+    def registrar_creacion_ordenes_batch(
+        self,
+        ordenes: List[OrdenesCompraModel],
+        productos_por_orden: Dict[int, List[Dict[str, Any]]]
+    ) -> None:
+        """
+        Registra la creación de varias órdenes de compra con inserts multi-fila.
+
+        Usa una sola sentencia INSERT para todas las auditorías, una consulta para
+        recuperar los IDs generados y otro INSERT para la tabla lateral de productos,
+        sin importar cuántas órdenes se creen. No hace commit.
+
+        Args:
+            ordenes: Órdenes ya persistidas (con flush) obtenidas de la BD
+            productos_por_orden: id_orden -> lista de productos con id_producto
+        """
+        if not ordenes:
+            return
+
+        try:
+            filas = []
+            for orden in ordenes:
+                filas.append(self._fila_creacion(
+                    id_orden_compra=orden.id_orden,
+                    id_usuario=orden.id_usuario,
+                    id_cotizacion=orden.id_cotizacion,
+                    id_cotizacion_versiones=orden.id_cotizacion_versiones,
+                    id_proveedor=orden.id_proveedor,
+                    id_contacto=orden.id_proveedor_contacto,
+                    productos=productos_por_orden.get(orden.id_orden, []),
+                    monto_total=float(orden.total) if orden.total else 0.0,
+                    otros_datos={
+                        'moneda': orden.moneda,
+                        'pago': orden.pago,
+                        'entrega': orden.entrega,
+                        'consorcio': orden.consorcio,
+                        'igv': orden.igv
+                    },
+                    numero_oc=orden.correlative
+                ))
+
+            self.db.execute(insert(OrdenesCompraAuditoriaModel), filas)
+
+            # Recuperar los IDs generados: una auditoría de CREACION por orden (la más reciente)
+            ids_orden = [orden.id_orden for orden in ordenes]
+            auditoria_por_orden = dict(
+                self.db.query(
+                    OrdenesCompraAuditoriaModel.id_orden_compra,
+                    func.max(OrdenesCompraAuditoriaModel.id_auditoria)
+                )
+                .filter(OrdenesCompraAuditoriaModel.tipo_operacion == "CREACION")
+                .filter(OrdenesCompraAuditoriaModel.id_orden_compra.in_(ids_orden))
+                .group_by(OrdenesCompraAuditoriaModel.id_orden_compra)
+                .all()
+            )
+
+            filas_productos = []
+            for id_orden in ids_orden:
+                id_auditoria = auditoria_por_orden.get(id_orden)
+                if id_auditoria is None:
+                    continue
+                for fila_producto in _productos_afectados(AGREGADO=productos_por_orden.get(id_orden, [])):
+                    filas_productos.append({'id_auditoria': id_auditoria, **fila_producto})
+
+            if filas_productos:
+                self.db.execute(insert(OrdenesCompraAuditoriaProductoModel), filas_productos)
+
+            logger.info(f"✅ Auditoría de creación registrada en lote para {len(filas)} órdenes")
+
+        except Exception as e:
+            logger.error(f"❌ Error al registrar auditoría de creación en lote: {e}", exc_info=True)
+            raise
+
+    @staticmethod
+    def _fila_creacion(
+        id_orden_compra: int,
+        id_usuario: int,
+        id_cotizacion: int,
+        id_cotizacion_versiones: int,
+        id_proveedor: int,
+        id_contacto: int,
+        productos: List[Dict[str, Any]],
+        monto_total: float,
+        otros_datos: Optional[Dict[str, Any]] = None,
+        numero_oc: str = None
+    ) -> Dict[str, Any]:
+        """Construye los valores de columna de una auditoría de creación"""
+        cantidad_productos = len(productos)
+
+        descripcion = (
+            f"Orden de compra creada con {cantidad_productos} producto(s). "
+            f"Monto total: S/ {monto_total:,.2f}"
+        )
+
+        return dict(
+            tipo_operacion="CREACION",
+            fecha_evento=datetime.now(),
+            id_orden_compra=id_orden_compra,
+            numero_oc=numero_oc,  # Guardar número de OC
+            id_usuario=id_usuario,
+            id_cotizacion=id_cotizacion,
+            id_cotizacion_versiones=id_cotizacion_versiones,
+            # Solo IDs, sin flechas para creación
+            cambio_proveedor=str(id_proveedor),
+            cambio_contacto=str(id_contacto),
+            id_proveedor_nuevo=id_proveedor,
+            id_contacto_nuevo=id_contacto,
+            cambio_monto=str(monto_total),
+            # Solo IDs de productos agregados y los otros datos (moneda, pago, entrega...)
+            cambios=codificar_cambios(agregados=productos, adicionales=otros_datos),
+            descripcion=descripcion
+        )
+
     def registrar_actualizacion_orden(
         self,
         id_orden_compra: int,
@@ -170,49 +305,19 @@ class OrdenesCompraAuditoriaService:
 
             # Formato concatenado para cambios
             cambio_proveedor_str = None
-            if id_proveedor_anterior and id_proveedor_nuevo and id_proveedor_anterior != id_proveedor_nuevo:
+            proveedor_cambio = bool(id_proveedor_anterior and id_proveedor_nuevo and id_proveedor_anterior != id_proveedor_nuevo)
+            if proveedor_cambio:
                 cambio_proveedor_str = f"{id_proveedor_anterior} ----> {id_proveedor_nuevo}"
 
             cambio_contacto_str = None
-            if id_contacto_anterior and id_contacto_nuevo and id_contacto_anterior != id_contacto_nuevo:
+            contacto_cambio = bool(id_contacto_anterior and id_contacto_nuevo and id_contacto_anterior != id_contacto_nuevo)
+            if contacto_cambio:
                 cambio_contacto_str = f"{id_contacto_anterior} ----> {id_contacto_nuevo}"
 
             cambio_monto_str = None
             if monto_anterior is not None and monto_nuevo is not None:
                 cambio_monto_str = f"{monto_anterior} ----> {monto_nuevo}"
 
-            # Productos: solo IDs
-            productos_agregados_json = None
-            if productos_agregados:
-                ids = [str(p.get('id_producto')) for p in productos_agregados]
-                productos_agregados_json = json.dumps(ids)
-
-            productos_eliminados_json = None
-            if productos_eliminados:
-                ids = [str(p.get('id_producto')) for p in productos_eliminados]
-                productos_eliminados_json = json.dumps(ids)
-
-            productos_modificados_json = None
-            if productos_modificados:
-                # Guardar id y descripción de cambios
-                mods = []
-                for p in productos_modificados:
-                    mods.append({
-                        'id_producto': p.get('id_producto'),
-                        'cambios': p.get('cambios', {})
-                    })
-                productos_modificados_json = json.dumps(mods)
-
-            # Otros cambios en formato concatenado
-            cambios_adicionales_json = None
-            if otros_cambios:
-                cambios_concatenados = {}
-                for campo, valores in otros_cambios.items():
-                    anterior = valores.get('anterior', '')
-                    nuevo = valores.get('nuevo', '')
-                    cambios_concatenados[campo] = f"{anterior} ----> {nuevo}"
-                cambios_adicionales_json = json.dumps(cambios_concatenados)
-
             # Crear registro de auditoría
             auditoria = OrdenesCompraAuditoriaModel(
                 tipo_operacion="ACTUALIZACION",
@@ -224,12 +329,24 @@ class OrdenesCompraAuditoriaService:
                 id_cotizacion_versiones=id_cotizacion_versiones,
                 cambio_proveedor=cambio_proveedor_str,
                 cambio_contacto=cambio_contacto_str,
+                id_proveedor_anterior=id_proveedor_anterior if proveedor_cambio else None,
+                id_proveedor_nuevo=id_proveedor_nuevo if proveedor_cambio else None,
+                id_contacto_anterior=id_contacto_anterior if contacto_cambio else None,
+                id_contacto_nuevo=id_contacto_nuevo if contacto_cambio else None,
                 cambio_monto=cambio_monto_str,
-                productos_agregados=productos_agregados_json,
-                productos_modificados=productos_modificados_json,
-                productos_eliminados=productos_eliminados_json,
-                cambios_adicionales=cambios_adicionales_json,
-                descripcion=descripcion
+                # Productos solo como IDs; modificados con sus cambios y otros cambios como anterior/nuevo
+                cambios=codificar_cambios(
+                    agregados=productos_agregados,
+                    modificados=productos_modificados,
+                    eliminados=productos_eliminados,
+                    adicionales=otros_cambios
+                ),
+                descripcion=descripcion,
+                productos_afectados=_modelos_productos_afectados(
+                    AGREGADO=productos_agregados,
+                    MODIFICADO=productos_modificados,
+                    ELIMINADO=productos_eliminados
+                )
             )
 
             self.db.add(auditoria)
@@ -282,10 +399,6 @@ class OrdenesCompraAuditoriaService:
                     f"Monto total: S/ {monto_total:,.2f}"
                 )
 
-            # Todos los productos pasan a eliminados
-            ids_productos = [str(p.get('id_producto')) for p in productos]
-            productos_eliminados_json = json.dumps(ids_productos) if ids_productos else None
-
             # Crear registro de auditoría
             # IMPORTANTE: id_orden_compra se deja en NULL porque la orden será eliminada
             # Esto evita el error de foreign key constraint al hacer commit
@@ -299,9 +412,13 @@ class OrdenesCompraAuditoriaService:
                 id_cotizacion_versiones=id_cotizacion_versiones,
                 cambio_proveedor=str(id_proveedor),
                 cambio_contacto=str(id_contacto),
+                id_proveedor_nuevo=id_proveedor,
+                id_contacto_nuevo=id_contacto,
                 cambio_monto=str(monto_total),
-                productos_eliminados=productos_eliminados_json,
-                descripcion=descripcion
+                # Todos los productos pasan a eliminados
+                cambios=codificar_cambios(eliminados=productos),
+                descripcion=descripcion,
+                productos_afectados=_modelos_productos_afectados(ELIMINADO=productos)
             )
 
             self.db.add(auditoria)
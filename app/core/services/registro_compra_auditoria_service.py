@@ -4,13 +4,13 @@ Servicio de auditoría para registros de compra.
 Este servicio registra todos los cambios (creación, actualización, eliminación)
 en los registros de compra para mantener un historial completo de auditoría.
 """
-import json
 import logging
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 from sqlalchemy.orm import Session
 from app.adapters.outbound.database.models.registro_compra_auditoria_model import RegistroCompraAuditoriaModel
 from app.adapters.outbound.database.models.ordenes_compra_model import OrdenesCompraModel
+from app.shared.utils.json_encoder import dumps
 
 logger = logging.getLogger(__name__)
 
@@ -63,10 +63,10 @@ class RegistroCompraAuditoriaService:
                 id_cotizacion=id_cotizacion,
                 id_cotizacion_versiones=id_cotizacion_versiones,
                 id_usuario=id_usuario,
-                datos_nuevos=json.dumps(datos_nuevos, default=str),
+                datos_nuevos=dumps(datos_nuevos, default=str),
                 monto_nuevo=monto_nuevo,
                 descripcion=descripcion,
-                metadata_json=json.dumps({
+                metadata_json=dumps({
                     'cantidad_ordenes': cantidad_ordenes,
                     'ordenes_ids': [o.id_orden for o in ordenes]
                 })
@@ -137,12 +137,12 @@ class RegistroCompraAuditoriaService:
                 id_cotizacion=id_cotizacion,
                 id_cotizacion_versiones=id_cotizacion_versiones,
                 id_usuario=id_usuario,
-                datos_anteriores=json.dumps(datos_anteriores, default=str),
-                datos_nuevos=json.dumps(datos_nuevos, default=str),
+                datos_anteriores=dumps(datos_anteriores, default=str),
+                datos_nuevos=dumps(datos_nuevos, default=str),
                 monto_anterior=monto_anterior,
                 monto_nuevo=monto_nuevo,
                 descripcion=descripcion,
-                metadata_json=json.dumps({
+                metadata_json=dumps({
                     'cantidad_ordenes_anterior': cant_ordenes_anterior,
                     'cantidad_ordenes_nueva': cant_ordenes_nueva,
                     'ordenes_ids_anteriores': [o.id_orden for o in ordenes_anteriores],
@@ -203,11 +203,11 @@ class RegistroCompraAuditoriaService:
                 id_cotizacion=id_cotizacion,
                 id_cotizacion_versiones=id_cotizacion_versiones,
                 id_usuario=id_usuario,
-                datos_anteriores=json.dumps(datos_anteriores, default=str),
+                datos_anteriores=dumps(datos_anteriores, default=str),
                 monto_anterior=monto_anterior,
                 descripcion=descripcion,
                 razon=razon,
-                metadata_json=json.dumps({
+                metadata_json=dumps({
                     'cantidad_ordenes': cantidad_ordenes,
                     'ordenes_ids': [o.id_orden for o in ordenes],
                     'accion': 'desactivacion'
@@ -266,11 +266,11 @@ class RegistroCompraAuditoriaService:
                 id_cotizacion=id_cotizacion,
                 id_cotizacion_versiones=id_cotizacion_versiones,
                 id_usuario=id_usuario,
-                datos_anteriores=json.dumps(datos_anteriores, default=str),
+                datos_anteriores=dumps(datos_anteriores, default=str),
                 monto_anterior=monto_anterior,
                 descripcion=descripcion,
                 razon=razon,
-                metadata_json=json.dumps({
+                metadata_json=dumps({
                     'cantidad_ordenes': cantidad_ordenes,
                     'ordenes_ids': [o.id_orden for o in ordenes]
                 })
@@ -331,7 +331,7 @@ class RegistroCompraAuditoriaService:
                 id_cotizacion=id_cotizacion,
                 id_cotizacion_versiones=id_cotizacion_versiones,
                 id_usuario=id_usuario,
-                datos_anteriores=json.dumps({
+                datos_anteriores=dumps({
                     'numero_oc': numero_oc,
                     'id_orden': id_orden,  # Guardar el ID en los datos para referencia
                     'compra_id': compra_id,  # Guardar el compra_id en los datos para referencia
@@ -398,12 +398,12 @@ class RegistroCompraAuditoriaService:
                 id_cotizacion=id_cotizacion,
                 id_cotizacion_versiones=id_cotizacion_versiones,
                 id_usuario=id_usuario,
-                datos_anteriores=json.dumps({
+                datos_anteriores=dumps({
                     'id_orden': id_orden,
                     'compra_id': compra_id,
                     'monto': float(monto_anterior)
                 }),
-                datos_nuevos=json.dumps({
+                datos_nuevos=dumps({
                     'id_orden': id_orden,
                     'compra_id': compra_id,
                     'monto': float(monto_nuevo)
@@ -412,7 +412,7 @@ class RegistroCompraAuditoriaService:
                 monto_nuevo=float(monto_nuevo),
                 descripcion=descripcion,
                 razon="Actualización de orden de compra",
-                metadata_json=json.dumps({
+                metadata_json=dumps({
                     'cambios_detalle': cambios_detalle,
                     'diferencia_monto': float(diferencia)
                 })
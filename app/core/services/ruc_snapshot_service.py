@@ -0,0 +1,93 @@
+"""
+Servicio de datos de RUC guardados en base de datos.
+
+Es la capa durable detrás del caché: si Redis se vacía, los RUC ya
+consultados se responden desde aquí sin volver a SUNAT. Las consultas a la
+base de datos (SQLAlchemy síncrono) corren en un thread para no bloquear el
+event loop, cada una con su propia sesión.
+"""
+import asyncio
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+
+from sqlalchemy.orm import Session
+
+from app.adapters.outbound.database.repositories.ruc_snapshot_repository import RucSnapshotRepository
+from app.core.ports.repositories.ruc_snapshot_repository import RucSnapshotRepositoryPort
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class RucSnapshotService:
+    """Lectura y escritura asíncrona de los datos de RUC guardados"""
+
+    def __init__(self, session_factory: Callable[[], Session]):
+        """
+        Args:
+            session_factory: Crea sesiones de base de datos (ej: SessionLocal)
+        """
+        self.session_factory = session_factory
+
+    def _con_repositorio(self, operacion: Callable[[RucSnapshotRepositoryPort], T]) -> T:
+        db = self.session_factory()
+        try:
+            return operacion(RucSnapshotRepository(db))
+        finally:
+            db.close()
+
+    async def obtener_varios(self, rucs: List[str]) -> Dict[str, Tuple[Dict, datetime]]:
+        """
+        Datos guardados de varios RUC (un solo SELECT)
+
+        Returns:
+            Dict[str, Tuple[Dict, datetime]]: RUC -> (datos, fecha de consulta). Vacío si la BD falla.
+        """
+        if not rucs:
+            return {}
+        try:
+            return await asyncio.to_thread(self._con_repositorio, lambda repo: repo.obtener(rucs))
+        except Exception as e:
+            logger.error(f"❌ Error al leer datos guardados de RUC: {e}", exc_info=True)
+            return {}
+
+    async def obtener(self, ruc: str) -> Optional[Tuple[Dict, datetime]]:
+        """Datos guardados de un RUC y la fecha en que se consultaron, None si no hay"""
+        return (await self.obtener_varios([ruc])).get(ruc)
+
+    async def guardar(self, ruc: str, datos: Dict) -> None:
+        """Guarda los datos de un RUC recién consultado (un fallo solo se registra)"""
+        try:
+            await asyncio.to_thread(
+                self._con_repositorio, lambda repo: repo.guardar(ruc, datos, datetime.now())
+            )
+        except Exception as e:
+            logger.error(f"❌ Error al guardar datos del RUC {ruc}: {e}", exc_info=True)
+
+    async def rucs_a_refrescar(self, limite: int, antiguedad_minima: timedelta) -> List[str]:
+        """RUC de proveedores sin datos o con datos más antiguos que `antiguedad_minima`, los más antiguos primero"""
+        consultados_antes_de = datetime.now() - antiguedad_minima
+        return await asyncio.to_thread(
+            self._con_repositorio,
+            lambda repo: repo.rucs_proveedores_a_refrescar(limite, consultados_antes_de)
+        )
+
+
+# Singleton
+_ruc_snapshot_service: Optional[RucSnapshotService] = None
+_singleton_lock = threading.Lock()
+
+
+def get_ruc_snapshot_service() -> RucSnapshotService:
+    """Obtiene la instancia global del servicio de datos de RUC guardados"""
+    global _ruc_snapshot_service
+    if _ruc_snapshot_service is None:
+        with _singleton_lock:
+            if _ruc_snapshot_service is None:
+                from app.config.database import SessionLocal
+
+                _ruc_snapshot_service = RucSnapshotService(SessionLocal)
+    return _ruc_snapshot_service
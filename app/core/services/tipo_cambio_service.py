@@ -0,0 +1,170 @@
+"""
+Servicio de tipo de cambio SUNAT con caché en memoria.
+
+El tipo de cambio cambia una vez al día, por lo que el historial completo de
+`tasa_cambio_sunat` se mantiene en memoria como dos listas ordenadas por fecha
+y las consultas ("más reciente" y "vigente para una fecha") se resuelven con
+búsqueda binaria, sin ir a la base de datos.
+
+Los tipos de cambio los inserta otro proceso, por lo que no hay un evento de
+inserción en esta aplicación. El historial se recarga cuando vence el TTL
+configurado o cuando una comprobación periódica (barata: id y fecha máximos)
+detecta que el último registro cambió.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_right
+from datetime import date
+from decimal import Decimal
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.adapters.outbound.database.repositories.tipo_cambio_repository import TipoCambioRepository
+
+logger = logging.getLogger(__name__)
+
+
+class TipoCambioService:
+    """
+    Caché en memoria del historial de tipos de cambio SUNAT (venta).
+
+    Características:
+    - Historial ordenado por fecha en arreglos paralelos (fechas, ventas)
+    - Consultas O(log n) con bisect
+    - Recarga perezosa al vencer el TTL
+    - Detección de registros nuevos por id/fecha máximos cada `intervalo_verificacion`
+    - Thread-safe: se usa desde los workers del EventDispatcher
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        ttl_seconds: int = 3600,
+        intervalo_verificacion: int = 60
+    ):
+        """
+        Args:
+            session_factory: Fábrica de sesiones DB usada para recargar el historial
+            ttl_seconds: Segundos que el historial se considera vigente
+            intervalo_verificacion: Segundos entre comprobaciones del último registro
+        """
+        self._session_factory = session_factory
+        self._ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._fechas: List[date] = []
+        self._ventas: List[Decimal] = []
+        self._cargado_en: Optional[float] = None
+        self._intervalo_verificacion = intervalo_verificacion
+        # (id, fecha) del último registro al recargar y momento de la última comprobación
+        self._version: Optional[Tuple[int, date]] = None
+        self._verificado_en: Optional[float] = None
+
+    def _esta_vigente(self) -> bool:
+        return self._cargado_en is not None and (time.monotonic() - self._cargado_en) < self._ttl_seconds
+
+    def _hay_version_nueva(self) -> bool:
+        """Comprueba (como máximo cada `intervalo_verificacion`) si cambió el último registro"""
+        ahora = time.monotonic()
+        if self._verificado_en is not None and (ahora - self._verificado_en) < self._intervalo_verificacion:
+            return False
+        self._verificado_en = ahora
+
+        db = self._session_factory()
+        try:
+            version = TipoCambioRepository(db).obtener_ultima_version_tipo_cambio()
+        finally:
+            db.close()
+        # None: sin datos o error de lectura; no justifica recargar
+        return version is not None and version != self._version
+
+    def _recargar(self) -> None:
+        """Recarga el historial desde la base de datos en una sesión propia"""
+        db = self._session_factory()
+        try:
+            repo = TipoCambioRepository(db)
+            version = repo.obtener_ultima_version_tipo_cambio()
+            historial = repo.obtener_historial_tipo_cambio()
+        finally:
+            db.close()
+
+        if not historial and self._fechas:
+            # Un error de lectura no debe vaciar un historial válido
+            logger.warning("Historial de tipo de cambio vacío, se conserva el caché anterior")
+        else:
+            self._fechas = [fecha for fecha, _ in historial]
+            self._ventas = [venta for _, venta in historial]
+            self._version = version
+
+        self._cargado_en = time.monotonic()
+        self._verificado_en = self._cargado_en
+        logger.info(f"Caché de tipo de cambio recargado: {len(self._fechas)} fechas")
+
+    def _asegurar_cargado(self) -> None:
+        if self._esta_vigente() and not self._verificacion_pendiente():
+            return
+        with self._lock:
+            # Otro thread pudo recargar o verificar mientras se esperaba el lock
+            if not self._esta_vigente() or self._hay_version_nueva():
+                self._recargar()
+
+    def _verificacion_pendiente(self) -> bool:
+        return self._verificado_en is None or (time.monotonic() - self._verificado_en) >= self._intervalo_verificacion
+
+    def invalidar(self) -> None:
+        """Fuerza la recarga del historial en la próxima consulta"""
+        self._cargado_en = None
+        logger.info("Caché de tipo de cambio invalidado")
+
+    def obtener_tipo_cambio_mas_reciente(self) -> Optional[Decimal]:
+        """
+        Obtiene el tipo de cambio (venta) más reciente
+
+        Returns:
+            Decimal: Tipo de cambio venta, None si no hay datos
+        """
+        self._asegurar_cargado()
+        ventas = self._ventas
+        return ventas[-1] if ventas else None
+
+    def obtener_tipo_cambio_por_fecha(self, fecha: date) -> Optional[Decimal]:
+        """
+        Obtiene el tipo de cambio (venta) vigente en una fecha
+
+        SUNAT no publica tipo de cambio todos los días (fines de semana, feriados),
+        por lo que se retorna el último publicado en o antes de la fecha indicada.
+
+        Args:
+            fecha: Fecha a consultar
+
+        Returns:
+            Decimal: Tipo de cambio venta, None si la fecha es anterior al historial
+        """
+        self._asegurar_cargado()
+        fechas, ventas = self._fechas, self._ventas
+        idx = bisect_right(fechas, fecha) - 1
+        return ventas[idx] if idx >= 0 else None
+
+
+# Singleton: Una única instancia para toda la aplicación
+_tipo_cambio_service: Optional[TipoCambioService] = None
+_singleton_lock = threading.Lock()
+
+
+def get_tipo_cambio_service() -> TipoCambioService:
+    """Obtiene la instancia única del servicio de tipo de cambio"""
+    global _tipo_cambio_service
+    if _tipo_cambio_service is None:
+        with _singleton_lock:
+            if _tipo_cambio_service is None:
+                from app.config.database import SessionLocal
+                from app.config.settings import get_settings
+
+                settings = get_settings()
+                _tipo_cambio_service = TipoCambioService(
+                    session_factory=SessionLocal,
+                    ttl_seconds=settings.tipo_cambio_cache_ttl,
+                    intervalo_verificacion=settings.tipo_cambio_verificacion_intervalo
+                )
+    return _tipo_cambio_service
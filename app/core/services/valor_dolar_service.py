@@ -0,0 +1,362 @@
+"""
+Servicio del valor del dólar con caché en memoria: último valor e histórico.
+
+El valor cambia una vez al día, pero `/dolar/ultimo` se consulta en casi cada
+carga del frontend. El último registro se guarda en memoria junto con su ETag
+y solo se vuelve a leer de la base de datos cuando:
+- vence el TTL configurado (red de seguridad)
+- se inserta un valor nuevo en este proceso (listener `after_insert` + commit)
+- otro worker avisa por el canal Redis `CANAL_INVALIDACION` que insertó uno
+
+El histórico (`/dolar/historico`) se agrega por día, semana o mes. La serie
+del último año se guarda en memoria con las mismas reglas de invalidación;
+los rangos más antiguos se leen de la BD usando el índice de `fecha`.
+"""
+import asyncio
+import bisect
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from typing import Callable, Dict, List, Literal, Optional, Set, Tuple
+
+from redis.asyncio import Redis
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.adapters.outbound.database.models.value_dolar_model import ValueDolarModel
+from app.adapters.outbound.database.repositories.valor_dolar_repository import ValorDolarRepository
+
+logger = logging.getLogger(__name__)
+
+CANAL_INVALIDACION = "dolar:ultimo:invalidar"
+
+# Espera antes de volver a suscribirse al canal tras un error de Redis
+REINTENTO_SUSCRIPCION_SEGUNDOS = 10
+
+# Días de la serie que se mantienen en memoria para el histórico
+DIAS_SERIE_CACHEADA = 366
+
+Granularidad = Literal["dia", "semana", "mes"]
+
+
+@dataclass(frozen=True)
+class UltimoValorDolar:
+    """Último valor del dólar y su ETag (cambia cuando cambia el registro)"""
+    fecha: datetime
+    venta: float
+    etag: str
+
+    def a_dict(self) -> Dict:
+        return {"fecha": self.fecha, "venta": self.venta}
+
+
+def _inicio_periodo(fecha: date, granularidad: Granularidad) -> date:
+    """Primer día del periodo al que pertenece la fecha (las semanas empiezan el lunes)"""
+    if granularidad == "semana":
+        return fecha - timedelta(days=fecha.weekday())
+    if granularidad == "mes":
+        return fecha.replace(day=1)
+    return fecha
+
+
+def agregar_serie(serie: List[Tuple[datetime, float]], granularidad: Granularidad) -> List[Dict]:
+    """
+    Resume una serie cronológica de ventas por periodo
+
+    Returns:
+        List[Dict]: Un punto por periodo con mínimo, máximo, promedio y cierre (último valor)
+    """
+    puntos = []
+    for periodo, registros in groupby(serie, key=lambda r: _inicio_periodo(r[0].date(), granularidad)):
+        ventas = [venta for _, venta in registros]
+        puntos.append({
+            "periodo": periodo.isoformat(),
+            "min": min(ventas),
+            "max": max(ventas),
+            "promedio": round(sum(ventas) / len(ventas), 4),
+            "cierre": ventas[-1],
+            "registros": len(ventas),
+        })
+    return puntos
+
+
+class ValorDolarService:
+    """
+    Caché en memoria del último valor del dólar.
+
+    Características:
+    - Una lectura a la BD por TTL o por inserción, no por petición
+    - ETag estable por registro para respuestas 304 del navegador
+    - Invalidación entre workers por Redis pub/sub
+    - Serie del último año en memoria para el histórico agregado
+    - Thread-safe: el scheduler del dólar inserta desde su propio thread
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], ttl_seconds: int = 3600, redis_url: str = ""):
+        """
+        Args:
+            session_factory: Fábrica de sesiones DB usada para recargar el valor
+            ttl_seconds: Segundos que el valor en memoria se considera vigente
+            redis_url: Redis para avisar y recibir invalidaciones entre workers ("" = solo este proceso)
+        """
+        self._session_factory = session_factory
+        self._ttl_seconds = ttl_seconds
+        self._redis_url = redis_url
+        self._lock = threading.Lock()
+        # Solo evita recargas duplicadas de la serie; no bloquea a obtener_ultimo
+        self._lock_serie = threading.Lock()
+        self._ultimo: Optional[UltimoValorDolar] = None
+        self._cargado_en: Optional[float] = None
+        # Cambia en cada invalidación: una recarga que empezó antes no marca el caché como vigente
+        self._version = 0
+        # Identifica los avisos propios en el canal (ya se invalidó localmente)
+        self._id_proceso = uuid.uuid4().hex
+        self._suscripcion: Optional[asyncio.Task] = None
+        # Event loop de la aplicación: el cliente Redis async solo se usa desde él
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Publicaciones en curso (referencia hasta que terminen)
+        self._publicaciones: Set[asyncio.Task] = set()
+        # Serie (fecha, venta) desde `_serie_desde`, ordenada por fecha
+        self._serie: List[Tuple[datetime, float]] = []
+        self._serie_desde: Optional[date] = None
+        self._serie_cargada_en: Optional[float] = None
+
+    def _esta_vigente(self) -> bool:
+        return self._cargado_en is not None and (time.monotonic() - self._cargado_en) < self._ttl_seconds
+
+    def _recargar(self) -> None:
+        """Lee el último registro en una sesión propia"""
+        version = self._version
+        db = self._session_factory()
+        try:
+            consulta = ValorDolarRepository(db).fetch_last_value_dolar()
+        finally:
+            db.close()
+
+        if consulta is None:
+            # Sin datos (o error de lectura): no se cachea, la próxima petición vuelve a intentar
+            self._ultimo = None
+            self._cargado_en = None
+            return
+
+        huella = f"{consulta.id_dolar}|{consulta.fecha}|{consulta.venta}".encode("utf-8")
+        self._ultimo = UltimoValorDolar(
+            fecha=consulta.fecha,
+            venta=consulta.venta,
+            etag=f'"{hashlib.sha256(huella).hexdigest()[:20]}"'
+        )
+        if version == self._version:
+            self._cargado_en = time.monotonic()
+        logger.info(f"💵 Caché del último valor del dólar recargado: venta {consulta.venta} ({consulta.fecha})")
+
+    def obtener_ultimo(self) -> Optional[UltimoValorDolar]:
+        """
+        Obtiene el último valor del dólar
+
+        Returns:
+            UltimoValorDolar: Último registro, None si no hay datos
+        """
+        if not self._esta_vigente():
+            with self._lock:
+                # Otro thread pudo recargar mientras se esperaba el lock
+                if not self._esta_vigente():
+                    self._recargar()
+        return self._ultimo
+
+    def obtener_historico(self, desde: date, hasta: date, granularidad: Granularidad) -> List[Dict]:
+        """
+        Histórico de la venta del dólar agregado por periodo
+
+        Args:
+            desde: Primer día incluido
+            hasta: Último día incluido
+            granularidad: Tamaño de cada periodo (dia, semana o mes)
+
+        Returns:
+            List[Dict]: Puntos de `agregar_serie`, en orden cronológico
+        """
+        return agregar_serie(self._obtener_serie(desde, hasta), granularidad)
+
+    def _obtener_serie(self, desde: date, hasta: date) -> List[Tuple[datetime, float]]:
+        inicio = datetime.combine(desde, datetime.min.time())
+        fin = datetime.combine(hasta + timedelta(days=1), datetime.min.time())
+
+        if desde < date.today() - timedelta(days=DIAS_SERIE_CACHEADA):
+            # Fuera de la ventana en memoria: consulta directa por rango
+            return self._leer_serie(inicio, fin)
+
+        if not self._serie_vigente(desde):
+            with self._lock_serie:
+                if not self._serie_vigente(desde):
+                    self._recargar_serie()
+        serie = self._serie
+        return serie[
+            bisect.bisect_left(serie, inicio, key=lambda r: r[0]):
+            bisect.bisect_left(serie, fin, key=lambda r: r[0])
+        ]
+
+    def _serie_vigente(self, desde: date) -> bool:
+        return (
+            self._serie_cargada_en is not None
+            and self._serie_desde <= desde
+            and (time.monotonic() - self._serie_cargada_en) < self._ttl_seconds
+        )
+
+    def _recargar_serie(self) -> None:
+        """Lee la serie sin tomar `_lock` (que usa /ultimo) y solo la reemplaza bajo él"""
+        version = self._version
+        serie_desde = date.today() - timedelta(days=DIAS_SERIE_CACHEADA)
+        serie = self._leer_serie(datetime.combine(serie_desde, datetime.min.time()), datetime.max)
+        with self._lock:
+            self._serie = serie
+            self._serie_desde = serie_desde
+            # Una serie vacía puede ser un error de lectura: no se da por vigente
+            if serie and version == self._version:
+                self._serie_cargada_en = time.monotonic()
+        logger.info(f"💵 Serie del dólar en memoria recargada: {len(serie)} registros desde {serie_desde}")
+
+    def _leer_serie(self, desde: datetime, hasta: datetime) -> List[Tuple[datetime, float]]:
+        db = self._session_factory()
+        try:
+            return ValorDolarRepository(db).fetch_serie_venta(desde, hasta)
+        finally:
+            db.close()
+
+    def invalidar(self, avisar_workers: bool = True) -> None:
+        """
+        Fuerza la recarga en la próxima consulta
+
+        Args:
+            avisar_workers: Publica la invalidación en Redis para los demás workers
+        """
+        self._version += 1
+        self._cargado_en = None
+        self._serie_cargada_en = None
+        logger.info("💵 Caché del valor del dólar invalidado")
+        if avisar_workers:
+            self._publicar_invalidacion()
+
+    def _publicar_invalidacion(self) -> None:
+        """
+        Avisa a los demás workers con el cliente Redis async de la aplicación.
+        El commit que invalida puede ocurrir en el propio event loop (endpoint
+        async) o en un thread (scheduler, asyncio.to_thread): en el segundo caso
+        la publicación se agenda en el event loop de la aplicación.
+        """
+        if not self._redis_url:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            if self._loop is None or self._loop.is_closed():
+                logger.warning("⚠️ Sin event loop activo: los demás workers verán el nuevo valor del dólar al vencer su TTL")
+                return
+            self._loop.call_soon_threadsafe(self._lanzar_publicacion)
+            return
+        self._lanzar_publicacion()
+
+    def _lanzar_publicacion(self) -> None:
+        publicacion = asyncio.ensure_future(self._publicar())
+        self._publicaciones.add(publicacion)
+        publicacion.add_done_callback(self._publicaciones.discard)
+
+    async def _publicar(self) -> None:
+        from app.adapters.outbound.cache.redis_async_cache import get_redis_async_cache
+
+        cache = get_redis_async_cache()
+        if not await cache.health_check():
+            logger.warning("⚠️ Redis no disponible: los demás workers verán el nuevo valor del dólar al vencer su TTL")
+            return
+        try:
+            await cache.client.publish(CANAL_INVALIDACION, self._id_proceso)
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo publicar la invalidación del valor del dólar: {e}")
+
+    def iniciar_suscripcion(self) -> None:
+        """Escucha en segundo plano las invalidaciones de otros workers (llamar con el event loop activo)"""
+        self._loop = asyncio.get_running_loop()
+        if self._redis_url and self._suscripcion is None:
+            self._suscripcion = asyncio.create_task(self._escuchar_invalidaciones())
+
+    async def detener_suscripcion(self) -> None:
+        if self._suscripcion is None:
+            return
+        self._suscripcion.cancel()
+        try:
+            await self._suscripcion
+        except asyncio.CancelledError:
+            pass
+        self._suscripcion = None
+
+    async def _escuchar_invalidaciones(self) -> None:
+        while True:
+            # Cliente propio sin socket_timeout: la suscripción pasa horas sin mensajes
+            client = Redis.from_url(self._redis_url, decode_responses=True, socket_connect_timeout=5)
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(CANAL_INVALIDACION)
+                # Pudo perderse un aviso mientras no había suscripción
+                self.invalidar(avisar_workers=False)
+                logger.info(f"📡 Suscrito a {CANAL_INVALIDACION}")
+                async for mensaje in pubsub.listen():
+                    if mensaje.get("type") == "message" and mensaje.get("data") != self._id_proceso:
+                        self.invalidar(avisar_workers=False)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(
+                    f"⚠️ Suscripción a {CANAL_INVALIDACION} interrumpida: {e}. "
+                    f"Reintentando en {REINTENTO_SUSCRIPCION_SEGUNDOS}s"
+                )
+            finally:
+                try:
+                    await pubsub.aclose()
+                    await client.aclose()
+                except Exception:
+                    pass
+            await asyncio.sleep(REINTENTO_SUSCRIPCION_SEGUNDOS)
+
+
+# Singleton: Una única instancia para toda la aplicación
+_valor_dolar_service: Optional[ValorDolarService] = None
+_singleton_lock = threading.Lock()
+
+
+def get_valor_dolar_service() -> ValorDolarService:
+    """
+    Obtiene la instancia única del servicio del valor del dólar
+
+    Al crearla registra un listener `after_insert` sobre ValueDolarModel que
+    invalida el caché (y avisa a los demás workers) cuando el insert hace commit,
+    tanto desde el scheduler como desde `/dolar/guardarNuevoValor`.
+    """
+    global _valor_dolar_service
+    if _valor_dolar_service is None:
+        with _singleton_lock:
+            if _valor_dolar_service is None:
+                from app.config.database import SessionLocal
+                from app.config.settings import get_settings
+
+                settings = get_settings()
+                servicio = ValorDolarService(
+                    session_factory=SessionLocal,
+                    ttl_seconds=settings.dolar_cache_ttl,
+                    redis_url=settings.redis_url
+                )
+
+                @event.listens_for(ValueDolarModel, "after_insert")
+                def _invalidar_tras_insert(mapper, connection, target):
+                    session = object_session(target)
+                    if session is None:
+                        servicio.invalidar()
+                        return
+                    # Invalidar tras el commit para que la recarga vea el nuevo registro
+                    event.listen(session, "after_commit", lambda s: servicio.invalidar(), once=True)
+
+                _valor_dolar_service = servicio
+    return _valor_dolar_service
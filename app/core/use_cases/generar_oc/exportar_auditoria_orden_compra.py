@@ -0,0 +1,185 @@
+import csv
+import io
+import logging
+import os
+import tempfile
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from openpyxl import Workbook
+from sqlalchemy import desc
+from sqlalchemy.orm import Session
+
+from app.adapters.outbound.database.models.ordenes_compra_auditoria_model import OrdenesCompraAuditoriaModel
+from app.core.use_cases.generar_oc.listar_auditoria_orden_compra import ListarAuditoriaOrdenCompra
+from app.shared.utils.json_encoder import dumps
+
+logger = logging.getLogger(__name__)
+
+FORMATO_CSV = "csv"
+FORMATO_XLSX = "xlsx"
+
+# Filas leídas del cursor del servidor y resueltas a nombres por cada lote
+TAMANO_LOTE = 1000
+# Tamaño de los bloques en que se envía el archivo XLSX ya generado
+TAMANO_BLOQUE_XLSX = 64 * 1024
+
+COLUMNAS = [
+    "ID Auditoría",
+    "Fecha",
+    "Operación",
+    "Número OC",
+    "Usuario",
+    "Proveedor",
+    "Contacto",
+    "Monto",
+    "Productos agregados",
+    "Productos modificados",
+    "Productos eliminados",
+    "Cambios adicionales",
+    "Descripción",
+]
+
+
+def _a_fila(item: Dict[str, Any]) -> List[Any]:
+    """Aplana un item del listado de auditorías a una fila de exportación"""
+    modificados = item["productos_modificados"] or []
+    return [
+        item["id_auditoria"],
+        item["fecha_evento"].strftime("%Y-%m-%d %H:%M:%S") if item["fecha_evento"] else "",
+        item["tipo_operacion"],
+        item["numero_oc"],
+        item["nombre_usuario"],
+        item["cambio_proveedor"] or "",
+        item["cambio_contacto"] or "",
+        item["cambio_monto"] or "",
+        "; ".join(item["productos_agregados"] or []),
+        "; ".join(f"{p['nombre']} {dumps(p['cambios'], default=str)}" for p in modificados),
+        "; ".join(item["productos_eliminados"] or []),
+        dumps(item["cambios_adicionales"]) if item["cambios_adicionales"] else "",
+        item["descripcion"] or "",
+    ]
+
+
+class ExportarAuditoriaOrdenCompra:
+    """
+    Caso de uso para exportar el historial de auditoría de órdenes de compra a CSV o XLSX.
+
+    A diferencia del listado paginado, recorre todas las auditorías que cumplen los
+    filtros con un cursor del lado del servidor (`yield_per`) y genera el archivo
+    por lotes, de modo que la memoria usada no depende de la cantidad de filas:
+    1. La consulta principal se lee en lotes de TAMANO_LOTE filas
+    2. Cada lote resuelve nombres de proveedores, contactos y productos con una
+       consulta IN (...) por entidad (misma lógica que el listado)
+    3. El archivo se emite como un iterador de bytes para un StreamingResponse
+
+    Usa sesiones propias: mientras un cursor del servidor está abierto la conexión
+    no admite otras consultas, por lo que la resolución de nombres va en otra sesión.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session]):
+        self._session_factory = session_factory
+
+    def execute(self, formato: str = FORMATO_CSV, **filtros) -> Iterator[bytes]:
+        """
+        Genera el archivo de exportación.
+
+        Args:
+            formato: 'csv' o 'xlsx'
+            **filtros: Mismos filtros que ListarAuditoriaOrdenCompra.execute
+                       (id_orden_compra, numero_oc, tipo_operacion, usuario, proveedor,
+                       ruc_proveedor, contacto, fecha_desde, fecha_hasta, id_producto)
+
+        Returns:
+            Iterator[bytes]: Contenido del archivo por bloques
+        """
+        if formato == FORMATO_XLSX:
+            return self._generar_xlsx(filtros)
+        return self._generar_csv(filtros)
+
+    def _iterar_filas(self, filtros: Dict[str, Optional[Any]]) -> Iterator[List[Any]]:
+        """Recorre las auditorías filtradas en orden (fecha_evento desc, id desc) como filas planas"""
+        db_stream = self._session_factory()
+        db_nombres = self._session_factory()
+        try:
+            listado = ListarAuditoriaOrdenCompra(db_nombres)
+            filters, _ = listado.construir_filtros(**filtros)
+
+            # La consulta base se arma sobre la sesión de streaming
+            query = ListarAuditoriaOrdenCompra(db_stream).consulta_base(filters).order_by(
+                desc(OrdenesCompraAuditoriaModel.fecha_evento),
+                desc(OrdenesCompraAuditoriaModel.id_auditoria)
+            ).yield_per(TAMANO_LOTE)
+
+            resultados = iter(query)
+            total = 0
+            while True:
+                lote = list(islice(resultados, TAMANO_LOTE))
+                if not lote:
+                    break
+                for item in listado.procesar_filas(lote):
+                    yield _a_fila(item)
+                total += len(lote)
+                # Los objetos del lote ya no se necesitan: no acumularlos en el identity map
+                db_stream.expunge_all()
+
+            logger.info(f"✅ Exportación de auditorías completada: {total} filas")
+        finally:
+            db_nombres.close()
+            db_stream.close()
+
+    def _generar_csv(self, filtros: Dict[str, Optional[Any]]) -> Iterator[bytes]:
+        """CSV en UTF-8 con BOM (Excel lo abre con tildes correctas), un bloque por lote"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(COLUMNAS)
+        # La cabecera sale antes de ejecutar la consulta
+        yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+
+        buffer.seek(0)
+        buffer.truncate(0)
+        filas_en_buffer = 0
+        for fila in self._iterar_filas(filtros):
+            writer.writerow(fila)
+            filas_en_buffer += 1
+            if filas_en_buffer >= TAMANO_LOTE:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate(0)
+                filas_en_buffer = 0
+
+        if filas_en_buffer:
+            yield buffer.getvalue().encode("utf-8")
+
+    def _generar_xlsx(self, filtros: Dict[str, Optional[Any]]) -> Iterator[bytes]:
+        """
+        XLSX con openpyxl en modo write_only.
+
+        El formato XLSX es un ZIP que solo puede cerrarse al final, por lo que las
+        filas se escriben a un archivo temporal (sin retenerlas en memoria) y luego
+        se envía el archivo por bloques.
+        """
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Auditoría OC")
+        ws.append(COLUMNAS)
+        for fila in self._iterar_filas(filtros):
+            ws.append(fila)
+
+        fd, ruta = tempfile.mkstemp(suffix=".xlsx")
+        os.close(fd)
+        try:
+            wb.save(ruta)
+            with open(ruta, "rb") as archivo:
+                while True:
+                    bloque = archivo.read(TAMANO_BLOQUE_XLSX)
+                    if not bloque:
+                        break
+                    yield bloque
+        finally:
+            os.remove(ruta)
+
+
+def nombre_archivo_exportacion(formato: str) -> str:
+    """Nombre sugerido para el archivo descargado"""
+    return f"auditoria_ordenes_compra_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{formato}"
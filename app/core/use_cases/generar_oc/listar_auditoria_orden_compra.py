@@ -1,20 +1,68 @@
+import base64
 import logging
 import math
 import json
-from typing import Optional, Dict, Any, List
+import threading
+import time
+from types import SimpleNamespace
+from itertools import islice
+from typing import Optional, Dict, Any, Iterator, List, Tuple
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc, or_, func
+from sqlalchemy import and_, desc, or_, func, text, select, false
 from app.adapters.outbound.database.models.ordenes_compra_auditoria_model import OrdenesCompraAuditoriaModel
+from app.adapters.outbound.database.models.ordenes_compra_auditoria_producto_model import OrdenesCompraAuditoriaProductoModel
 from app.adapters.outbound.database.models.ordenes_compra_model import OrdenesCompraModel
 from app.adapters.outbound.database.models.usuarios_model import UsuariosModel
 from app.adapters.outbound.database.models.trabajadores_model import TrabajadoresModel
 from app.adapters.outbound.database.models.proveedores_model import ProveedoresModel
 from app.adapters.outbound.database.models.proveedor_contacto_model import ProveedorContactosModel
 from app.adapters.outbound.database.models.productos_model import ProductosModel
+from app.core.domain.exceptions import CursorAuditoriaInvalidoError
+from app.core.services.auditoria_archivo_service import AuditoriaArchivoService, TABLA_ORDENES_COMPRA
+from app.shared.utils.auditoria_codec import CambiosAuditoria
 
 logger = logging.getLogger(__name__)
 
+# Modos de conteo del total de registros
+CONTEO_EXACTO = "exacto"
+CONTEO_ESTIMADO = "estimado"
+CONTEO_NINGUNO = "ninguno"
+
+# Caché de conteos estimados: clave de filtros -> (timestamp, total)
+_CONTEO_CACHE_TTL = 300  # 5 minutos
+_CONTEO_CACHE_MAX = 256
+_conteos_cache: Dict[tuple, Tuple[float, int]] = {}
+_conteos_lock = threading.Lock()
+
+
+def _filtro_por_ids(columna_anterior, columna_nueva, ids: List[int]):
+    """Filtro por igualdad sobre las columnas anterior/nuevo; sin IDs no hay coincidencias"""
+    if not ids:
+        return false()
+    return or_(columna_anterior.in_(ids), columna_nueva.in_(ids))
+
+
+def _codificar_cursor(fecha_evento: datetime, id_auditoria: int) -> str:
+    """Codifica la posición (fecha_evento, id_auditoria) como cursor opaco"""
+    payload = json.dumps({"f": fecha_evento.isoformat(), "id": int(id_auditoria)})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decodificar_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decodifica un cursor generado por _codificar_cursor
+
+    Raises:
+        CursorAuditoriaInvalidoError: Si el cursor no tiene el formato esperado
+    """
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(cursor + relleno).decode("utf-8"))
+        return datetime.fromisoformat(data["f"]), int(data["id"])
+    except Exception:
+        raise CursorAuditoriaInvalidoError(cursor)
+
 
 def _parsear_cambio_concatenado(campo: Optional[str]) -> tuple:
     """
@@ -46,145 +94,413 @@ class ListarAuditoriaOrdenCompra:
     Este caso de uso:
     1. Hace JOINs para obtener datos relacionados (numero_oc, usuario, etc.)
     2. Parsea campos concatenados (cambio_proveedor, cambio_contacto, cambio_monto)
-    3. Resuelve nombres de proveedores, contactos y productos mediante consultas
-    4. Retorna datos en formato optimizado
+    3. Resuelve nombres de proveedores, contactos y productos en lote (una consulta por entidad)
+    4. Incluye auditorías archivadas cuando el rango de fechas lo requiere
+    5. Retorna datos en formato optimizado
+
+    `construir_filtros`, `consulta_base` y `procesar_filas` son públicos: la
+    exportación (ExportarAuditoriaOrdenCompra) arma la misma consulta con ellos.
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, archivo_service: Optional[AuditoriaArchivoService] = None):
         self.db = db
+        self.archivo_service = archivo_service
 
-    def _obtener_nombre_proveedor(self, id_proveedor: Optional[int]) -> str:
-        """Obtiene el nombre del proveedor por su ID"""
-        if not id_proveedor:
-            return ""
+    def _cargar_nombres(self, columna_id, columna_nombre, ids: set) -> Dict[Any, str]:
+        """Obtiene un mapa id -> nombre con una sola consulta IN (...)"""
+        ids_validos = [i for i in ids if isinstance(i, int)]
+        if not ids_validos:
+            return {}
 
-        proveedor = self.db.query(ProveedoresModel).filter(
-            ProveedoresModel.id_proveedor == id_proveedor
-        ).first()
+        filas = self.db.query(columna_id, columna_nombre).filter(
+            columna_id.in_(ids_validos)
+        ).all()
+        return {id_valor: nombre for id_valor, nombre in filas}
 
-        return proveedor.razon_social if proveedor else f"ID:{id_proveedor}"
-
-    def _obtener_nombre_contacto(self, id_contacto: Optional[int]) -> str:
-        """Obtiene el nombre del contacto por su ID"""
-        if not id_contacto:
-            return ""
-
-        contacto = self.db.query(ProveedorContactosModel).filter(
-            ProveedorContactosModel.id_proveedor_contacto == id_contacto
-        ).first()
-
-        return contacto.nombre if contacto else f"ID:{id_contacto}"
-
-    def _resolver_cambio_proveedor(self, cambio_proveedor: Optional[str]) -> Optional[str]:
-        """Resuelve el cambio de proveedor de IDs a nombres"""
-        if not cambio_proveedor:
-            return None
-
-        id_anterior, id_nuevo = _parsear_cambio_concatenado(cambio_proveedor)
+    @staticmethod
+    def _formatear_cambio(cambio: Optional[str], nombres: Dict[Any, str]) -> Optional[str]:
+        """Resuelve un cambio concatenado 'id_anterior ----> id_nuevo' a nombres"""
+        id_anterior, id_nuevo = _parsear_cambio_concatenado(cambio)
 
         if id_anterior and id_nuevo:
-            nombre_anterior = self._obtener_nombre_proveedor(id_anterior)
-            nombre_nuevo = self._obtener_nombre_proveedor(id_nuevo)
+            nombre_anterior = nombres.get(id_anterior, f"ID:{id_anterior}")
+            nombre_nuevo = nombres.get(id_nuevo, f"ID:{id_nuevo}")
             return f"{nombre_anterior} ----> {nombre_nuevo}"
         elif id_nuevo:
-            return self._obtener_nombre_proveedor(id_nuevo)
+            return nombres.get(id_nuevo, f"ID:{id_nuevo}")
         else:
             return None
 
-    def _resolver_cambio_contacto(self, cambio_contacto: Optional[str]) -> Optional[str]:
-        """Resuelve el cambio de contacto de IDs a nombres"""
-        if not cambio_contacto:
-            return None
+    def procesar_filas(self, resultados: List[tuple]) -> List[Dict[str, Any]]:
+        """
+        Convierte filas (auditoria, numero_oc, nombre_usuario) de `consulta_base` en items de respuesta.
 
-        id_anterior, id_nuevo = _parsear_cambio_concatenado(cambio_contacto)
+        Resuelve nombres en dos fases para que la cantidad de consultas no
+        dependa del número de filas:
+        1. Parsea los campos concatenados y el registro de cambios recolectando IDs
+        2. Resuelve proveedores, contactos y productos con una consulta IN (...)
+           por tipo de entidad y formatea todo en memoria
+        """
+        # Fase 1: parsear y recolectar IDs
+        parseados = []
+        ids_proveedores, ids_contactos, ids_productos = set(), set(), set()
+
+        for auditoria, numero_oc, nombre_usuario in resultados:
+            # Registro compacto (o columnas JSON anteriores), decodificado solo para filas retornadas
+            cambios = CambiosAuditoria.de_auditoria(auditoria)
+            agregados = cambios.agregados
+            modificados = cambios.modificados
+            eliminados = cambios.eliminados
+
+            ids_proveedores.update(i for i in _parsear_cambio_concatenado(auditoria.cambio_proveedor) if i)
+            ids_contactos.update(i for i in _parsear_cambio_concatenado(auditoria.cambio_contacto) if i)
+            ids_productos.update(agregados)
+            ids_productos.update(eliminados)
+            ids_productos.update(id_producto for id_producto, _ in modificados)
+
+            parseados.append((auditoria, numero_oc, nombre_usuario, agregados, modificados, eliminados, cambios.adicionales))
+
+        # Fase 2: una consulta por tipo de entidad
+        nombres_proveedores = self._cargar_nombres(
+            ProveedoresModel.id_proveedor, ProveedoresModel.razon_social, ids_proveedores
+        )
+        nombres_contactos = self._cargar_nombres(
+            ProveedorContactosModel.id_proveedor_contacto, ProveedorContactosModel.nombre, ids_contactos
+        )
+        nombres_productos = self._cargar_nombres(
+            ProductosModel.id_producto, ProductosModel.nombre, ids_productos
+        )
+
+        def nombre_producto(id_producto) -> str:
+            return nombres_productos.get(id_producto, f"ID:{id_producto}")
+
+        items_procesados = []
+        for auditoria, numero_oc, nombre_usuario, agregados, modificados, eliminados, adicionales in parseados:
+            # Construir item de respuesta
+            # Manejar valores None para campos obligatorios del schema
+            item = {
+                "id_auditoria": auditoria.id_auditoria,
+                "fecha_evento": auditoria.fecha_evento,
+                "tipo_operacion": auditoria.tipo_operacion,
+                "numero_oc": numero_oc if numero_oc is not None else "N/A",
+                "nombre_usuario": nombre_usuario if nombre_usuario is not None else "Sin asignar",
+                "cambio_proveedor": self._formatear_cambio(auditoria.cambio_proveedor, nombres_proveedores),
+                "cambio_contacto": self._formatear_cambio(auditoria.cambio_contacto, nombres_contactos),
+                "cambio_monto": auditoria.cambio_monto,
+                "productos_agregados": [nombre_producto(i) for i in agregados] or None,
+                "productos_modificados": [
+                    {'nombre': nombre_producto(i), 'cambios': cambios} for i, cambios in modificados
+                ] or None,
+                "productos_eliminados": [nombre_producto(i) for i in eliminados] or None,
+                "cambios_adicionales": adicionales,
+                "descripcion": auditoria.descripcion
+            }
 
-        if id_anterior and id_nuevo:
-            nombre_anterior = self._obtener_nombre_contacto(id_anterior)
-            nombre_nuevo = self._obtener_nombre_contacto(id_nuevo)
-            return f"{nombre_anterior} ----> {nombre_nuevo}"
-        elif id_nuevo:
-            return self._obtener_nombre_contacto(id_nuevo)
-        else:
-            return None
+            items_procesados.append(item)
 
-    def _resolver_productos(self, productos_json: Optional[str]) -> Optional[List[str]]:
-        """Resuelve una lista de IDs de productos a nombres, preservando duplicados"""
-        if not productos_json:
-            return None
+        return items_procesados
 
-        try:
-            ids_raw = json.loads(productos_json)
-            if not ids_raw:
-                return None
+    def _resolver_ids(self, columna_id, condicion) -> List[int]:
+        """IDs que cumplen una condición (proveedor/contacto por nombre o RUC)"""
+        return [fila[0] for fila in self.db.query(columna_id).filter(condicion).all()]
 
-            # Convertir IDs a integers (pueden venir como strings desde el JSON)
-            ids = []
-            for id_val in ids_raw:
-                try:
-                    ids.append(int(id_val))
-                except (ValueError, TypeError):
-                    logger.warning(f"ID de producto inválido: {id_val}")
-                    ids.append(id_val)
+    def construir_filtros(
+        self,
+        id_orden_compra: Optional[int] = None,
+        numero_oc: Optional[str] = None,
+        tipo_operacion: Optional[str] = None,
+        usuario: Optional[str] = None,
+        proveedor: Optional[str] = None,
+        ruc_proveedor: Optional[str] = None,
+        contacto: Optional[str] = None,
+        fecha_desde: Optional[datetime] = None,
+        fecha_hasta: Optional[datetime] = None,
+        id_producto: Optional[int] = None
+    ) -> Tuple[list, bool]:
+        """
+        Construye los filtros del listado (también los usa la exportación).
 
-            # Obtener IDs únicos para la consulta
-            ids_unicos = list(set(ids))
+        Returns:
+            tuple: (lista de filtros, True si algún filtro requiere los JOINs de orden/usuario)
+        """
+        filters = []
+        requiere_join = False
+
+        if id_orden_compra is not None:
+            filters.append(OrdenesCompraAuditoriaModel.id_orden_compra == id_orden_compra)
+
+        if numero_oc:
+            # Buscar tanto en la columna numero_oc de auditoria como en el correlative de ordenes_compra
+            filters.append(or_(
+                OrdenesCompraAuditoriaModel.numero_oc.like(f"%{numero_oc}%"),
+                OrdenesCompraModel.correlative.like(f"%{numero_oc}%")
+            ))
+            requiere_join = True
+
+        if tipo_operacion:
+            filters.append(OrdenesCompraAuditoriaModel.tipo_operacion == tipo_operacion.upper())
+
+        if usuario:
+            usuario_filter = or_(
+                UsuariosModel.username.like(f"%{usuario}%"),
+                TrabajadoresModel.nombre.like(f"%{usuario}%"),
+                TrabajadoresModel.apellido.like(f"%{usuario}%"),
+                func.concat(TrabajadoresModel.nombre, ' ', TrabajadoresModel.apellido).like(f"%{usuario}%")
+            )
+            filters.append(usuario_filter)
+            requiere_join = True
+
+        # Filtros de proveedor/contacto: resolver primero a un conjunto de IDs
+        # y filtrar por igualdad sobre las columnas estructuradas (indexadas)
+        if proveedor:
+            ids = self._resolver_ids(ProveedoresModel.id_proveedor, ProveedoresModel.razon_social.like(f"%{proveedor}%"))
+            filters.append(_filtro_por_ids(
+                OrdenesCompraAuditoriaModel.id_proveedor_anterior,
+                OrdenesCompraAuditoriaModel.id_proveedor_nuevo,
+                ids
+            ))
+
+        if ruc_proveedor:
+            ids = self._resolver_ids(ProveedoresModel.id_proveedor, ProveedoresModel.ruc == ruc_proveedor)
+            filters.append(_filtro_por_ids(
+                OrdenesCompraAuditoriaModel.id_proveedor_anterior,
+                OrdenesCompraAuditoriaModel.id_proveedor_nuevo,
+                ids
+            ))
+
+        if contacto:
+            ids = self._resolver_ids(
+                ProveedorContactosModel.id_proveedor_contacto, ProveedorContactosModel.nombre.like(f"%{contacto}%")
+            )
+            filters.append(_filtro_por_ids(
+                OrdenesCompraAuditoriaModel.id_contacto_anterior,
+                OrdenesCompraAuditoriaModel.id_contacto_nuevo,
+                ids
+            ))
+
+        if id_producto is not None:
+            # Auditorías que agregaron, modificaron o eliminaron el producto (tabla lateral indexada)
+            filters.append(OrdenesCompraAuditoriaModel.id_auditoria.in_(
+                select(OrdenesCompraAuditoriaProductoModel.id_auditoria).where(
+                    OrdenesCompraAuditoriaProductoModel.id_producto == id_producto
+                )
+            ))
+
+        if fecha_desde:
+            filters.append(OrdenesCompraAuditoriaModel.fecha_evento >= fecha_desde)
+
+        if fecha_hasta:
+            filters.append(OrdenesCompraAuditoriaModel.fecha_evento <= fecha_hasta)
+
+        return filters, requiere_join
+
+    def consulta_base(self, filters: list):
+        """Query base con LEFT JOINs para incluir todas las auditorías (también la usa la exportación)"""
+        # Usar COALESCE para obtener numero_oc: primero de la tabla auditoria, si no existe hacer JOIN
+        query = (
+            self.db.query(
+                OrdenesCompraAuditoriaModel,
+                func.coalesce(
+                    OrdenesCompraAuditoriaModel.numero_oc,
+                    OrdenesCompraModel.correlative
+                ).label("numero_oc"),
+                func.concat(TrabajadoresModel.nombre, ' ', TrabajadoresModel.apellido).label("nombre_usuario")
+            )
+            .outerjoin(OrdenesCompraModel, OrdenesCompraAuditoriaModel.id_orden_compra == OrdenesCompraModel.id_orden)
+            .outerjoin(UsuariosModel, OrdenesCompraAuditoriaModel.id_usuario == UsuariosModel.id_usuario)
+            .outerjoin(TrabajadoresModel, UsuariosModel.id_trabajador == TrabajadoresModel.id_trabajador)
+        )
 
-            # Consultar todos los nombres de una vez
-            productos = self.db.query(ProductosModel).filter(
-                ProductosModel.id_producto.in_(ids_unicos)
-            ).all()
+        if filters:
+            query = query.filter(and_(*filters))
 
-            # Crear un mapa de id -> nombre
-            mapa_productos = {p.id_producto: p.nombre for p in productos}
+        return query
 
-            # Mapear cada ID del array original a su nombre, preservando duplicados
-            nombres = [mapa_productos.get(id_prod, f"ID:{id_prod}") for id_prod in ids]
+    def _contar_exacto(self, query, filters: list, requiere_join: bool) -> int:
+        """
+        Cuenta los registros que cumplen los filtros.
 
-            return nombres if nombres else None
+        Si ningún filtro usa las tablas unidas, cuenta directamente sobre la tabla
+        de auditoría evitando los 3 LEFT JOINs (no cambian la cantidad de filas).
+        """
+        if requiere_join:
+            return query.count()
 
-        except Exception as e:
-            logger.error(f"Error al parsear productos JSON: {e}")
-            return None
+        count_query = self.db.query(func.count(OrdenesCompraAuditoriaModel.id_auditoria))
+        if filters:
+            count_query = count_query.filter(and_(*filters))
+        return count_query.scalar() or 0
 
-    def _resolver_productos_modificados(self, productos_json: Optional[str]) -> Optional[List[Dict[str, Any]]]:
-        """Resuelve productos modificados incluyendo sus cambios"""
-        if not productos_json:
-            return None
+    def _contar_estimado(self, query, filters: list, requiere_join: bool, clave: tuple) -> int:
+        """
+        Retorna un total aproximado, cacheado en memoria por combinación de filtros.
 
+        Sin filtros se usan las estadísticas de la tabla (MySQL) en lugar de un COUNT.
+        """
+        ahora = time.monotonic()
+        with _conteos_lock:
+            cacheado = _conteos_cache.get(clave)
+        if cacheado and ahora - cacheado[0] < _CONTEO_CACHE_TTL:
+            return cacheado[1]
+
+        total = None
+        if not filters and self.db.get_bind().dialect.name == "mysql":
+            try:
+                total = self.db.execute(
+                    text(
+                        "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :tabla"
+                    ),
+                    {"tabla": OrdenesCompraAuditoriaModel.__tablename__}
+                ).scalar()
+            except Exception as e:
+                logger.warning(f"No se pudo leer estadísticas de la tabla de auditoría: {e}")
+
+        if total is None:
+            total = self._contar_exacto(query, filters, requiere_join)
+
+        with _conteos_lock:
+            if len(_conteos_cache) >= _CONTEO_CACHE_MAX:
+                _conteos_cache.pop(next(iter(_conteos_cache)))
+            _conteos_cache[clave] = (ahora, int(total))
+        return int(total)
+
+    def _usar_archivo(
+        self,
+        incluir_archivo: Optional[bool],
+        fecha_desde: Optional[datetime],
+        fecha_hasta: Optional[datetime]
+    ) -> bool:
+        """
+        Con incluir_archivo=None (automático) solo se lee el archivo si fecha_desde
+        cae en meses archivados; con True se lee siempre y con False nunca.
+        """
+        if self.archivo_service is None or incluir_archivo is False:
+            return False
+        if incluir_archivo:
+            return True
         try:
-            productos_data = json.loads(productos_json)
-            if not productos_data:
-                return None
+            return fecha_desde is not None and self.archivo_service.tiene_archivo(
+                TABLA_ORDENES_COMPRA, fecha_desde, fecha_hasta
+            )
+        except Exception as e:
+            logger.error(f"❌ No se pudo leer el manifiesto del archivo de auditorías, se listan solo las recientes: {e}")
+            return False
 
-            resultado = []
-            for item in productos_data:
-                id_producto_raw = item.get('id_producto')
-                cambios = item.get('cambios', {})
+    def _iterar_archivadas(
+        self,
+        estricto: bool,
+        antes_de: Optional[Tuple[datetime, int]] = None,
+        id_orden_compra: Optional[int] = None,
+        numero_oc: Optional[str] = None,
+        tipo_operacion: Optional[str] = None,
+        usuario: Optional[str] = None,
+        proveedor: Optional[str] = None,
+        ruc_proveedor: Optional[str] = None,
+        contacto: Optional[str] = None,
+        fecha_desde: Optional[datetime] = None,
+        fecha_hasta: Optional[datetime] = None,
+        id_producto: Optional[int] = None
+    ) -> Iterator[tuple]:
+        """
+        Auditorías archivadas que cumplen los filtros, como filas (auditoria, numero_oc, nombre_usuario).
 
-                # Convertir ID a integer (puede venir como string desde el JSON)
-                try:
-                    id_producto = int(id_producto_raw)
-                except (ValueError, TypeError):
-                    logger.warning(f"ID de producto inválido en modificados: {id_producto_raw}")
-                    id_producto = id_producto_raw
+        Los archivos se leen a medida que se consumen las filas: quien solo necesita
+        una página deja de iterar y no se descomprime el resto. Los filtros se
+        aplican en memoria sobre los valores guardados al archivar. Se omiten las
+        auditorías que siguen en la tabla (archivado interrumpido antes del DELETE)
+        para no contarlas ni listarlas dos veces.
 
-                # Obtener nombre del producto
-                producto = self.db.query(ProductosModel).filter(
-                    ProductosModel.id_producto == id_producto
-                ).first()
+        Args:
+            estricto: Propagar errores de lectura (True) o registrarlos y terminar (False)
+            antes_de: (fecha_evento, id_auditoria) de un cursor: solo filas posteriores en el orden
 
-                nombre = producto.nombre if producto else f"ID:{id_producto}"
+        Yields:
+            tuple: Filas ordenadas por fecha_evento desc, id_auditoria desc
+        """
+        ids_proveedor = None
+        if proveedor:
+            ids_proveedor = set(self._resolver_ids(ProveedoresModel.id_proveedor, ProveedoresModel.razon_social.like(f"%{proveedor}%")))
+        if ruc_proveedor:
+            ids_ruc = set(self._resolver_ids(ProveedoresModel.id_proveedor, ProveedoresModel.ruc == ruc_proveedor))
+            ids_proveedor = ids_ruc if ids_proveedor is None else ids_proveedor & ids_ruc
+        ids_contacto = None
+        if contacto:
+            ids_contacto = set(self._resolver_ids(
+                ProveedorContactosModel.id_proveedor_contacto, ProveedorContactosModel.nombre.like(f"%{contacto}%")
+            ))
 
-                resultado.append({
-                    'nombre': nombre,
-                    'cambios': cambios
-                })
+        try:
+            ids_en_tabla = self._ids_archivados_en_tabla()
+            registros = self.archivo_service.iterar_registros(TABLA_ORDENES_COMPRA, fecha_desde, fecha_hasta, antes_de)
+            for r in registros:
+                if r["id_auditoria"] in ids_en_tabla:
+                    continue
+                if id_orden_compra is not None and r["id_orden_compra"] != id_orden_compra:
+                    continue
+                if numero_oc and numero_oc.lower() not in (r.get("numero_oc_resuelto") or "").lower():
+                    continue
+                if tipo_operacion and r["tipo_operacion"] != tipo_operacion.upper():
+                    continue
+                if usuario and usuario.lower() not in (r.get("nombre_usuario") or "").lower():
+                    continue
+                if ids_proveedor is not None and not ids_proveedor & {r.get("id_proveedor_anterior"), r.get("id_proveedor_nuevo")}:
+                    continue
+                if ids_contacto is not None and not ids_contacto & {r.get("id_contacto_anterior"), r.get("id_contacto_nuevo")}:
+                    continue
+                if id_producto is not None and not any(
+                    p["id_producto"] == id_producto for p in r.get("productos_afectados", [])
+                ):
+                    continue
+
+                auditoria = SimpleNamespace(**r)
+                auditoria.fecha_evento = datetime.fromisoformat(r["fecha_evento"])
+                yield auditoria, r.get("numero_oc_resuelto"), r.get("nombre_usuario")
+        except Exception as e:
+            if estricto:
+                raise
+            logger.error(f"❌ No se pudo leer el archivo de auditorías, se listan solo las recientes: {e}")
 
-            return resultado if resultado else None
+    def _ids_archivados_en_tabla(self) -> set:
+        """
+        IDs que siguen en la tabla con fecha dentro del periodo archivado.
 
-        except Exception as e:
-            logger.error(f"Error al parsear productos modificados JSON: {e}")
-            return None
+        Normalmente ninguno: solo quedan si un archivado se interrumpió entre la
+        escritura del archivo y el DELETE (la siguiente corrida los vuelve a archivar).
+        """
+        fecha_max = self.archivo_service.fecha_max_archivada(TABLA_ORDENES_COMPRA)
+        if fecha_max is None:
+            return set()
+        return set(self._resolver_ids(
+            OrdenesCompraAuditoriaModel.id_auditoria,
+            OrdenesCompraAuditoriaModel.fecha_evento <= fecha_max
+        ))
+
+    def _contar_archivadas(self, conteo: str, estricto: bool, clave: tuple, filtros_kwargs: Dict[str, Any]) -> int:
+        """
+        Total de auditorías archivadas que cumplen los filtros.
+
+        Estimado: filas del manifiesto en el rango de fechas (no lee archivos).
+        Exacto: recorre los archivos; se cachea como los conteos estimados porque
+        el archivo solo cambia con la corrida diaria de archivado.
+        """
+        fecha_desde, fecha_hasta = filtros_kwargs["fecha_desde"], filtros_kwargs["fecha_hasta"]
+        if conteo == CONTEO_ESTIMADO:
+            return self.archivo_service.contar_filas(TABLA_ORDENES_COMPRA, fecha_desde, fecha_hasta)
+
+        clave = ("archivo", self.archivo_service.fecha_max_archivada(TABLA_ORDENES_COMPRA)) + clave
+        ahora = time.monotonic()
+        with _conteos_lock:
+            cacheado = _conteos_cache.get(clave)
+        if cacheado and ahora - cacheado[0] < _CONTEO_CACHE_TTL:
+            return cacheado[1]
+
+        total = sum(1 for _ in self._iterar_archivadas(estricto, **filtros_kwargs))
+        with _conteos_lock:
+            if len(_conteos_cache) >= _CONTEO_CACHE_MAX:
+                _conteos_cache.pop(next(iter(_conteos_cache)))
+            _conteos_cache[clave] = (ahora, total)
+        return total
 
     def execute(
         self,
@@ -198,11 +514,20 @@ class ListarAuditoriaOrdenCompra:
         fecha_desde: Optional[datetime] = None,
         fecha_hasta: Optional[datetime] = None,
         page: int = 1,
-        page_size: int = 10
+        page_size: int = 10,
+        cursor: Optional[str] = None,
+        conteo: Optional[str] = None,
+        id_producto: Optional[int] = None,
+        incluir_archivo: Optional[bool] = None
     ) -> Dict[str, Any]:
         """
         Ejecuta el caso de uso de listado de auditorías con JOINs.
 
+        Soporta dos modos de paginación:
+        - Por página (page/page_size con OFFSET): modo por defecto, compatible con clientes existentes
+        - Por cursor (keyset sobre fecha_evento, id_auditoria): se activa cuando se envía `cursor`
+          (cadena vacía para la primera página). El tiempo de respuesta no crece con la profundidad.
+
         Args:
             id_orden_compra: Filtrar por ID de orden de compra
             numero_oc: Filtrar por número de OC
@@ -213,151 +538,127 @@ class ListarAuditoriaOrdenCompra:
             contacto: Buscar por nombre del contacto
             fecha_desde: Filtrar desde esta fecha
             fecha_hasta: Filtrar hasta esta fecha
-            page: Número de página
+            page: Número de página (solo modo por página)
             page_size: Cantidad de registros por página
+            cursor: Cursor opaco retornado como `next_cursor` en la respuesta anterior
+            conteo: Cálculo del total: 'exacto', 'estimado' (cacheado) o 'ninguno'.
+                    Por defecto 'exacto' en modo por página y 'ninguno' en modo cursor.
+            id_producto: Filtrar auditorías que afectaron a este producto
+            incluir_archivo: Incluir auditorías archivadas. None (default) las incluye solo
+                             si fecha_desde cae en meses archivados.
 
         Returns:
             dict: Diccionario con auditorías procesadas y metadatos de paginación
+
+        Raises:
+            CursorAuditoriaInvalidoError: Si el cursor no es válido
         """
         try:
-            logger.info(f"Listando auditorías - Página {page}, tamaño {page_size}")
-
-            # Query base con LEFT JOINs para incluir todas las auditorías
-            # Usar COALESCE para obtener numero_oc: primero de la tabla auditoria, si no existe hacer JOIN
-            query = (
-                self.db.query(
-                    OrdenesCompraAuditoriaModel,
-                    func.coalesce(
-                        OrdenesCompraAuditoriaModel.numero_oc,
-                        OrdenesCompraModel.correlative
-                    ).label("numero_oc"),
-                    func.concat(TrabajadoresModel.nombre, ' ', TrabajadoresModel.apellido).label("nombre_usuario")
-                )
-                .outerjoin(OrdenesCompraModel, OrdenesCompraAuditoriaModel.id_orden_compra == OrdenesCompraModel.id_orden)
-                .outerjoin(UsuariosModel, OrdenesCompraAuditoriaModel.id_usuario == UsuariosModel.id_usuario)
-                .outerjoin(TrabajadoresModel, UsuariosModel.id_trabajador == TrabajadoresModel.id_trabajador)
-            )
-
-            # Aplicar filtros
-            filters = []
-
-            if id_orden_compra is not None:
-                filters.append(OrdenesCompraAuditoriaModel.id_orden_compra == id_orden_compra)
+            modo_cursor = cursor is not None
+            if conteo is None:
+                conteo = CONTEO_NINGUNO if modo_cursor else CONTEO_EXACTO
 
-            if numero_oc:
-                # Buscar tanto en la columna numero_oc de auditoria como en el correlative de ordenes_compra
-                filters.append(or_(
-                    OrdenesCompraAuditoriaModel.numero_oc.like(f"%{numero_oc}%"),
-                    OrdenesCompraModel.correlative.like(f"%{numero_oc}%")
-                ))
+            logger.info(
+                f"Listando auditorías - {'cursor' if modo_cursor else f'página {page}'}, "
+                f"tamaño {page_size}, conteo {conteo}"
+            )
 
-            if tipo_operacion:
-                filters.append(OrdenesCompraAuditoriaModel.tipo_operacion == tipo_operacion.upper())
+            filtros_kwargs = dict(
+                id_orden_compra=id_orden_compra,
+                numero_oc=numero_oc,
+                tipo_operacion=tipo_operacion,
+                usuario=usuario,
+                proveedor=proveedor,
+                ruc_proveedor=ruc_proveedor,
+                contacto=contacto,
+                fecha_desde=fecha_desde,
+                fecha_hasta=fecha_hasta,
+                id_producto=id_producto
+            )
+            filters, requiere_join = self.construir_filtros(**filtros_kwargs)
+            query = self.consulta_base(filters)
+
+            # Auditorías archivadas: siempre son más antiguas que las de la tabla
+            usar_archivo = self._usar_archivo(incluir_archivo, fecha_desde, fecha_hasta)
+            # Con incluir_archivo=True los errores del archivo se propagan
+            estricto = bool(incluir_archivo)
+            clave = tuple(sorted((k, str(v)) for k, v in filtros_kwargs.items() if v is not None))
+
+            # Total de registros (opcional)
+            total_tabla = None
+            if conteo == CONTEO_EXACTO:
+                total_tabla = self._contar_exacto(query, filters, requiere_join)
+            elif conteo == CONTEO_ESTIMADO:
+                total_tabla = self._contar_estimado(query, filters, requiere_join, clave)
+            total = total_tabla
+            if total is not None and usar_archivo:
+                total += self._contar_archivadas(conteo, estricto, clave, filtros_kwargs)
+
+            total_pages = None
+            if total is not None:
+                total_pages = math.ceil(total / page_size) if total > 0 else 1
+
+            # Orden total y estable: fecha_evento desc, id_auditoria desc (índice compuesto)
+            query = query.order_by(
+                desc(OrdenesCompraAuditoriaModel.fecha_evento),
+                desc(OrdenesCompraAuditoriaModel.id_auditoria)
+            )
 
-            if usuario:
-                usuario_filter = or_(
-                    UsuariosModel.username.like(f"%{usuario}%"),
-                    TrabajadoresModel.nombre.like(f"%{usuario}%"),
-                    TrabajadoresModel.apellido.like(f"%{usuario}%"),
-                    func.concat(TrabajadoresModel.nombre, ' ', TrabajadoresModel.apellido).like(f"%{usuario}%")
-                )
-                filters.append(usuario_filter)
-
-            # Filtros de proveedor/contacto: buscar en campos concatenados
-            if proveedor:
-                filters.append(OrdenesCompraAuditoriaModel.cambio_proveedor.like(f"%{proveedor}%"))
-
-            if ruc_proveedor:
-                # Obtener nombre del proveedor por RUC y buscar en cambio_proveedor
-                proveedor_obj = self.db.query(ProveedoresModel).filter(
-                    ProveedoresModel.ruc == ruc_proveedor
-                ).first()
-                if proveedor_obj:
-                    filters.append(OrdenesCompraAuditoriaModel.cambio_proveedor.like(f"%{proveedor_obj.id_proveedor}%"))
-
-            if contacto:
-                filters.append(OrdenesCompraAuditoriaModel.cambio_contacto.like(f"%{contacto}%"))
-
-            if fecha_desde:
-                filters.append(OrdenesCompraAuditoriaModel.fecha_evento >= fecha_desde)
-
-            if fecha_hasta:
-                filters.append(OrdenesCompraAuditoriaModel.fecha_evento <= fecha_hasta)
-
-            if filters:
-                query = query.filter(and_(*filters))
-
-            # Total de registros
-            total = query.count()
-
-            # Calcular paginación
-            total_pages = math.ceil(total / page_size) if total > 0 else 1
-
-            if page > total_pages and total > 0:
-                logger.warning(f"Página {page} excede total {total_pages}, ajustando")
-                page = total_pages
-
-            offset = (page - 1) * page_size
-
-            # Ordenar y paginar
-            query = query.order_by(desc(OrdenesCompraAuditoriaModel.fecha_evento))
-            resultados = query.limit(page_size).offset(offset).all()
-
-            # Procesar resultados y resolver nombres
-            items_procesados = []
-            for auditoria, numero_oc, nombre_usuario in resultados:
-                # Resolver cambios concatenados
-                cambio_proveedor_resuelto = self._resolver_cambio_proveedor(auditoria.cambio_proveedor)
-                cambio_contacto_resuelto = self._resolver_cambio_contacto(auditoria.cambio_contacto)
-
-                # Resolver productos
-                productos_agregados_nombres = self._resolver_productos(auditoria.productos_agregados)
-                productos_modificados_data = self._resolver_productos_modificados(auditoria.productos_modificados)
-                productos_eliminados_nombres = self._resolver_productos(auditoria.productos_eliminados)
-
-                # Parsear cambios adicionales y convertir todos los valores a string
-                cambios_adicionales_dict = None
-                if auditoria.cambios_adicionales:
-                    try:
-                        raw_dict = json.loads(auditoria.cambios_adicionales)
-                        # Convertir todos los valores a string para cumplir con Dict[str, str]
-                        cambios_adicionales_dict = {
-                            k: str(v) if not isinstance(v, str) else v
-                            for k, v in raw_dict.items()
-                        }
-                    except:
-                        pass
-
-                # Construir item de respuesta
-                # Manejar valores None para campos obligatorios del schema
-                item = {
-                    "id_auditoria": auditoria.id_auditoria,
-                    "fecha_evento": auditoria.fecha_evento,
-                    "tipo_operacion": auditoria.tipo_operacion,
-                    "numero_oc": numero_oc if numero_oc is not None else "N/A",
-                    "nombre_usuario": nombre_usuario if nombre_usuario is not None else "Sin asignar",
-                    "cambio_proveedor": cambio_proveedor_resuelto,
-                    "cambio_contacto": cambio_contacto_resuelto,
-                    "cambio_monto": auditoria.cambio_monto,
-                    "productos_agregados": productos_agregados_nombres,
-                    "productos_modificados": productos_modificados_data,
-                    "productos_eliminados": productos_eliminados_nombres,
-                    "cambios_adicionales": cambios_adicionales_dict,
-                    "descripcion": auditoria.descripcion
-                }
-
-                items_procesados.append(item)
-
-            logger.info(f"✅ {len(items_procesados)} auditorías procesadas de {total} totales")
+            next_cursor = None
+            if modo_cursor:
+                fecha_cursor, id_cursor = _decodificar_cursor(cursor) if cursor else (None, None)
+                if cursor:
+                    query = query.filter(or_(
+                        OrdenesCompraAuditoriaModel.fecha_evento < fecha_cursor,
+                        and_(
+                            OrdenesCompraAuditoriaModel.fecha_evento == fecha_cursor,
+                            OrdenesCompraAuditoriaModel.id_auditoria < id_cursor
+                        )
+                    ))
+
+                # Pedir un registro extra para saber si hay siguiente página
+                resultados = query.limit(page_size + 1).all()
+                if usar_archivo and len(resultados) <= page_size:
+                    # La tabla se agotó: continuar con las archivadas posteriores al cursor
+                    antes_de = (fecha_cursor, id_cursor) if cursor else None
+                    siguientes = self._iterar_archivadas(estricto, antes_de=antes_de, **filtros_kwargs)
+                    resultados = resultados + list(islice(siguientes, page_size + 1 - len(resultados)))
+                if len(resultados) > page_size:
+                    resultados = resultados[:page_size]
+                    ultima = resultados[-1][0]
+                    next_cursor = _codificar_cursor(ultima.fecha_evento, ultima.id_auditoria)
+            else:
+                if total_pages is not None and page > total_pages and total > 0:
+                    logger.warning(f"Página {page} excede total {total_pages}, ajustando")
+                    page = total_pages
+
+                offset = (page - 1) * page_size
+                resultados = query.limit(page_size).offset(offset).all()
+                if usar_archivo and len(resultados) < page_size:
+                    # La tabla se agotó en esta página: completar con las archivadas
+                    if total_tabla is None or conteo != CONTEO_EXACTO:
+                        total_tabla = self._contar_exacto(query, filters, requiere_join)
+                    inicio = max(0, offset + len(resultados) - total_tabla)
+                    siguientes = self._iterar_archivadas(estricto, **filtros_kwargs)
+                    resultados = resultados + list(islice(siguientes, inicio, inicio + page_size - len(resultados)))
+
+            # Procesar resultados y resolver nombres (consultas en lote)
+            items_procesados = self.procesar_filas(resultados)
+
+            logger.info(f"✅ {len(items_procesados)} auditorías procesadas de {total if total is not None else '?'} totales")
 
             return {
                 "total": total,
+                "total_estimado": conteo == CONTEO_ESTIMADO,
                 "items": items_procesados,
                 "page": page,
                 "page_size": page_size,
-                "total_pages": total_pages
+                "total_pages": total_pages,
+                "next_cursor": next_cursor
             }
 
+        except CursorAuditoriaInvalidoError:
+            raise
         except Exception as e:
             logger.error(f"❌ Error al listar auditorías: {e}", exc_info=True)
             raise
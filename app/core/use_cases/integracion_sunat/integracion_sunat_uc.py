@@ -1,11 +1,28 @@
 """
 Caso de uso para la integración con SUNAT
 """
-from typing import Dict
-from app.adapters.outbound.external_services.sunat.sunat_scraper import SunatScrapper
 import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional
+from app.adapters.outbound.external_services.sunat.dto import ERROR_RUC_NO_ENCONTRADO
+from app.adapters.outbound.external_services.sunat.sunat_scraper import SunatScrapper
+
+from app.adapters.outbound.cache.redis_async_cache import get_redis_async_cache
+from app.config.cache.tiered_cache import EntradaCache, get_tiered_cache_service
+from app.config.settings import get_settings
+from app.core.services.ruc_snapshot_service import RucSnapshotService, get_ruc_snapshot_service
+from app.shared.utils.admission_governor import AdmisionRechazadaError, get_admission_governor
+from app.shared.utils.single_flight import SingleFlight
+
+# Consultas SUNAT en curso en este proceso: una sola por RUC
+_consultas_en_curso = SingleFlight()
 
-from app.config.cache.redis_cache import get_cache_service
+# Refrescos en segundo plano en curso (referencia fuerte para que no los recolecte el GC)
+_refrescos_en_curso = set()
+
+# Intervalo con el que un worker consulta el caché mientras otro worker hace el scraping
+INTERVALO_ESPERA_WORKER = 0.25
 
 
 def _validar_ruc(ruc: str) -> bool:
@@ -29,15 +46,36 @@ def _validar_ruc(ruc: str) -> bool:
     return True
 
 
+def _item_lote(ruc: str, resultado: Dict) -> Dict:
+    """Resultado de un RUC dentro de una consulta por lote"""
+    if "message" in resultado and "detail" in resultado:
+        return {"ruc": ruc, "ok": False, "error": {"message": resultado["message"], "detail": resultado["detail"]}}
+    return {"ruc": ruc, "ok": True, "datos": resultado}
+
+
 class IntegracionSunatUC:
     """
     Caso de uso para consultar información de RUC en SUNAT
     """
 
-    def __init__(self, sunat_scraper: SunatScrapper):
+    def __init__(self, sunat_scraper: SunatScrapper, snapshot_service: Optional[RucSnapshotService] = None):
         self.sunat_scraper = sunat_scraper
-        self.cache_service = get_cache_service()
-        self.cache_ttl = 604800  # 7 días en segundos
+        # Datos: memoria + Redis con vencimiento soft/hard, y la BD como respaldo durable.
+        # Locks: Redis directo
+        self.cache_service = get_tiered_cache_service()
+        self.lock_service = get_redis_async_cache()
+        self.snapshot_service = snapshot_service or get_ruc_snapshot_service()
+        # Límite de scrapings simultáneos y por segundo hacia SUNAT (compartido por el proceso)
+        self.governor = get_admission_governor("sunat")
+
+        settings = get_settings()
+        self.cache_soft_ttl = settings.sunat_cache_soft_ttl
+        self.cache_hard_ttl = settings.sunat_cache_hard_ttl
+        self.cache_negativo_ttl = settings.sunat_cache_negativo_ttl
+        self.timeout_espera = settings.sunat_single_flight_timeout
+        self.lock_ttl = settings.sunat_lock_ttl
+        self.concurrencia_lote = settings.sunat_lote_concurrencia
+        self.deadline_lote = settings.sunat_lote_deadline
 
     async def obtener_ruc(self, ruc: str) -> Dict:
         """
@@ -48,6 +86,9 @@ class IntegracionSunatUC:
 
         Returns:
             Dict: Información del RUC o mensaje de error
+
+        Raises:
+            AdmisionRechazadaError: Si hay que consultar SUNAT y está saturado
         """
         # Validar formato de RUC
         if not _validar_ruc(ruc):
@@ -57,37 +98,275 @@ class IntegracionSunatUC:
                 "ruc": ruc
             }
 
-        # 1. BUSCAR EN CACHÉ PRIMERO
-        cache_key = f"sunat:ruc:{ruc}"
-        cached_data = self.cache_service.get(cache_key)
+        # 1. BUSCAR EN CACHÉ PRIMERO (si ya no está fresco se responde igual y se refresca aparte)
+        entrada = await self.cache_service.get(f"sunat:ruc:{ruc}")
 
-        if cached_data:
+        if entrada:
             print(f"Retornando datos desde cache para RUC: {ruc}")
-            return cached_data
+            return self._servir(ruc, entrada)
+
+        # 2. NO ESTÁ EN CACHÉ: BUSCAR LA ÚLTIMA CONSULTA GUARDADA EN BD
+        entrada = (await self._desde_base_datos([ruc])).get(ruc)
+        if entrada:
+            print(f"Retornando datos guardados en BD para RUC: {ruc}")
+            return self._servir(ruc, entrada)
+
+        # 3. RUC DESCONOCIDO: UNA SOLA CONSULTA A SUNAT POR RUC
+        return await self._obtener_sin_cache(ruc)
+
+    async def obtener_rucs(self, rucs: List[str]) -> AsyncIterator[Dict]:
+        """
+        Consulta varios RUC y entrega cada resultado apenas está listo.
+
+        Los aciertos de caché se resuelven con un solo MGET (memoria primero); los faltantes se
+        consultan con a lo sumo `concurrencia_lote` scrapings simultáneos. Al
+        vencer `deadline_lote` los RUC pendientes se informan como error.
+
+        Args:
+            rucs (List[str]): Números de RUC (los duplicados se consultan una vez)
+
+        Yields:
+            Dict: {"ruc", "ok": True, "datos"} o {"ruc", "ok": False, "error": {"message", "detail"}}
+        """
+        validos = []
+        for ruc in dict.fromkeys(r.strip() for r in rucs):
+            if _validar_ruc(ruc):
+                validos.append(ruc)
+            else:
+                yield _item_lote(ruc, {
+                    "message": "Error al consultar RUC",
+                    "detail": "El formato del RUC no es válido. Debe tener 11 dígitos.",
+                    "ruc": ruc
+                })
+
+        sin_cache = []
+        for ruc, entrada in zip(validos, await self.cache_service.get_many([f"sunat:ruc:{r}" for r in validos])):
+            if entrada:
+                yield _item_lote(ruc, self._servir(ruc, entrada))
+            else:
+                sin_cache.append(ruc)
+
+        pendientes = []
+        guardados = await self._desde_base_datos(sin_cache)
+        for ruc in sin_cache:
+            if ruc in guardados:
+                yield _item_lote(ruc, self._servir(ruc, guardados[ruc]))
+            else:
+                pendientes.append(ruc)
+
+        if not pendientes:
+            return
+
+        print(f"Lote SUNAT: {len(validos) - len(pendientes)} RUC desde cache/BD, {len(pendientes)} por consultar")
+        semaforo = asyncio.Semaphore(self.concurrencia_lote)
+        iniciados = set()
+
+        async def consultar(ruc_pendiente: str) -> Dict:
+            async with semaforo:
+                iniciados.add(ruc_pendiente)
+                try:
+                    return await self._obtener_sin_cache(ruc_pendiente)
+                except Exception as e:
+                    return {
+                        "message": "Error al consultar RUC",
+                        "detail": f"Error interno al consultar el RUC {ruc_pendiente}: {str(e)}",
+                        "ruc": ruc_pendiente
+                    }
+
+        tareas = {asyncio.create_task(consultar(ruc)): ruc for ruc in pendientes}
+        por_completar = set(tareas)
+        limite = asyncio.get_running_loop().time() + self.deadline_lote
+        try:
+            while por_completar:
+                restante = limite - asyncio.get_running_loop().time()
+                if restante <= 0:
+                    break
+                completadas, por_completar = await asyncio.wait(
+                    por_completar, timeout=restante, return_when=asyncio.FIRST_COMPLETED
+                )
+                for tarea in completadas:
+                    yield _item_lote(tareas[tarea], tarea.result())
+
+            for tarea in por_completar:
+                ruc = tareas[tarea]
+                yield _item_lote(ruc, {
+                    "message": "Error al consultar RUC",
+                    "detail": f"Se agotó el tiempo del lote ({self.deadline_lote:.0f}s) antes de consultar el RUC {ruc}",
+                    "ruc": ruc
+                })
+        finally:
+            # Las consultas ya iniciadas terminan en segundo plano y quedan en caché;
+            # las que seguían esperando turno se cancelan
+            for tarea, ruc in tareas.items():
+                if not tarea.done() and ruc not in iniciados:
+                    tarea.cancel()
+
+    async def refrescar_proveedores(self, limite: int, concurrencia: int, antiguedad_minima: timedelta) -> Dict:
+        """
+        Vuelve a consultar en SUNAT los RUC de proveedores con datos más antiguos
+        (o sin datos), para que las consultas de los usuarios no esperen a SUNAT.
+
+        Args:
+            limite: Cantidad máxima de RUC a refrescar
+            concurrencia: Consultas simultáneas como máximo
+            antiguedad_minima: Solo se refrescan datos más antiguos que esto
+
+        Returns:
+            Dict: Resumen con cantidad de RUC refrescados y con error
+        """
+        rucs = await self.snapshot_service.rucs_a_refrescar(limite, antiguedad_minima)
+        semaforo = asyncio.Semaphore(concurrencia)
+        resumen = {"rucs": len(rucs), "refrescados": 0, "errores": 0}
+
+        async def refrescar(ruc: str) -> None:
+            async with semaforo:
+                try:
+                    resultado = await self._obtener_sin_cache(ruc)
+                except Exception as e:
+                    print(f"Error al refrescar RUC {ruc}: {e}")
+                    resultado = {"message": "", "detail": str(e)}
+            resumen["errores" if "message" in resultado and "detail" in resultado else "refrescados"] += 1
+
+        await asyncio.gather(*(refrescar(ruc) for ruc in rucs))
+        return resumen
+
+    async def _desde_base_datos(self, rucs: List[str]) -> Dict[str, EntradaCache]:
+        """
+        Datos guardados en BD de los RUC indicados; los vuelve a poner en caché
+        con la frescura que les queda según su fecha de consulta
+        """
+        entradas = {}
+        for ruc, (datos, fetched_at) in (await self.snapshot_service.obtener_varios(rucs)).items():
+            edad = (datetime.now() - fetched_at).total_seconds()
+            await self.cache_service.set(
+                f"sunat:ruc:{ruc}", datos, max(int(self.cache_soft_ttl - edad), 0), self.cache_hard_ttl
+            )
+            entradas[ruc] = EntradaCache(valor=datos, fresca=edad < self.cache_soft_ttl)
+        return entradas
+
+    def _servir(self, ruc: str, entrada: EntradaCache) -> Dict:
+        """Valor del caché; si pasó su vencimiento soft se programa un refresco en segundo plano"""
+        if not entrada.fresca and not _consultas_en_curso.en_curso(ruc):
+            print(f"Datos de RUC {ruc} vencidos (soft), refrescando en segundo plano")
+            tarea = asyncio.create_task(self._refrescar(ruc))
+            _refrescos_en_curso.add(tarea)
+            tarea.add_done_callback(_refrescos_en_curso.discard)
+        return entrada.valor
 
-        # 2. NO ESTÁ EN CACHÉ, CONSULTAR SUNAT
+    async def _refrescar(self, ruc: str) -> None:
+        """Refresco en segundo plano; si SUNAT está saturado se deja para la próxima lectura"""
+        try:
+            await self._obtener_sin_cache(ruc)
+        except AdmisionRechazadaError as e:
+            print(f"Refresco del RUC {ruc} pospuesto: {e}")
+
+    async def _obtener_sin_cache(self, ruc: str) -> Dict:
+        """Consulta un RUC ausente o vencido en caché, coalesciendo las peticiones concurrentes"""
+        # Las peticiones concurrentes del mismo RUC en este proceso esperan a la primera
+        try:
+            return await _consultas_en_curso.ejecutar(
+                ruc, lambda: self._consultar_coordinado(ruc), timeout_seguidor=self.timeout_espera
+            )
+        except asyncio.TimeoutError:
+            print(f"Tiempo de espera agotado para RUC {ruc}, usando datos anteriores si existen")
+            return await self._respuesta_stale(ruc)
+
+    async def _consultar_coordinado(self, ruc: str) -> Dict:
+        """
+        Consulta SUNAT tomando un lock corto en Redis para que, entre workers,
+        solo uno haga el scraping del RUC. Los demás esperan a que aparezca en caché.
+
+        El lock se renueva mientras dura la consulta: una consulta completa (cola de
+        admisión, HTTP, pool de navegadores, navegación y secciones) puede superar
+        `lock_ttl`, y si expirara otro worker empezaría el mismo scraping.
+        """
+        lock_key = f"sunat:ruc:lock:{ruc}"
+        limite = time.monotonic() + self.timeout_espera
+
+        while True:
+            token = await self.lock_service.adquirir_lock(lock_key, self.lock_ttl)
+            if token is not None:
+                renovacion = asyncio.create_task(self._mantener_lock(lock_key, token))
+                try:
+                    # Otro worker pudo refrescarlo entre la lectura y el lock
+                    entrada = await self.cache_service.get(f"sunat:ruc:{ruc}")
+                    if entrada and entrada.fresca:
+                        return entrada.valor
+                    return await self._consultar_sunat(ruc)
+                finally:
+                    renovacion.cancel()
+                    await self.lock_service.liberar_lock(lock_key, token)
+
+            # Otro worker está consultando: esperar su resultado en caché
+            print(f"RUC {ruc} ya se está consultando en otro worker, esperando resultado...")
+            while await self.lock_service.exists(lock_key):
+                if time.monotonic() >= limite:
+                    print(f"Tiempo de espera agotado para RUC {ruc}, usando datos anteriores si existen")
+                    return await self._respuesta_stale(ruc)
+                await asyncio.sleep(INTERVALO_ESPERA_WORKER)
+
+            entrada = await self.cache_service.get(f"sunat:ruc:{ruc}")
+            if entrada:
+                return entrada.valor
+            # El otro worker terminó sin resultado (error): reintentar como líder
+
+    async def _mantener_lock(self, lock_key: str, token: str) -> None:
+        """Renueva el lock cada tercio de su TTL hasta que se cancele (fin de la consulta)"""
+        intervalo = max(self.lock_ttl / 3, 1)
+        while True:
+            await asyncio.sleep(intervalo)
+            if not await self.lock_service.renovar_lock(lock_key, token, self.lock_ttl):
+                print(f"Se perdió el lock {lock_key} durante la consulta; otro worker puede repetirla")
+                return
+
+    async def _respuesta_stale(self, ruc: str) -> Dict:
+        """Datos del RUC aún en caché (aunque ya no estén frescos) o un error"""
+        entrada = await self.cache_service.get(f"sunat:ruc:{ruc}")
+        if entrada:
+            return entrada.valor
+        return {
+            "message": "Error al consultar RUC",
+            "detail": f"La consulta del RUC {ruc} está tardando más de lo esperado. Intente nuevamente.",
+            "ruc": ruc
+        }
+
+    async def _consultar_sunat(self, ruc: str) -> Dict:
+        """Hace el scraping del RUC y guarda el resultado exitoso en caché y en BD"""
+        cache_key = f"sunat:ruc:{ruc}"
         print(f"RUC {ruc} no encontrado en cache, consultando SUNAT...")
 
         try:
-            # Ejecutar consulta síncrona de Playwright sin bloquear el event loop
-            resultado = await asyncio.to_thread(self.sunat_scraper.consultar_ruc, ruc)
+            # Consulta con Playwright async sobre el pool de navegadores (no bloquea el event loop),
+            # solo si el gobernador de admisión da turno
+            async with self.governor.admitir():
+                resultado = await self.sunat_scraper.consultar_ruc(ruc)
 
             # 3. VERIFICAR SI HUBO ERROR EN LA CONSULTA
             if resultado.get("razonSocial") == "Error en consulta":
                 error_msg = resultado.get("error", "Error desconocido")
                 print(f"Error al consultar RUC {ruc}: {error_msg}")
-                return {
+                respuesta_error = {
                     "message": "Error al consultar RUC",
                     "detail": f"No se pudo obtener información del RUC {ruc}. Error: {error_msg}",
                     "ruc": ruc
                 }
+                if error_msg == ERROR_RUC_NO_ENCONTRADO:
+                    # Resultado negativo: se cachea poco tiempo para no repetir el scraping
+                    await self.cache_service.set(
+                        cache_key, respuesta_error,
+                        self.cache_negativo_ttl, self.cache_negativo_ttl, negativo=True
+                    )
+                return respuesta_error
 
             # 4. CONSULTA EXITOSA, GUARDAR EN CACHÉ
             print(f"Consulta exitosa para RUC: {ruc}")
-            self.cache_service.set(cache_key, resultado, self.cache_ttl)
+            await self.cache_service.set(cache_key, resultado, self.cache_soft_ttl, self.cache_hard_ttl)
+            await self.snapshot_service.guardar(ruc, resultado)
 
             return resultado
 
+        except AdmisionRechazadaError:
+            raise
         except Exception as e:
             print(f"Error inesperado al consultar RUC {ruc}: {str(e)}")
             return {
@@ -4,8 +4,8 @@ Se ejecuta en NUEVA TRANSACCIÓN después del commit de la OC (asíncrono)
 """
 from sqlalchemy.orm import Session
 from app.adapters.outbound.database.repositories.registro_compra_repository import RegistroCompraRepository
-from app.adapters.outbound.database.repositories.tipo_cambio_repository import TipoCambioRepository
 from app.core.services.registro_compra_service import RegistroCompraService
+from app.core.services.tipo_cambio_service import get_tipo_cambio_service
 import logging
 
 logger = logging.getLogger(__name__)
@@ -22,7 +22,7 @@ class ProcesarRegistroCompra:
     def __init__(self, db: Session):
         self.db = db
         self.registro_repo = RegistroCompraRepository(db)
-        self.tc_repo = TipoCambioRepository(db)
+        self.tc_service = get_tipo_cambio_service()
         self.service = RegistroCompraService()
 
     def execute(self, event_data: dict):
@@ -89,8 +89,8 @@ class ProcesarRegistroCompra:
             tc = registro_existente.tipo_cambio_sunat
             logger.info(f"Registro existente encontrado - Usando TC guardado: {tc}")
         else:
-            # Primera OC, consultar TC SUNAT
-            tc = self.tc_repo.obtener_tipo_cambio_mas_reciente()
+            # Primera OC, consultar TC SUNAT (caché en memoria)
+            tc = self.tc_service.obtener_tipo_cambio_mas_reciente()
             if not tc:
                 logger.error("No se pudo obtener tipo de cambio de SUNAT")
                 raise ValueError("Tipo de cambio SUNAT no disponible")
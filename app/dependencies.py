@@ -1,10 +1,10 @@
+from functools import lru_cache
 from app.adapters.outbound.external_services.sunat.sunat_scraper import SunatScrapper
-from app.adapters.outbound.storage.local_file_storage import LocalFileStorageAdapter
 from app.adapters.outbound.storage.aws_file_storage import AWSFileStorage
 from app.adapters.outbound.invoice.xml_to_pdf_processor import XmlToPdfProcessorAdapter
 from app.core.use_cases.end_quotation.get_finalized_quotation_use_case import GetFinalizedQuotationUseCase
 from app.adapters.outbound.database.repositories.productos_cotizaciones_repository import ProductosCotizacionesRepository
-from app.config.database import get_db
+from app.config.database import get_db, SessionLocal
 from fastapi import Depends
 from sqlalchemy.orm import Session
 
@@ -18,6 +18,8 @@ from app.core.use_cases.generar_oc.eliminar_orden_compra import EliminarOrdenCom
 from app.core.use_cases.generar_oc.actualizar_orden_compra import ActualizarOrdenCompra
 from app.core.use_cases.generar_oc.obtener_orden_compra import ObtenerOrdenCompra
 from app.core.use_cases.generar_oc.listar_auditoria_orden_compra import ListarAuditoriaOrdenCompra
+from app.core.use_cases.generar_oc.exportar_auditoria_orden_compra import ExportarAuditoriaOrdenCompra
+from app.core.services.auditoria_archivo_service import get_auditoria_archivo_service
 from app.adapters.outbound.database.repositories.ordenes_compra_repository import OrdenesCompraRepository
 from app.adapters.outbound.database.repositories.cotizacion_version_repository import CotizacionVersionesRepository
 from app.adapters.outbound.excel.openpyxl_excel_generator import OpenPyXLExcelGenerator
@@ -28,9 +30,7 @@ from app.core.use_cases.integracion_sunat.integracion_sunat_uc import Integracio
 # --- Creación de Instancias (Singletons para eficiencia) ---
 
 # Se crea una única instancia de cada adaptador para reutilizarla
-storage_adapter = LocalFileStorageAdapter()
 processor_adapter = XmlToPdfProcessorAdapter()
-files_dir = "./app/shared/serializers/pdf_generator/files"
 
 # Inyección de dependencias para las cartas de garantia
 
@@ -40,9 +40,7 @@ def get_upload_invoice_use_case() -> UploadInvoiceUseCase:
     """
     # Aquí ocurre la inyección: pasamos las instancias concretas al constructor
     use_case_instance = UploadInvoiceUseCase(
-        file_storage=storage_adapter,
-        invoice_processor=processor_adapter,
-        files_dir=files_dir
+        invoice_processor=processor_adapter
     )
     return use_case_instance
 
@@ -107,12 +105,23 @@ def get_listar_auditoria_orden_compra_use_case(db: Session = Depends(get_db)) ->
     """
     Construye y devuelve una instancia del caso de uso de listar auditorías de orden de compra con sus dependencias inyectadas.
     """
-    return ListarAuditoriaOrdenCompra(db=db)
+    return ListarAuditoriaOrdenCompra(db=db, archivo_service=get_auditoria_archivo_service())
+
+def get_exportar_auditoria_orden_compra_use_case() -> ExportarAuditoriaOrdenCompra:
+    """
+    Construye el caso de uso de exportación de auditorías.
+    Recibe la fábrica de sesiones porque la exportación abre sus propias sesiones
+    que viven mientras se transmite la respuesta.
+    """
+    return ExportarAuditoriaOrdenCompra(session_factory=SessionLocal)
+
+@lru_cache()
+def get_sunat_scrapper() -> SunatScrapper:
+    """
+    Scraper de SUNAT compartido por todas las peticiones.
+    Las páginas salen del pool de navegadores del proceso (iniciado en el lifespan).
+    """
+    return SunatScrapper()
 
 def get_integracion_sunat_use_case() -> IntegracionSunatUC:
-    import os
-    # Usar headless=True en producción (Railway/Docker) y headless=False en local
-    # Railway y otros entornos cloud suelen definir PORT o RAILWAY_ENVIRONMENT
-    is_production = os.getenv('RAILWAY_ENVIRONMENT') is not None or os.path.exists('/.dockerenv')
-    sunat_scraper = SunatScrapper(headless=is_production)
-    return IntegracionSunatUC(sunat_scraper)
+    return IntegracionSunatUC(get_sunat_scrapper())
@@ -7,10 +7,16 @@ from contextlib import asynccontextmanager
 import logging
 import sys
 
-from app.adapters.inbound.api.routers import health, dolar, upload_router, cotizacion_finalizada_router, proveedores_router, ordenes_compra, integracion_sunat
+from app.adapters.inbound.api.routers import health, dolar, upload_router, cotizacion_finalizada_router, proveedores_router, ordenes_compra, integracion_sunat, jobs_router
 from app.config.settings import get_settings
 from app.core.infrastructure.events.event_dispatcher import get_event_dispatcher
-from app.core.infrastructure.scheduler.dolar_scheduler import dolar_scheduler
+from app.core.infrastructure.scheduler.job_registry import job_scheduler
+from app.core.infrastructure.scheduler.jobs import registrar_jobs
+from app.core.infrastructure.scheduler.leader_election import get_eleccion_lider
+from app.adapters.outbound.external_services.sunat.browser_pool import get_browser_pool
+from app.adapters.outbound.cache.redis_async_cache import get_redis_async_cache
+from app.core.services.valor_dolar_service import get_valor_dolar_service
+from app.shared.utils.admission_governor import AdmisionRechazadaError
 
 # Configurar logging
 settings = get_settings()
@@ -52,8 +58,23 @@ async def lifespan(app: FastAPI):
     print(workers_msg)
     logger.info(workers_msg)
 
-    # Iniciar el scheduler del dólar
-    dolar_scheduler.start()
+    # Caché del último valor del dólar: listener de inserciones + invalidaciones de otros workers
+    valor_dolar_service = get_valor_dolar_service()
+    valor_dolar_service.iniciar_suscripcion()
+
+    # Jobs periódicos (dólar, archivado de auditorías, refresco SUNAT): el scheduler
+    # arranca en pausa y solo el worker que gana el liderazgo ejecuta los jobs
+    registrar_jobs(job_scheduler)
+    job_scheduler.start()
+    eleccion_lider = get_eleccion_lider()
+    eleccion_lider.start()
+
+    # Precalentar el pool de navegadores de SUNAT (si falla, se reintenta en la primera consulta)
+    browser_pool = get_browser_pool()
+    try:
+        await browser_pool.start()
+    except Exception as e:
+        logger.error(f"❌ No se pudo iniciar el pool de navegadores SUNAT: {e}", exc_info=True)
 
     yield
 
@@ -65,8 +86,12 @@ async def lifespan(app: FastAPI):
     print(shutdown_msg)
     logger.info(shutdown_msg)
 
-    # Detener el scheduler del dólar
-    dolar_scheduler.shutdown()
+    # Ceder el liderazgo (otro worker lo toma de inmediato) y detener el scheduler
+    eleccion_lider.shutdown()
+    job_scheduler.shutdown()
+    await valor_dolar_service.detener_suscripcion()
+    await browser_pool.stop()
+    await get_redis_async_cache().close()
 
     event_dispatcher.shutdown(wait=True)
 
@@ -123,6 +148,17 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Llamadas a sitios externos rechazadas por sobrecarga
+    @app.exception_handler(AdmisionRechazadaError)
+    async def admision_rechazada_handler(request, exc: AdmisionRechazadaError):
+        from fastapi.responses import JSONResponse
+        logger.warning(f"⏳ {request.url.path}: {exc}")
+        return JSONResponse(
+            status_code=503,
+            content={"message": "Servicio temporalmente saturado", "detail": str(exc)},
+            headers={"Retry-After": str(exc.retry_after)}
+        )
+
     # Middleware para capturar excepciones NO HTTP
     @app.exception_handler(Exception)
     async def global_exception_handler(request, exc):
@@ -157,6 +193,7 @@ def create_app() -> FastAPI:
     app.include_router(dolar.router, prefix="/api", tags=["Dolar"])
     app.include_router(proveedores_router.router, prefix="/api", tags=["Proveedores"])
     app.include_router(integracion_sunat.router, prefix="/api", tags=["Integración con Sunat"])
+    app.include_router(jobs_router.router, prefix="/api", tags=["Jobs programados"])
     return app
 
 # Crear la instancia de la aplicación
@@ -1,3 +1,4 @@
+from io import BytesIO
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from pathlib import Path
@@ -19,13 +20,15 @@ class CartaGarantia:
         self.numero_factura = numero_factura
         self.productos = productos
         self.numero_cotizacion = numero_cotizacion
-        self.nombre_pdf = f"{self.BASE_DIR}/files/{nombre_pdf}"
+        self.nombre_pdf = nombre_pdf
         self.header_image = f"{self.BASE_DIR}/img/corpe_head.png" 
         self.sello_image = f"{self.BASE_DIR}/img/sello.png"
 
-    def crear_pdf(self):
-        # Crear el canvas
-        c = canvas.Canvas(self.nombre_pdf, pagesize=letter)
+    def crear_pdf(self) -> bytes:
+        """Genera la carta en memoria y devuelve el contenido del PDF"""
+        buffer = BytesIO()
+        # Crear el canvas sobre el buffer: peticiones simultáneas no comparten archivo
+        c = canvas.Canvas(buffer, pagesize=letter)
         # ESTABLECER METADATOS
         c.setTitle(f"Carta de Garantía {self.cliente}")
         c.setAuthor("Corp Eléctrica")
@@ -176,3 +179,4 @@ class CartaGarantia:
 
         # Guardar el PDF
         c.save()
+        return buffer.getvalue()
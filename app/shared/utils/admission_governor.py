@@ -0,0 +1,287 @@
+"""
+Control de admisión para llamadas a sitios externos (scraping de SUNAT, tipo de cambio).
+
+Cada objetivo tiene un gobernador que combina:
+- un tope de llamadas simultáneas
+- un token bucket que limita la tasa de llamadas nuevas (con ráfaga)
+- una cola FIFO acotada: si está llena, o si una llamada espera más de
+  `max_espera`, se rechaza con AdmisionRechazadaError (HTTP 503 + Retry-After)
+
+Es seguro entre threads y sirve tanto a corrutinas (`admitir`) como a código
+síncrono que corre en threads (`admitir_sync`), para que el scheduler y los
+endpoints compartan los mismos límites.
+"""
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, Optional, Tuple
+
+
+class AdmisionRechazadaError(Exception):
+    """La llamada no se admitió por sobrecarga; puede reintentarse tras `retry_after` segundos"""
+
+    def __init__(self, objetivo: str, motivo: str, retry_after: int):
+        self.objetivo = objetivo
+        self.motivo = motivo
+        self.retry_after = retry_after
+        super().__init__(
+            f"Servicio {objetivo} saturado ({motivo}). Intente nuevamente en {retry_after} segundos."
+        )
+
+
+class _Turno:
+    """Lugar en la cola; se despierta cuando puede volver a intentar entrar"""
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        self.evento = asyncio.Event() if loop is not None else threading.Event()
+
+    def avisar(self) -> None:
+        if self.loop is None:
+            self.evento.set()
+            return
+        try:
+            self.loop.call_soon_threadsafe(self.evento.set)
+        except RuntimeError:
+            # El event loop del turno ya se cerró
+            pass
+
+
+class AdmissionGovernor:
+    """Límite de concurrencia + tasa + tiempo en cola para un objetivo externo"""
+
+    def __init__(
+        self,
+        objetivo: str,
+        max_concurrencia: int,
+        tasa_por_segundo: float,
+        rafaga: int,
+        max_espera: float,
+        max_cola: int
+    ):
+        """
+        Args:
+            objetivo: Nombre del sitio o servicio (aparece en métricas y errores)
+            max_concurrencia: Llamadas simultáneas como máximo
+            tasa_por_segundo: Llamadas nuevas por segundo en régimen (0 = sin límite de tasa)
+            rafaga: Llamadas que pueden iniciarse seguidas tras un periodo sin uso
+            max_espera: Segundos máximos en cola antes de rechazar la llamada
+            max_cola: Llamadas en espera como máximo; las siguientes se rechazan al instante
+        """
+        self.objetivo = objetivo
+        self.max_concurrencia = max(1, max_concurrencia)
+        self.tasa_por_segundo = tasa_por_segundo
+        self.rafaga = max(1, rafaga)
+        self.max_espera = max_espera
+        self.max_cola = max_cola
+
+        self._lock = threading.Lock()
+        self._cola: Deque[_Turno] = deque()
+        self._en_curso = 0
+        self._tokens = float(self.rafaga)
+        self._ultima_recarga = time.monotonic()
+
+        self._admitidas = 0
+        self._rechazadas = {"cola_llena": 0, "espera_agotada": 0}
+        self._espera_total = 0.0
+        self._espera_max = 0.0
+
+    @asynccontextmanager
+    async def admitir(self) -> AsyncIterator[None]:
+        """
+        Reserva un lugar para una llamada desde una corrutina
+
+        Raises:
+            AdmisionRechazadaError: Cola llena o espera mayor a max_espera
+        """
+        turno = self._encolar(_Turno(asyncio.get_running_loop()))
+        inicio = time.monotonic()
+        try:
+            while True:
+                turno.evento.clear()
+                espera = self._intentar(turno, inicio)
+                if espera == 0:
+                    break
+                try:
+                    await asyncio.wait_for(turno.evento.wait(), timeout=espera)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            # Cancelación mientras esperaba: el turno deja la cola
+            self._abandonar(turno)
+            raise
+        try:
+            yield
+        finally:
+            self._liberar()
+
+    @contextmanager
+    def admitir_sync(self) -> Iterator[None]:
+        """Igual que `admitir`, para código síncrono (bloquea el thread mientras espera)"""
+        turno = self._encolar(_Turno())
+        inicio = time.monotonic()
+        try:
+            while True:
+                turno.evento.clear()
+                espera = self._intentar(turno, inicio)
+                if espera == 0:
+                    break
+                turno.evento.wait(espera)
+        except BaseException:
+            self._abandonar(turno)
+            raise
+        try:
+            yield
+        finally:
+            self._liberar()
+
+    def estado(self) -> Dict[str, Any]:
+        """Métricas del gobernador: ocupación, cola, tiempos de espera y rechazos"""
+        with self._lock:
+            self._recargar(time.monotonic())
+            return {
+                "en_curso": self._en_curso,
+                "en_cola": len(self._cola),
+                "tokens_disponibles": round(self._tokens, 2),
+                "admitidas": self._admitidas,
+                "rechazadas": dict(self._rechazadas),
+                "espera_promedio_ms": round(self._espera_total / self._admitidas * 1000, 1) if self._admitidas else 0.0,
+                "espera_max_ms": round(self._espera_max * 1000, 1),
+                "limites": {
+                    "max_concurrencia": self.max_concurrencia,
+                    "tasa_por_segundo": self.tasa_por_segundo,
+                    "rafaga": self.rafaga,
+                    "max_espera": self.max_espera,
+                    "max_cola": self.max_cola,
+                },
+            }
+
+    def _encolar(self, turno: _Turno) -> _Turno:
+        with self._lock:
+            if len(self._cola) >= self.max_cola:
+                self._rechazadas["cola_llena"] += 1
+                raise AdmisionRechazadaError(self.objetivo, "cola llena", self._retry_after())
+            self._cola.append(turno)
+        return turno
+
+    def _intentar(self, turno: _Turno, inicio: float) -> float:
+        """
+        Intenta admitir el turno (solo el primero de la cola puede entrar).
+
+        Returns:
+            float: 0 si fue admitido; si no, segundos a esperar antes de reintentar
+
+        Raises:
+            AdmisionRechazadaError: Si se agotó max_espera
+        """
+        siguiente = None
+        with self._lock:
+            ahora = time.monotonic()
+            restante = inicio + self.max_espera - ahora
+            self._recargar(ahora)
+
+            if self._cola[0] is turno and self._en_curso < self.max_concurrencia and self._tokens >= 1:
+                self._cola.popleft()
+                self._tokens -= 1
+                self._en_curso += 1
+                self._admitidas += 1
+                self._espera_total += ahora - inicio
+                self._espera_max = max(self._espera_max, ahora - inicio)
+                # El siguiente puede entrar también si quedan lugar y tokens
+                siguiente = self._cola[0] if self._cola else None
+                espera = 0.0
+            elif restante <= 0:
+                self._rechazadas["espera_agotada"] += 1
+                siguiente = self._quitar(turno)
+                error = AdmisionRechazadaError(self.objetivo, "tiempo de espera agotado", self._retry_after())
+                espera = -1.0
+            elif self._cola[0] is turno and self._en_curso < self.max_concurrencia:
+                # Hay lugar pero falta token: dormir hasta la próxima recarga
+                espera = min(restante, (1 - self._tokens) / self.tasa_por_segundo)
+            else:
+                # Esperar a que se libere un lugar o a avanzar en la cola
+                espera = restante
+
+        if siguiente is not None:
+            siguiente.avisar()
+        if espera < 0:
+            raise error
+        return espera
+
+    def _abandonar(self, turno: _Turno) -> None:
+        with self._lock:
+            siguiente = self._quitar(turno)
+        if siguiente is not None:
+            siguiente.avisar()
+
+    def _quitar(self, turno: _Turno) -> Optional[_Turno]:
+        """Saca el turno de la cola (con el lock tomado); devuelve el nuevo primero si cambió"""
+        era_primero = bool(self._cola) and self._cola[0] is turno
+        try:
+            self._cola.remove(turno)
+        except ValueError:
+            return None
+        return self._cola[0] if era_primero and self._cola else None
+
+    def _liberar(self) -> None:
+        with self._lock:
+            self._en_curso -= 1
+            siguiente = self._cola[0] if self._cola else None
+        if siguiente is not None:
+            siguiente.avisar()
+
+    def _recargar(self, ahora: float) -> None:
+        if self.tasa_por_segundo <= 0:
+            self._tokens = float(self.rafaga)
+        else:
+            self._tokens = min(float(self.rafaga), self._tokens + (ahora - self._ultima_recarga) * self.tasa_por_segundo)
+        self._ultima_recarga = ahora
+
+    def _retry_after(self) -> int:
+        """Segundos estimados hasta que la cola actual se vacíe (mínimo 1)"""
+        if self.tasa_por_segundo > 0:
+            estimado = len(self._cola) / self.tasa_por_segundo
+        else:
+            estimado = self.max_espera
+        promedio = self._espera_total / self._admitidas if self._admitidas else 0.0
+        return max(1, math.ceil(max(estimado, promedio)))
+
+
+# Un gobernador por objetivo y por proceso
+_governors: Dict[str, AdmissionGovernor] = {}
+_governors_lock = threading.Lock()
+
+
+def _limites(objetivo: str) -> Tuple[int, float, int, float, int]:
+    from app.config.settings import get_settings
+
+    settings = get_settings()
+    if objetivo == "sunat":
+        return (settings.sunat_admision_concurrencia, settings.sunat_admision_tasa,
+                settings.sunat_admision_rafaga, settings.sunat_admision_max_espera,
+                settings.sunat_admision_max_cola)
+    if objetivo == "valor_dolar":
+        return (settings.dolar_admision_concurrencia, settings.dolar_admision_tasa,
+                settings.dolar_admision_rafaga, settings.dolar_admision_max_espera,
+                settings.dolar_admision_max_cola)
+    raise ValueError(f"No hay límites de admisión configurados para '{objetivo}'")
+
+
+def get_admission_governor(objetivo: str) -> AdmissionGovernor:
+    """Obtiene el gobernador de admisión de un objetivo ("sunat", "valor_dolar")"""
+    governor = _governors.get(objetivo)
+    if governor is None:
+        with _governors_lock:
+            governor = _governors.get(objetivo)
+            if governor is None:
+                governor = AdmissionGovernor(objetivo, *_limites(objetivo))
+                _governors[objetivo] = governor
+    return governor
+
+
+def estado_governors() -> Dict[str, Dict[str, Any]]:
+    """Métricas de todos los gobernadores creados en este proceso"""
+    return {objetivo: governor.estado() for objetivo, governor in list(_governors.items())}
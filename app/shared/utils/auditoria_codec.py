@@ -0,0 +1,254 @@
+"""
+Codificación compacta de los cambios registrados en auditorías de órdenes de compra.
+
+Formato versionado (versión 1), un arreglo JSON posicional en la columna `cambios`:
+
+    [1, agregados, modificados, eliminados, adicionales]
+
+- agregados / eliminados: [id_producto, ...]
+- modificados: [[id_producto, [[codigo_campo, anterior, nuevo], ...]], ...]
+- adicionales: [[codigo_campo, valor] | [codigo_campo, anterior, nuevo], ...]
+
+Los nombres de campo conocidos se guardan como códigos numéricos (CAMPOS) y los
+desconocidos con su nombre. Las posiciones vacías del final se omiten, así una
+creación típica queda como `[1,[15,22,31],[],[],[[4,"PEN"],[5,"CONTADO"]]]`.
+
+Los registros anteriores guardaban cuatro columnas JSON separadas; `CambiosAuditoria`
+expone la misma vista para ambos formatos y decodifica solo cuando se accede.
+"""
+import json
+import logging
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.shared.utils.json_encoder import dumps
+
+logger = logging.getLogger(__name__)
+
+VERSION = 1
+SEPARADOR = " ----> "
+
+# Códigos numéricos de campos (no reutilizar ni renumerar: están en los datos guardados)
+CAMPOS = {
+    'cantidad': 1,
+    'precio_unitario': 2,
+    'precio_total': 3,
+    'moneda': 4,
+    'pago': 5,
+    'entrega': 6,
+    'consorcio': 7,
+    'igv': 8,
+}
+_NOMBRES = {codigo: nombre for nombre, codigo in CAMPOS.items()}
+
+# Claves con las que el caso de uso de actualización informa cambios de un producto
+_CAMBIOS_PRODUCTO_PLANOS = (
+    ('cantidad', 'cantidad_anterior', 'cantidad_nueva'),
+    ('precio_unitario', 'precio_anterior', 'precio_nuevo'),
+)
+
+
+def _id(valor: Any) -> Any:
+    """ID de producto como entero (si no es convertible se conserva tal cual)"""
+    try:
+        return int(valor)
+    except (ValueError, TypeError):
+        return valor
+
+
+def _codigo(campo: str) -> Any:
+    return CAMPOS.get(campo, campo)
+
+
+def _nombre(codigo: Any) -> str:
+    return _NOMBRES.get(codigo, str(codigo)) if isinstance(codigo, int) else codigo
+
+
+def _ids(productos: Optional[List[Any]]) -> List[Any]:
+    """IDs de una lista de productos (dicts con id_producto) o de IDs sueltos"""
+    return [_id(p.get('id_producto') if isinstance(p, dict) else p) for p in productos or []]
+
+
+def _cambios_producto(producto: Dict[str, Any]) -> List[list]:
+    """Cambios de un producto modificado como [[codigo, anterior, nuevo], ...]"""
+    cambios = producto.get('cambios') or {}
+    if cambios:
+        return [
+            [_codigo(campo), valor.get('anterior'), valor.get('nuevo')] if isinstance(valor, dict)
+            else [_codigo(campo), valor]
+            for campo, valor in cambios.items()
+        ]
+
+    pares = []
+    for campo, clave_anterior, clave_nueva in _CAMBIOS_PRODUCTO_PLANOS:
+        if clave_anterior in producto or clave_nueva in producto:
+            anterior, nuevo = producto.get(clave_anterior), producto.get(clave_nueva)
+            if anterior != nuevo:
+                pares.append([_codigo(campo), anterior, nuevo])
+    return pares
+
+
+def _adicionales(adicionales: Optional[Dict[str, Any]]) -> List[list]:
+    """Otros datos/cambios como [[codigo, valor]] o [[codigo, anterior, nuevo]]"""
+    resultado = []
+    for campo, valor in (adicionales or {}).items():
+        if isinstance(valor, dict):
+            resultado.append([_codigo(campo), valor.get('anterior', ''), valor.get('nuevo', '')])
+        elif isinstance(valor, str) and SEPARADOR in valor:
+            anterior, nuevo = valor.split(SEPARADOR, 1)
+            resultado.append([_codigo(campo), anterior, nuevo])
+        else:
+            resultado.append([_codigo(campo), valor])
+    return resultado
+
+
+def codificar_cambios(
+    agregados: Optional[List[Any]] = None,
+    modificados: Optional[List[Dict[str, Any]]] = None,
+    eliminados: Optional[List[Any]] = None,
+    adicionales: Optional[Dict[str, Any]] = None
+) -> Optional[str]:
+    """
+    Codifica los cambios de una auditoría en el formato compacto.
+
+    Args:
+        agregados: Productos agregados (dicts con id_producto) o sus IDs
+        modificados: Productos modificados con id_producto y `cambios`
+                     ({'campo': {'anterior': X, 'nuevo': Y}}) o claves planas
+                     cantidad_anterior/cantidad_nueva/precio_anterior/precio_nuevo
+        eliminados: Productos eliminados (dicts con id_producto) o sus IDs
+        adicionales: Otros datos {'campo': valor} o cambios {'campo': {'anterior', 'nuevo'}}
+
+    Returns:
+        str: Registro JSON compacto, None si no hay cambios
+    """
+    registro = [
+        VERSION,
+        _ids(agregados),
+        [[_id(p.get('id_producto')), _cambios_producto(p)] for p in modificados or []],
+        _ids(eliminados),
+        _adicionales(adicionales),
+    ]
+    while len(registro) > 1 and not registro[-1]:
+        registro.pop()
+    if len(registro) == 1:
+        return None
+    return dumps(registro, default=str)
+
+
+def _cargar_json(texto: Optional[str], campo: str) -> Any:
+    if not texto:
+        return None
+    try:
+        return json.loads(texto)
+    except ValueError as e:
+        logger.error(f"Error al parsear {campo} de auditoría: {e}")
+        return None
+
+
+class CambiosAuditoria:
+    """
+    Vista de solo lectura de los cambios de una auditoría.
+
+    Acepta el registro compacto (`cambios`) o las columnas JSON anteriores y no
+    decodifica nada hasta que se accede a una propiedad.
+    """
+
+    def __init__(
+        self,
+        cambios: Optional[str] = None,
+        productos_agregados: Optional[str] = None,
+        productos_modificados: Optional[str] = None,
+        productos_eliminados: Optional[str] = None,
+        cambios_adicionales: Optional[str] = None
+    ):
+        self._cambios = cambios
+        self._legado = (productos_agregados, productos_modificados, productos_eliminados, cambios_adicionales)
+
+    @classmethod
+    def de_auditoria(cls, auditoria: Any) -> "CambiosAuditoria":
+        """Construye la vista desde un modelo de auditoría (u objeto con los mismos atributos)"""
+        return cls(
+            cambios=getattr(auditoria, 'cambios', None),
+            productos_agregados=getattr(auditoria, 'productos_agregados', None),
+            productos_modificados=getattr(auditoria, 'productos_modificados', None),
+            productos_eliminados=getattr(auditoria, 'productos_eliminados', None),
+            cambios_adicionales=getattr(auditoria, 'cambios_adicionales', None)
+        )
+
+    @cached_property
+    def _registro(self) -> list:
+        """Registro compacto [version, agregados, modificados, eliminados, adicionales]"""
+        if self._cambios:
+            registro = _cargar_json(self._cambios, 'cambios')
+            if isinstance(registro, list) and registro and registro[0] == VERSION:
+                return registro + [[]] * (5 - len(registro))
+            logger.error(f"Versión de registro de cambios no soportada: {self._cambios[:20]}")
+            return [VERSION, [], [], [], []]
+
+        # Formato anterior: cuatro columnas JSON independientes
+        agregados, modificados, eliminados, adicionales = self._legado
+        return [
+            VERSION,
+            _ids(_cargar_json(agregados, 'productos_agregados')),
+            [
+                [_id(item.get('id_producto')), _cambios_producto(item)]
+                for item in _cargar_json(modificados, 'productos_modificados') or []
+                if isinstance(item, dict)
+            ],
+            _ids(_cargar_json(eliminados, 'productos_eliminados')),
+            _adicionales(_cargar_json(adicionales, 'cambios_adicionales')),
+        ]
+
+    @property
+    def agregados(self) -> List[Any]:
+        """IDs de productos agregados"""
+        return self._registro[1]
+
+    @property
+    def modificados(self) -> List[Tuple[Any, Dict[str, Dict[str, Any]]]]:
+        """Productos modificados como (id_producto, {'campo': {'anterior': X, 'nuevo': Y}})"""
+        resultado = []
+        for id_producto, pares in self._registro[2]:
+            cambios = {}
+            for par in pares:
+                if len(par) == 3:
+                    cambios[_nombre(par[0])] = {'anterior': par[1], 'nuevo': par[2]}
+                else:
+                    cambios[_nombre(par[0])] = {'anterior': None, 'nuevo': par[1]}
+            resultado.append((id_producto, cambios))
+        return resultado
+
+    @property
+    def eliminados(self) -> List[Any]:
+        """IDs de productos eliminados"""
+        return self._registro[3]
+
+    @property
+    def adicionales(self) -> Optional[Dict[str, str]]:
+        """Otros datos/cambios como {'campo': 'valor'} o {'campo': 'anterior ----> nuevo'}"""
+        if not self._registro[4]:
+            return None
+        return {
+            _nombre(par[0]): f"{par[1]}{SEPARADOR}{par[2]}" if len(par) == 3 else str(par[1])
+            for par in self._registro[4]
+        }
+
+    def a_compacto(self) -> Optional[str]:
+        """Registro compacto equivalente (usado para migrar registros del formato anterior)"""
+        registro = list(self._registro)
+        while len(registro) > 1 and not registro[-1]:
+            registro.pop()
+        return dumps(registro, default=str) if len(registro) > 1 else None
+
+    def a_columnas_legado(self) -> Dict[str, Optional[str]]:
+        """Valores de las cuatro columnas JSON del formato anterior (para revertir la migración)"""
+        modificados = [
+            {'id_producto': id_producto, 'cambios': cambios} for id_producto, cambios in self.modificados
+        ]
+        return {
+            'productos_agregados': dumps([str(i) for i in self.agregados]) if self.agregados else None,
+            'productos_modificados': dumps(modificados, default=str) if modificados else None,
+            'productos_eliminados': dumps([str(i) for i in self.eliminados]) if self.eliminados else None,
+            'cambios_adicionales': dumps(self.adicionales) if self.adicionales else None,
+        }
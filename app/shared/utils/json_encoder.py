@@ -0,0 +1,27 @@
+"""
+Serialización JSON para payloads de auditoría.
+
+Usa orjson (varias veces más rápido que json.dumps). El texto producido se
+lee igual con json.loads.
+"""
+from typing import Any, Callable, Optional
+
+import orjson
+
+
+def dumps(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> str:
+    """
+    Serializa un objeto a JSON (str).
+
+    Args:
+        obj: Objeto a serializar
+        default: Función para tipos no serializables (ej: str para Decimal/datetime)
+
+    Returns:
+        str: Texto JSON
+    """
+    opciones = orjson.OPT_NON_STR_KEYS
+    if default is not None:
+        # Delegar datetime a `default` para conservar el mismo formato que json.dumps(default=str)
+        opciones |= orjson.OPT_PASSTHROUGH_DATETIME
+    return orjson.dumps(obj, default=default, option=opciones).decode("utf-8")
@@ -0,0 +1,74 @@
+"""
+Coalescencia de llamadas concurrentes ("single-flight") dentro del proceso.
+
+Si varias corrutinas piden la misma clave mientras una ya la está resolviendo,
+solo la primera (líder) lanza la función; todas (líder y seguidores) esperan el
+mismo resultado o la misma excepción.
+
+La función corre en una tarea propia: si se cancela la corrutina que la lanzó
+(ej: el cliente del líder se desconecta) la cancelación solo llega a esa
+corrutina y los seguidores siguen esperando la tarea. La tarea se cancela
+únicamente cuando ya no queda nadie esperándola.
+"""
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class SingleFlight:
+    """Mapa clave -> tarea de las llamadas en curso en el event loop"""
+
+    def __init__(self):
+        self._en_curso: Dict[str, asyncio.Task] = {}
+        self._esperando: Dict[asyncio.Task, int] = {}
+
+    def en_curso(self, clave: str) -> bool:
+        return clave in self._en_curso
+
+    async def ejecutar(
+        self,
+        clave: str,
+        funcion: Callable[[], Awaitable[Any]],
+        timeout_seguidor: Optional[float] = None
+    ) -> Any:
+        """
+        Ejecuta `funcion` una sola vez por clave entre las llamadas concurrentes.
+
+        Args:
+            clave: Identificador de la llamada (ej: el RUC)
+            funcion: Corrutina a ejecutar si no hay otra en curso para la clave
+            timeout_seguidor: Segundos máximos que un seguidor espera al líder
+
+        Raises:
+            asyncio.TimeoutError: Si un seguidor superó timeout_seguidor (el líder sigue)
+            asyncio.CancelledError: Solo en la corrutina cancelada; los demás siguen esperando
+        """
+        tarea = self._en_curso.get(clave)
+        if tarea is None:
+            tarea = asyncio.ensure_future(funcion())
+            self._en_curso[clave] = tarea
+            tarea.add_done_callback(functools.partial(self._terminar, clave))
+            espera = None
+        else:
+            espera = timeout_seguidor
+
+        self._esperando[tarea] = self._esperando.get(tarea, 0) + 1
+        try:
+            # shield: cancelar o agotar la espera de uno no cancela la tarea compartida
+            return await asyncio.wait_for(asyncio.shield(tarea), timeout=espera)
+        finally:
+            restantes = self._esperando[tarea] - 1
+            if restantes > 0:
+                self._esperando[tarea] = restantes
+            else:
+                del self._esperando[tarea]
+                if not tarea.done():
+                    # Nadie más espera el resultado: no seguir trabajando para nadie
+                    tarea.cancel()
+
+    def _terminar(self, clave: str, tarea: asyncio.Task) -> None:
+        if self._en_curso.get(clave) is tarea:
+            del self._en_curso[clave]
+        # Evita "Task exception was never retrieved" cuando nadie la esperó
+        if not tarea.cancelled():
+            tarea.exception()
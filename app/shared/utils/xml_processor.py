@@ -20,7 +20,7 @@ except locale.Error:
 class InvoiceExtractor:
     """
     Clase encargada de:
-      1. Parsear un archivo XML de factura (UBL)
+      1. Parsear un XML de factura (UBL) desde una ruta o un objeto tipo archivo (ej: BytesIO)
       2. Extraer datos relevantes: número de factura, cotización, cliente, líneas, fecha.
       3. Proveer esos datos formateados para generarlos en un PDF u otro uso.
 
@@ -0,0 +1,57 @@
+"""Proveedores del tipo de cambio contra respuestas guardadas (tests/fixtures/currency)"""
+import pytest
+
+pytest.importorskip("bs4")
+
+from app.adapters.outbound.external_services.currency.proveedores import (
+    PROVEEDORES,
+    CotizacionDolar,
+    CotizacionInvalidaError,
+    ProveedorTipoCambio,
+    SecurexProveedor,
+    SunatApisNetPeProveedor,
+)
+
+
+def test_securex(leer_fixture):
+    cotizacion = SecurexProveedor().parsear(leer_fixture("currency/securex.html"))
+
+    # Acepta coma decimal y espacios alrededor del valor
+    assert cotizacion == CotizacionDolar(compra=3.735, venta=3.762, fuente="securex")
+    assert cotizacion.validar() is cotizacion
+
+
+@pytest.mark.parametrize("fixture", ["securex_formato_nuevo.html", "securex_sin_valor.html"])
+def test_securex_formato_cambiado(leer_fixture, fixture):
+    with pytest.raises(CotizacionInvalidaError):
+        SecurexProveedor().parsear(leer_fixture(f"currency/{fixture}"))
+
+
+def test_sunat_apis_net_pe(leer_fixture):
+    cotizacion = SunatApisNetPeProveedor().parsear(leer_fixture("currency/sunat_apis_net_pe.json"))
+
+    assert cotizacion == CotizacionDolar(compra=3.741, venta=3.749, fuente="sunat_apis_net_pe")
+
+
+@pytest.mark.parametrize("contenido", ["<html>Servicio no disponible</html>", "[]"])
+def test_sunat_apis_net_pe_respuesta_inesperada(contenido):
+    with pytest.raises(CotizacionInvalidaError):
+        SunatApisNetPeProveedor().parsear(contenido)
+
+
+def test_sunat_apis_net_pe_sin_venta(leer_fixture):
+    with pytest.raises(CotizacionInvalidaError):
+        SunatApisNetPeProveedor().parsear(leer_fixture("currency/sunat_apis_net_pe_sin_venta.json"))
+
+
+@pytest.mark.parametrize("compra, venta", [(0.3741, 3.749), (3.749, 37.49), (3.76, 3.74)])
+def test_validar_descarta_valores_mal_parseados(compra, venta):
+    with pytest.raises(CotizacionInvalidaError):
+        CotizacionDolar(compra=compra, venta=venta, fuente="prueba").validar()
+
+
+def test_proveedores_registrados_implementan_parsear():
+    with pytest.raises(TypeError):
+        ProveedorTipoCambio()
+    for nombre, clase in PROVEEDORES.items():
+        assert clase().nombre == nombre
@@ -0,0 +1,103 @@
+"""Parser de la consulta HTTP de RUC contra páginas de SUNAT grabadas (tests/fixtures/sunat)"""
+import pytest
+
+pytest.importorskip("bs4")
+
+from app.adapters.outbound.external_services.sunat.dto import ERROR_RUC_NO_ENCONTRADO, DatosRucDTO
+from app.adapters.outbound.external_services.sunat.sunat_http_client import (
+    CaptchaSunatError,
+    MarcadoInesperadoError,
+    SunatHttpClient,
+    SunatHttpNoDisponibleError,
+    parsear_representantes,
+    parsear_resultado,
+    parsear_trabajadores,
+)
+
+RUC = "20123456789"
+
+
+def test_parsear_resultado(leer_fixture):
+    dto = parsear_resultado(leer_fixture("sunat/resultado.html"), RUC)
+
+    assert dto.error is None
+    # Espacios normalizados como textContent del navegador
+    assert dto.razon_social == "EMPRESA DEMO S.A.C."
+    assert dto.tipo_contribuyente == "SOCIEDAD ANONIMA CERRADA"
+    assert dto.nombre_comercial == "DEMO"
+    assert dto.fecha_inicio_actividades == "15/02/2010"
+    assert dto.activo is True
+    assert dto.condicion_contribuyente == "HABIDO"
+    assert dto.direccion == "AV. JOSE PARDO NRO. 123"
+    assert (dto.departamento, dto.provincia, dto.distrito) == ("LIMA", "LIMA", "MIRAFLORES")
+    assert dto.actividad_economica == "Principal - 4690 - VENTA AL POR MAYOR NO ESPECIALIZADA"
+    assert dto.actividad_economica2.startswith("Secundaria 1 - 4659")
+    assert dto.es_agente_retencion is True
+
+
+def test_parsear_resultado_ruc_no_encontrado(leer_fixture):
+    dto = parsear_resultado(leer_fixture("sunat/no_encontrado.html"), "20999999999")
+
+    assert dto.error == ERROR_RUC_NO_ENCONTRADO
+    assert dto.numero_documento == "20999999999"
+
+
+def test_parsear_resultado_captcha(leer_fixture):
+    with pytest.raises(CaptchaSunatError) as error:
+        parsear_resultado(leer_fixture("sunat/captcha.html"), RUC)
+    assert error.value.motivo == "captcha"
+
+
+@pytest.mark.parametrize("fixture", ["resultado_formato_nuevo.html", "resultado_datos_incompletos.html"])
+def test_parsear_resultado_formato_cambiado(leer_fixture, fixture):
+    with pytest.raises(MarcadoInesperadoError) as error:
+        parsear_resultado(leer_fixture(f"sunat/{fixture}"), RUC)
+    assert error.value.motivo == "marcado"
+
+
+def test_parsear_trabajadores_toma_el_ultimo_periodo(leer_fixture):
+    dto = DatosRucDTO(numero_documento=RUC)
+    parsear_trabajadores(leer_fixture("sunat/trabajadores.html"), dto)
+
+    assert dto.numero_trabajadores == "42"
+    assert dto.prestadores_de_servicios == "5"
+
+
+def test_parsear_trabajadores_sin_tabla(leer_fixture):
+    with pytest.raises(MarcadoInesperadoError):
+        parsear_trabajadores(leer_fixture("sunat/trabajadores_sin_tabla.html"), DatosRucDTO(numero_documento=RUC))
+
+
+def test_parsear_representantes_toma_el_primero(leer_fixture):
+    dto = DatosRucDTO(numero_documento=RUC)
+    parsear_representantes(leer_fixture("sunat/representantes.html"), dto)
+
+    representante = dto.representante_legal
+    assert representante.tipo_documento == "DNI"
+    assert representante.nro_documento == "12345678"
+    assert representante.nombre == "PEREZ GOMEZ JUAN"
+    assert representante.cargo == "GERENTE GENERAL"
+    assert representante.fecha_desde == "15/02/2010"
+
+
+def test_parsear_representantes_columnas_cambiadas(leer_fixture):
+    with pytest.raises(MarcadoInesperadoError):
+        parsear_representantes(
+            leer_fixture("sunat/representantes_columnas_cambiadas.html"),
+            DatosRucDTO(numero_documento=RUC)
+        )
+
+
+def test_fallo_inesperado_del_parser_pasa_al_navegador(monkeypatch):
+    cliente = SunatHttpClient(sesiones=1)
+
+    def _flujo_roto(session, ruc):
+        raise AttributeError("'NoneType' object has no attribute 'find_all'")
+
+    monkeypatch.setattr(cliente, "_flujo", _flujo_roto)
+
+    with pytest.raises(SunatHttpNoDisponibleError) as error:
+        cliente._consultar(RUC)
+    assert error.value.motivo == "parseo"
+    # La sesión vuelve al pool aunque la consulta falle
+    assert cliente._sesiones.qsize() == 1
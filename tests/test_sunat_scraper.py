@@ -0,0 +1,88 @@
+"""
+Scraping con navegador contra páginas de SUNAT grabadas (tests/fixtures/sunat)
+servidas por un servidor HTTP local.
+"""
+import functools
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("playwright.async_api")
+import pytest_asyncio
+
+from app.adapters.outbound.external_services.sunat.browser_pool import BrowserPool
+from app.adapters.outbound.external_services.sunat.sunat_scraper import (
+    SunatScrapper,
+    TiemposSunat,
+    _abrir_en_pagina_hermana,
+)
+
+PAGINAS_SUNAT = Path(__file__).parent / "fixtures" / "sunat"
+TIEMPOS = TiemposSunat(navegacion_ms=10000, resultado_ms=5000, seccion_ms=5000, boton_ms=2000)
+
+
+class _SinLogs(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def servidor_sunat():
+    """Sirve las páginas grabadas de SUNAT en un puerto libre"""
+    handler = functools.partial(_SinLogs, directory=str(PAGINAS_SUNAT))
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    yield f"http://127.0.0.1:{servidor.server_address[1]}"
+    servidor.shutdown()
+    servidor.server_close()
+
+
+@pytest_asyncio.fixture
+async def pool():
+    pool = BrowserPool(size=1, headless=True, recursos_bloqueados=["image", "font", "media"])
+    try:
+        await pool.start()
+    except Exception as e:
+        pytest.skip(f"Chromium de Playwright no disponible: {e}")
+    yield pool
+    await pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_consulta_con_navegador_sobre_paginas_grabadas(servidor_sunat, pool):
+    scraper = SunatScrapper(browser_pool=pool, tiempos=TIEMPOS)
+    scraper.url = f"{servidor_sunat}/busqueda.html"
+
+    inicio = time.monotonic()
+    datos = await scraper._consultar_con_navegador("20123456789")
+    duracion = time.monotonic() - inicio
+
+    assert "error" not in datos
+    assert datos["razonSocial"] == "EMPRESA DEMO S.A.C."
+    assert datos["activo"] is True
+    assert datos["distrito"] == "MIRAFLORES"
+    assert datos["EsAgenteRetencion"] is True
+    # El botón de trabajadores se pinta tarde: debe esperarse, no darse por ausente
+    assert datos["numeroTrabajadores"] == "42"
+    assert datos["prestadoresdeServicios"] == "5"
+    assert datos["representanteLegal"]["nroDocumento"] == "12345678"
+    # Las imágenes no se descargan
+    assert pool.estado()["recursos_bloqueados"] >= 1
+    # Esperas por eventos: sin networkidle ni pausas fijas la consulta local es rápida
+    assert duracion < 5
+
+
+@pytest.mark.asyncio
+async def test_seccion_sin_boton_se_descarta_tras_espera_corta(pool):
+    async with pool.pagina() as page:
+        await page.set_content("<form><p>Sin secciones</p></form>")
+
+        inicio = time.monotonic()
+        pagina = await _abrir_en_pagina_hermana(page, ".btnInfRepLeg", TIEMPOS)
+
+        assert pagina is None
+        assert time.monotonic() - inicio < TIEMPOS.boton_ms / 1000 + 1
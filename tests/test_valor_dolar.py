@@ -0,0 +1,74 @@
+"""Consulta concurrente del tipo de cambio con proveedores que leen respuestas guardadas"""
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("pydantic_settings")
+
+from app.adapters.outbound.external_services.currency.proveedores import (
+    SecurexProveedor,
+    SunatApisNetPeProveedor,
+)
+from app.adapters.outbound.external_services.currency.valor_dolar import ValorDolar
+from app.shared.utils.admission_governor import AdmissionGovernor
+
+
+def _valor_dolar(proveedores, **opciones) -> ValorDolar:
+    valor_dolar = ValorDolar(proveedores, reintentos=0, **opciones)
+    # Sin límite de tasa: el gobernador compartido del proceso espaciaría las consultas de los tests
+    valor_dolar.governor = AdmissionGovernor("valor_dolar_test", 4, 0, 1, 1.0, 10)
+    return valor_dolar
+
+
+class _SecurexGuardado(SecurexProveedor):
+    def __init__(self, leer_fixture, fixture: str):
+        self.contenido = leer_fixture(f"currency/{fixture}")
+
+    def descargar(self, session, timeout) -> str:
+        return self.contenido
+
+
+class _SunatGuardado(SunatApisNetPeProveedor):
+    def __init__(self, leer_fixture):
+        self.contenido = leer_fixture("currency/sunat_apis_net_pe.json")
+
+    def descargar(self, session, timeout) -> str:
+        return self.contenido
+
+
+class _FuenteRota(SecurexProveedor):
+    nombre = "rota"
+
+    def descargar(self, session, timeout) -> str:
+        return ""
+
+    def parsear(self, contenido: str):
+        raise AttributeError("'NoneType' object has no attribute 'get_text'")
+
+
+@pytest.mark.asyncio
+async def test_un_error_inesperado_no_tumba_las_demas_fuentes(leer_fixture):
+    valor_dolar = _valor_dolar([_FuenteRota(), _SunatGuardado(leer_fixture)], quorum=1)
+
+    datos = await valor_dolar.obtener_cambio()
+
+    assert (datos["compra"], datos["venta"]) == (3.741, 3.749)
+
+
+@pytest.mark.asyncio
+async def test_quorum_usa_las_fuentes_que_coinciden(leer_fixture):
+    valor_dolar = _valor_dolar(
+        [_SecurexGuardado(leer_fixture, "securex.html"), _SunatGuardado(leer_fixture), _FuenteRota()],
+        quorum=2, tolerancia=0.05
+    )
+
+    datos = await valor_dolar.obtener_cambio()
+
+    # Mediana del grupo [sunat 3.749, securex 3.762]: con dos valores se toma el superior
+    assert (datos["compra"], datos["venta"]) == (3.735, 3.762)
+
+
+@pytest.mark.asyncio
+async def test_sin_fuentes_validas_devuelve_none(leer_fixture):
+    valor_dolar = _valor_dolar([_SecurexGuardado(leer_fixture, "securex_formato_nuevo.html"), _FuenteRota()])
+
+    assert await valor_dolar.obtener_cambio() is None